@@ -0,0 +1,89 @@
+"""
+Upstream-Call Budget Check (Agent)
+
+Runs the context node against a stubbed Gamma API at a small and a large
+watchlist size and counts HTTP calls per host. Watchlist resolution must
+stay O(1) in the number of watchlist items (one call per ID kind), so an
+accidental per-item loop fails here. The API's budgets live in
+apps/api/scripts/check_budgets.py.
+
+Usage: python scripts/check_budgets.py
+"""
+import asyncio
+import json
+import os
+import sys
+from collections import Counter
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_KEY", "budget")
+os.environ.setdefault("UPSTASH_REDIS_URL", "redis://localhost:6379")
+
+import httpx
+
+calls: Counter = Counter()
+
+
+def gamma_handler(request: httpx.Request) -> httpx.Response:
+    """Echo one market per requested condition ID / slug."""
+    calls[request.url.host] += 1
+    params = parse_qs(request.url.query.decode())
+    markets = [
+        {"id": str(i), "question": f"Market {cid}", "conditionId": cid, "slug": f"slug-{cid}",
+         "clobTokenIds": json.dumps([f"tok-{cid}", f"tok-no-{cid}"]), "outcomePrices": '["0.5", "0.5"]'}
+        for i, cid in enumerate(params.get("condition_ids", []))
+    ] + [
+        {"id": str(1000 + i), "question": f"Market {slug}", "conditionId": f"0x{i:064x}", "slug": slug,
+         "clobTokenIds": "[]", "outcomePrices": "[]"}
+        for i, slug in enumerate(params.get("slug", []))
+    ]
+    return httpx.Response(200, json=markets)
+
+
+# Route every client the tools create through the stub
+_AsyncClient = httpx.AsyncClient
+httpx.AsyncClient = lambda *args, **kwargs: _AsyncClient(*args, **{**kwargs, "transport": httpx.MockTransport(gamma_handler)})
+
+from src.nodes import context  # noqa: E402
+
+BUDGETS = {"gamma-api.polymarket.com": 2}
+
+
+async def run(n: int) -> Counter:
+    watchlist = [f"0x{i:064x}" for i in range(n)] + [f"market-slug-{i}" for i in range(n)]
+
+    async def fake_watchlist(user_id):
+        return watchlist
+
+    async def fake_wallets(user_id):
+        return []
+
+    async def fake_config(user_id):
+        return {"sources": ["watchlists", "news"]}
+
+    context.get_user_watchlist_ids = fake_watchlist
+    context.get_user_tracked_wallets = fake_wallets
+    context.get_agent_config = fake_config
+
+    calls.clear()
+    result = await context.context_node({"user_id": "budget-user"})
+    assert len(result["watchlist_markets"]) == 2 * n, result["watchlist_markets"]
+    return Counter(calls)
+
+
+async def main() -> int:
+    failed = False
+    for n in (2, 25):
+        counts = await run(n)
+        violations = [f"{host}={counts[host]} > {limit}" for host, limit in BUDGETS.items() if counts[host] > limit]
+        print(f"[{'FAIL' if violations else 'ok':>4}] context node (n={n})"
+              + (f": {', '.join(violations)}" if violations else f": {dict(counts)}"))
+        failed |= bool(violations)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -27,6 +27,14 @@ class Settings(BaseSettings):
     # Search / RAG
     tavily_api_key: str = ""
 
+    # Upstream base URLs (override to point at the local simulator)
+    gamma_api_base: str = "https://gamma-api.polymarket.com"
+    clob_api_base: str = "https://clob.polymarket.com"
+    data_api_base: str = "https://data-api.polymarket.com"
+    tavily_api_base: str = "https://api.tavily.com"
+    cryptocompare_api_base: str = "https://min-api.cryptocompare.com"
+    telegram_api_base: str = "https://api.telegram.org"
+
     # Agent Config
     agent_poll_interval: int = 300  # seconds between proactive scans
     agent_port: int = 8001
@@ -14,6 +14,7 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from src.state import AgentState, Decision
 from src.core.config import get_settings
+from src.tools.flow import format_flow
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ Your role is to analyze market data, smart-money activity, and news context to p
 2. **Smart Money Signal**: Are tracked whales buying/selling? Follow institutional flow.
 3. **News Catalyst**: Is there breaking news that the market hasn't priced in yet?
 4. **Risk Assessment**: What could go wrong? What's the downside?
+5. **Correlated Exposure**: Highly correlated markets are one bet; do not stack the same signal across them.
 
 ## Risk Profile Context
 The user's risk profile is: {risk_profile}
@@ -53,11 +55,12 @@ async def advisor_node(state: AgentState) -> dict:
     """
     Synthesize all gathered data into actionable trading decisions.
 
-    Reads: market_snapshots, smart_money_trades, news_items, user_config
+    Reads: market_snapshots, smart_money_flow, correlated_pairs, news_items, user_config
     Writes: decisions, messages
     """
     snapshots = state.get("market_snapshots", [])
-    trades = state.get("smart_money_trades", [])
+    flows = state.get("smart_money_flow", [])
+    pairs = state.get("correlated_pairs", [])
     news = state.get("news_items", [])
     config = state.get("user_config", {})
     risk_profile = config.get("risk_profile", "moderate")
@@ -68,7 +71,7 @@ async def advisor_node(state: AgentState) -> dict:
             "messages": ["🧠 Advisor: No markets to analyze."],
         }
 
-    logger.info(f"🧠 Advisor: Synthesizing {len(snapshots)} markets with {len(trades)} trades and {len(news)} news items...")
+    logger.info(f"🧠 Advisor: Synthesizing {len(snapshots)} markets with flow in {len(flows)} markets and {len(news)} news items...")
 
     # ── Build the analysis prompt ──────────────────────────────
     context_parts = []
@@ -83,14 +86,18 @@ async def advisor_node(state: AgentState) -> dict:
         )
 
     # Smart money
-    if trades:
-        context_parts.append("\n## SMART MONEY ACTIVITY (Tracked Wallets)")
-        for t in trades[:15]:  # Limit to avoid token overflow
+    if flows:
+        context_parts.append("\n## SMART MONEY FLOW (Tracked Wallets, YES-equivalent)")
+        for f in flows[:15]:  # Limit to avoid token overflow
+            context_parts.append(f"- {f['market_slug']}: {format_flow(f)}")
+
+    # Overlapping exposure: correlated markets are not independent bets
+    if pairs:
+        context_parts.append("\n## CORRELATED EXPOSURE (hourly YES returns, last 30 days)")
+        for p in pairs[:10]:
             context_parts.append(
-                f"- Wallet {t['wallet'][:6]}...{t['wallet'][-4:]}: "
-                f"{t['side']} ${t['usd_size']:,.2f} "
-                f"({t['shares']:,.0f} shares @ {t['price']:.3f}) "
-                f"on {t['market_slug']}"
+                f"- {p['market_a']} <> {p['market_b']}: r={p['correlation']:+.2f} "
+                f"({p.get('overlap_hours', 0)}h overlap)"
             )
 
     # News / research
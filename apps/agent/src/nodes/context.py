@@ -42,39 +42,34 @@ async def context_node(state: AgentState) -> dict:
     tracked_wallets = await get_user_tracked_wallets(user_id)
     user_config = await get_agent_config(user_id)
 
-    # Resolve watchlist IDs to market details
+    # Resolve watchlist IDs to market details (batched: one Gamma call per ID kind)
     watchlist_markets = []
     if watchlist_ids:
         logger.info(f"📋 Context: Resolving {len(watchlist_ids)} watchlist items via Polymarket API...")
-        from src.tools.polymarket import get_market_by_id, get_market_by_slug
+        from src.tools.polymarket import get_markets_by_ids
+
+        # Handle both condition IDs (0x...) and slugs (string)
+        condition_ids = [m for m in watchlist_ids if m.startswith("0x")]
+        slugs = [m for m in watchlist_ids if not m.startswith("0x")]
+        resolved = await get_markets_by_ids(condition_ids, slugs)
+
+        by_key = {}
+        for data in resolved:
+            if data.condition_id:
+                by_key[data.condition_id] = data
+            if data.slug:
+                by_key[data.slug] = data
 
         for market_input in watchlist_ids:
-            # Handle both condition IDs (0x...) and slugs (string)
-            if market_input.startswith("0x"):
-                data = await get_market_by_id(market_input)
-            else:
-                data = await get_market_by_slug(market_input)
-            
+            data = by_key.get(market_input)
             if not data:
                 continue
 
-            # Extract 'Yes' token ID
-            # Gamma API structure: tokens=[{'outcome': 'Yes', 'token_id': '...'}, ...]
-            yes_token_id = ""
-            for t in data.get("tokens", []):
-                if t.get("outcome") == "Yes":
-                    yes_token_id = t.get("token_id")
-                    break
-            
-            # Fallback for questions that might not be Yes/No (though agent is likely Yes/No focused)
-            if not yes_token_id and data.get("tokens"):
-                yes_token_id = data["tokens"][0].get("token_id")
-
             watchlist_markets.append({
-                "market_id": data.get("condition_id"),
-                "question": data.get("question"),
-                "slug": data.get("slug"),
-                "clob_token_id": yes_token_id
+                "market_id": data.condition_id,
+                "question": data.display_question,
+                "slug": data.slug,
+                "clob_token_id": data.yes_token_id,
             })
 
     sources = user_config.get("sources", ["watchlists", "news"])
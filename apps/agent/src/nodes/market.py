@@ -7,9 +7,10 @@ and recent smart-money trades from tracked wallets.
 This node turns raw Supabase IDs into actionable market snapshots.
 """
 import logging
-from src.state import AgentState, MarketSnapshot, WalletActivity
+from src.state import AgentState, CorrelatedPair, MarketSnapshot, WalletActivity
+from src.tools.flow import summarize_flow
+from src.tools.supabase_tools import get_market_correlations
 from src.tools.polymarket import (
-    get_market_by_id,
     get_market_prices,
     get_wallet_trades,
 )
@@ -22,7 +23,8 @@ async def market_analyst_node(state: AgentState) -> dict:
     Fetch live data for watchlist markets and tracked wallets.
 
     Reads: watchlist_markets, tracked_wallets
-    Writes: market_snapshots, smart_money_trades, messages
+    Writes: market_snapshots, smart_money_trades, smart_money_flow,
+            correlated_pairs, messages
     """
     watchlist_markets = state.get("watchlist_markets", [])
     tracked_wallets = state.get("tracked_wallets", [])
@@ -54,32 +56,55 @@ async def market_analyst_node(state: AgentState) -> dict:
         }
         snapshots.append(snapshot)
 
-    # ── 2. Fetch recent smart-money trades ─────────────────────
+    # ── 2. Correlated exposure within the watchlist ────────────
+    questions = {m["market_id"]: m.get("question", "Unknown") for m in watchlist_markets if m.get("market_id")}
+    neighbors = await get_market_correlations(list(questions))
+    pairs: dict[tuple, CorrelatedPair] = {}
+    for market_id, rows in neighbors.items():
+        for n in rows:
+            other = n.get("market_id")
+            if other in questions and other != market_id:
+                a, b = sorted((market_id, other))
+                pairs[(a, b)] = {
+                    "market_a": questions[a],
+                    "market_b": questions[b],
+                    "correlation": n["correlation"],
+                    "overlap_hours": n.get("overlap", 0),
+                }
+    correlated = sorted(pairs.values(), key=lambda p: abs(p["correlation"]), reverse=True)
+
+    # ── 3. Fetch recent smart-money trades ─────────────────────
     trades: list[WalletActivity] = []
 
     for wallet in tracked_wallets[:10]:  # Cap to avoid rate limits
-        raw_trades = await get_wallet_trades(wallet, limit=5)
-        for t in raw_trades:
-            shares = float(t.get("size", 0))
-            price = float(t.get("price", 0))
+        wallet_trades = await get_wallet_trades(wallet, limit=20)
+        for t in wallet_trades:
             activity: WalletActivity = {
                 "wallet": wallet,
-                "side": t.get("side", "UNKNOWN").upper(),
-                "shares": shares,
-                "price": price,
-                "usd_size": round(shares * price, 2),
-                "market_slug": t.get("marketSlug", ""),
+                "side": t.side or "UNKNOWN",
+                "shares": t.size,
+                "price": t.price,
+                "usd_size": round(t.usd_size, 2),
+                "market_slug": t.slug or "",
+                "outcome_index": t.outcome_index,
+                "timestamp": t.timestamp,
             }
             trades.append(activity)
 
+    # Per-trade lines are too noisy for the advisor; it reads the flow per market
+    flow = summarize_flow(trades)
+
     msg = (
         f"📊 Market Analyst complete: {len(snapshots)} snapshots, "
-        f"{len(trades)} smart-money trades"
+        f"{len(trades)} smart-money trades in {len(flow)} markets, "
+        f"{len(correlated)} correlated pairs"
     )
     logger.info(msg)
 
     return {
         "market_snapshots": snapshots,
         "smart_money_trades": trades,
+        "smart_money_flow": flow,
+        "correlated_pairs": correlated,
         "messages": [msg],
     }
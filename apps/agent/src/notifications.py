@@ -97,7 +97,7 @@ async def send_decision_to_telegram(user_id: str, decision: dict) -> bool:
         # Send via Bot API
         async with httpx.AsyncClient(timeout=10.0) as client:
             resp = await client.post(
-                f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage",
+                f"{settings.telegram_api_base}/bot{settings.telegram_bot_token}/sendMessage",
                 json={
                     "chat_id": chat_id,
                     "text": message,
@@ -123,7 +123,7 @@ async def send_chat_response(chat_id: str, text: str) -> bool:
         settings = get_settings()
         async with httpx.AsyncClient(timeout=10.0) as client:
             resp = await client.post(
-                f"https://api.telegram.org/bot{settings.telegram_bot_token}/sendMessage",
+                f"{settings.telegram_api_base}/bot{settings.telegram_bot_token}/sendMessage",
                 json={
                     "chat_id": chat_id,
                     "text": text,
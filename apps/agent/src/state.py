@@ -30,6 +30,29 @@ class WalletActivity(TypedDict, total=False):
     price: float
     usd_size: float
     market_slug: str
+    outcome_index: int  # 0 = YES
+    timestamp: int
+
+
+class MarketFlow(TypedDict, total=False):
+    """Tracked-wallet flow in one market (YES-equivalent direction)."""
+    market_slug: str
+    trades: int
+    buy_usd: float
+    sell_usd: float
+    net_usd: float
+    buyers: int  # distinct wallets
+    sellers: int
+    avg_yes_entry: float | None
+    last_trade: int
+
+
+class CorrelatedPair(TypedDict, total=False):
+    """Two watched markets whose hourly returns move together."""
+    market_a: str  # question
+    market_b: str
+    correlation: float  # Pearson r of hourly YES returns
+    overlap_hours: int
 
 
 class NewsItem(TypedDict, total=False):
@@ -59,7 +82,8 @@ class AgentState(TypedDict, total=False):
     Fields are populated progressively as the graph executes:
       1. Supervisor seeds `user_id` and `task`
       2. ContextNode fills `watchlist_markets`, `tracked_wallets`, `user_config`
-      3. MarketAnalystNode fills `market_snapshots`, `smart_money_trades`
+      3. MarketAnalystNode fills `market_snapshots`, `smart_money_trades`,
+         `smart_money_flow`, `correlated_pairs`
       4. ResearcherNode fills `news_items`
       5. AdvisorNode produces `decisions`
     """
@@ -83,6 +107,8 @@ class AgentState(TypedDict, total=False):
     # ── Market Data ─────────────────────────────────────────────
     market_snapshots: list[MarketSnapshot]
     smart_money_trades: list[WalletActivity]
+    smart_money_flow: list[MarketFlow]  # smart_money_trades aggregated per market
+    correlated_pairs: list[CorrelatedPair]  # watchlist markets that are effectively the same bet
 
     # ── Research ────────────────────────────────────────────────
     news_items: list[NewsItem]
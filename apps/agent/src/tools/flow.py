@@ -0,0 +1,62 @@
+"""
+Foresynth Agent - Smart-Money Flow
+
+Condenses tracked-wallet trades into one flow summary per market (net USD,
+distinct buyers and sellers, average YES entry) so the advisor prompt gets
+a line per market instead of a line per trade. Direction and prices are
+YES-equivalent, as in apps/api/src/services/flow.py.
+"""
+from src.state import MarketFlow, WalletActivity
+
+
+def summarize_flow(trades: list[WalletActivity]) -> list[MarketFlow]:
+    """Aggregate trades by market, largest absolute net flow first."""
+    totals: dict[str, dict] = {}
+    for t in trades:
+        slug = t.get("market_slug")
+        if not slug:
+            continue
+        yes = t.get("outcome_index", 0) == 0
+        bullish = (t.get("side") == "BUY") == yes
+        side = "buy" if bullish else "sell"
+
+        m = totals.setdefault(slug, {
+            "buy_usd": 0.0, "sell_usd": 0.0, "buy_shares": 0.0, "buy_px": 0.0,
+            "buyers": set(), "sellers": set(), "trades": 0, "last": 0,
+        })
+        m[f"{side}_usd"] += t.get("usd_size", 0.0)
+        m[f"{side}ers"].add(t["wallet"])
+        m["trades"] += 1
+        m["last"] = max(m["last"], t.get("timestamp", 0))
+        if bullish:
+            price = t.get("price", 0.0)
+            m["buy_shares"] += t.get("shares", 0.0)
+            m["buy_px"] += (price if yes else 1 - price) * t.get("shares", 0.0)
+
+    flows: list[MarketFlow] = []
+    for slug, m in totals.items():
+        flows.append({
+            "market_slug": slug,
+            "trades": m["trades"],
+            "buy_usd": round(m["buy_usd"], 2),
+            "sell_usd": round(m["sell_usd"], 2),
+            "net_usd": round(m["buy_usd"] - m["sell_usd"], 2),
+            "buyers": len(m["buyers"]),
+            "sellers": len(m["sellers"]),
+            "avg_yes_entry": round(m["buy_px"] / m["buy_shares"], 4) if m["buy_shares"] else None,
+            "last_trade": m["last"],
+        })
+    flows.sort(key=lambda f: abs(f["net_usd"]), reverse=True)
+    return flows
+
+
+def format_flow(flow: MarketFlow) -> str:
+    """One-line flow summary for prompts."""
+    net = flow["net_usd"]
+    parts = [
+        f"{flow['buyers']} buying / {flow['sellers']} selling wallets",
+        f"net {'+' if net >= 0 else '-'}${abs(net):,.0f}",
+    ]
+    if flow.get("avg_yes_entry") is not None:
+        parts.append(f"avg YES entry {flow['avg_yes_entry']:.3f}")
+    return f"{', '.join(parts)} ({flow['trades']} trades)"
@@ -0,0 +1,170 @@
+"""
+Foresynth Agent - Polymarket Response Normalizer
+
+Parses raw Gamma markets and Data API trades into typed models with one
+bulk pydantic-core pass per page. Mirrors apps/api/src/services/normalizer.py
+(the two services deploy separately and do not share a Python package).
+"""
+import json
+import logging
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
+
+
+def _json_list(value: Any) -> list:
+    """Gamma encodes some arrays as JSON strings ('["0.5", "0.5"]')."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError("expected a list or JSON-encoded list")
+    return value
+
+
+def _number(value: Any) -> float:
+    """Numbers arrive as floats, ints, numeric strings, '' or null."""
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+class GammaMarket(BaseModel):
+    """A market as returned by the Gamma API."""
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    question: Optional[str] = None
+    title: Optional[str] = None
+    slug: str = ""
+    volume: float = 0.0
+    liquidity: float = 0.0
+    outcome_prices: list[float] = Field(default_factory=list, alias="outcomePrices")
+    clob_token_ids: list[str] = Field(default_factory=list, alias="clobTokenIds")
+    condition_id: Optional[str] = Field(None, alias="conditionId")
+    end_date: Optional[str] = Field(None, alias="endDate")
+    category: Optional[str] = None
+    active: bool = True
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def _id_to_str(cls, v):
+        return str(v)
+
+    @field_validator("volume", "liquidity", mode="before")
+    @classmethod
+    def _coerce_number(cls, v):
+        return _number(v)
+
+    @field_validator("outcome_prices", "clob_token_ids", mode="before")
+    @classmethod
+    def _coerce_list(cls, v):
+        return _json_list(v)
+
+    @field_validator("slug", mode="before")
+    @classmethod
+    def _coerce_slug(cls, v):
+        return v or ""
+
+    @field_validator("active", mode="before")
+    @classmethod
+    def _coerce_active(cls, v):
+        return True if v is None else v
+
+    @property
+    def display_question(self) -> str:
+        return self.question or self.title or "Untitled"
+
+    @property
+    def yes_price(self) -> float:
+        return self.outcome_prices[0] if self.outcome_prices else 0.5
+
+    @property
+    def yes_token_id(self) -> str:
+        return self.clob_token_ids[0] if self.clob_token_ids else ""
+
+
+class TradeData(BaseModel):
+    """A single trade from the Data API /trades endpoint."""
+    model_config = ConfigDict(extra="ignore")
+
+    wallet: str = Field("", alias="proxyWallet")
+    side: str = ""
+    asset: str = ""
+    condition_id: str = Field("", alias="conditionId")
+    size: float = 0.0
+    price: float = 0.0
+    timestamp: int = 0
+    outcome_index: int = Field(0, alias="outcomeIndex")
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    transaction_hash: Optional[str] = Field(None, alias="transactionHash")
+
+    @field_validator("size", "price", mode="before")
+    @classmethod
+    def _coerce_number(cls, v):
+        return _number(v)
+
+    @field_validator("side", mode="before")
+    @classmethod
+    def _upper_side(cls, v):
+        return (v or "").upper()
+
+    @field_validator("outcome_index", "timestamp", mode="before")
+    @classmethod
+    def _coerce_int(cls, v):
+        return 0 if v is None or v == "" else v
+
+    @property
+    def usd_size(self) -> float:
+        return self.size * self.price
+
+
+_MARKET_PAGE = TypeAdapter(list[GammaMarket])
+_TRADE_PAGE = TypeAdapter(list[TradeData])
+
+
+def _validate_page(adapter: TypeAdapter, raw: Any, label: str) -> list:
+    """
+    Validate a whole page at once. If some items are malformed, log
+    them and re-validate the remaining items in a second bulk pass.
+    """
+    if isinstance(raw, (bytes, str)):
+        try:
+            return adapter.validate_json(raw)
+        except ValidationError:
+            try:
+                raw = json.loads(raw)
+            except ValueError as e:
+                logger.error(f"Normalizer: Invalid JSON page of {label}: {e}")
+                return []
+
+    if not isinstance(raw, list):
+        logger.error(f"Normalizer: Expected a list of {label}, got {type(raw).__name__}")
+        return []
+
+    try:
+        return adapter.validate_python(raw)
+    except ValidationError as e:
+        bad = {err["loc"][0] for err in e.errors() if err["loc"] and isinstance(err["loc"][0], int)}
+        first = e.errors()[0]
+        logger.warning(
+            f"Normalizer: Dropped {len(bad)}/{len(raw)} malformed {label} "
+            f"(first: item {first['loc'][0] if first['loc'] else '?'} - {first['msg']})"
+        )
+        if not bad:
+            return []
+        return adapter.validate_python([item for i, item in enumerate(raw) if i not in bad])
+
+
+def normalize_markets(raw: Any) -> list[GammaMarket]:
+    """Parse a Gamma markets page (list or raw JSON bytes)."""
+    return _validate_page(_MARKET_PAGE, raw, "markets")
+
+
+def normalize_trades(raw: Any) -> list[TradeData]:
+    """Parse a Data API trades page (list or raw JSON bytes)."""
+    return _validate_page(_TRADE_PAGE, raw, "trades")
@@ -4,15 +4,20 @@ Foresynth Agent - Polymarket Tools
 Lightweight wrappers around the Polymarket Gamma and CLOB APIs.
 Adapted from the official Polymarket/agents SDK utilities.
 """
+import asyncio
 import httpx
 import logging
 from typing import Optional
 
+from src.core.config import get_settings
+from src.tools.normalize import GammaMarket, TradeData, normalize_markets, normalize_trades
+
 logger = logging.getLogger(__name__)
 
-GAMMA_API_BASE = "https://gamma-api.polymarket.com"
-CLOB_API_BASE = "https://clob.polymarket.com"
-DATA_API_BASE = "https://data-api.polymarket.com"
+_settings = get_settings()
+GAMMA_API_BASE = _settings.gamma_api_base
+CLOB_API_BASE = _settings.clob_api_base
+DATA_API_BASE = _settings.data_api_base
 
 
 async def get_markets(
@@ -20,7 +25,7 @@ async def get_markets(
     active: bool = True,
     sort_by: str = "volume",
     ascending: bool = False,
-) -> list[dict]:
+) -> list[GammaMarket]:
     """Fetch active markets from Gamma API, sorted by volume."""
     params = {
         "limit": limit,
@@ -32,41 +37,66 @@ async def get_markets(
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.get(f"{GAMMA_API_BASE}/markets", params=params)
             resp.raise_for_status()
-            return resp.json()
+            return normalize_markets(resp.content)
     except Exception as e:
         logger.error(f"Polymarket get_markets error: {e}")
         return []
 
 
-async def get_market_by_slug(slug: str) -> Optional[dict]:
+async def get_market_by_slug(slug: str) -> Optional[GammaMarket]:
     """Fetch a single market by its slug."""
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.get(f"{GAMMA_API_BASE}/markets", params={"slug": slug})
             resp.raise_for_status()
-            data = resp.json()
+            data = normalize_markets(resp.content)
             return data[0] if data else None
     except Exception as e:
         logger.error(f"Polymarket get_market_by_slug error: {e}")
         return None
 
 
-async def get_market_by_id(condition_id: str) -> Optional[dict]:
+async def get_market_by_id(condition_id: str) -> Optional[GammaMarket]:
     """Fetch a single market by its condition ID."""
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.get(
                 f"{GAMMA_API_BASE}/markets",
-                params={"id": condition_id},
+                params={"condition_ids": condition_id},
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = normalize_markets(resp.content)
             return data[0] if data else None
     except Exception as e:
         logger.error(f"Polymarket get_market_by_id error: {e}")
         return None
 
 
+async def get_markets_by_ids(condition_ids: list[str] = (), slugs: list[str] = ()) -> list[GammaMarket]:
+    """Resolve many markets by condition ID and/or slug with one Gamma call per kind."""
+    params = []
+    if condition_ids:
+        params.append([("condition_ids", cid) for cid in condition_ids])
+    if slugs:
+        params.append([("slug", slug) for slug in slugs])
+    if not params:
+        return []
+
+    try:
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            responses = await asyncio.gather(
+                *(client.get(f"{GAMMA_API_BASE}/markets", params=p + [("limit", len(p))]) for p in params)
+            )
+        markets = []
+        for resp in responses:
+            resp.raise_for_status()
+            markets.extend(normalize_markets(resp.content))
+        return markets
+    except Exception as e:
+        logger.error(f"Polymarket get_markets_by_ids error: {e}")
+        return []
+
+
 async def get_market_prices(token_ids: list[str]) -> dict[str, float]:
     """Fetch current prices for a batch of CLOB token IDs."""
     if not token_ids:
@@ -89,7 +119,7 @@ async def get_market_prices(token_ids: list[str]) -> dict[str, float]:
     return prices
 
 
-async def get_wallet_trades(wallet_address: str, limit: int = 10) -> list[dict]:
+async def get_wallet_trades(wallet_address: str, limit: int = 10) -> list[TradeData]:
     """Fetch recent trades for a specific wallet from the Data API."""
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
@@ -98,13 +128,13 @@ async def get_wallet_trades(wallet_address: str, limit: int = 10) -> list[dict]:
                 params={"user": wallet_address, "limit": limit},
             )
             resp.raise_for_status()
-            return resp.json()
+            return normalize_trades(resp.content)
     except Exception as e:
         logger.error(f"Polymarket get_wallet_trades error: {e}")
         return []
 
 
-async def search_markets(query: str, limit: int = 10) -> list[dict]:
+async def search_markets(query: str, limit: int = 10) -> list[GammaMarket]:
     """Search for markets matching a text query."""
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
@@ -113,7 +143,7 @@ async def search_markets(query: str, limit: int = 10) -> list[dict]:
                 params={"_q": query, "limit": limit, "active": True},
             )
             resp.raise_for_status()
-            return resp.json()
+            return normalize_markets(resp.content)
     except Exception as e:
         logger.error(f"Polymarket search_markets error: {e}")
         return []
@@ -24,7 +24,7 @@ async def tavily_search(query: str, max_results: int = 5) -> list[dict]:
     try:
         async with httpx.AsyncClient(timeout=15.0) as client:
             resp = await client.post(
-                "https://api.tavily.com/search",
+                f"{settings.tavily_api_base}/search",
                 json={
                     "api_key": settings.tavily_api_key,
                     "query": query,
@@ -57,10 +57,11 @@ async def get_crypto_news(limit: int = 10) -> list[dict]:
     Fetch latest crypto / prediction market news headlines.
     Uses a simple news API or curated RSS approach.
     """
+    settings = get_settings()
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             resp = await client.get(
-                "https://min-api.cryptocompare.com/data/v2/news/",
+                f"{settings.cryptocompare_api_base}/data/v2/news/",
                 params={"lang": "EN", "sortOrder": "latest"},
             )
             resp.raise_for_status()
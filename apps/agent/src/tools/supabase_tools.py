@@ -106,6 +106,27 @@ async def get_agent_config(user_id: str) -> dict:
         return defaults
 
 
+async def get_market_correlations(condition_ids: list[str]) -> dict[str, list[dict]]:
+    """
+    Fetch precomputed correlated neighbours (written hourly by the API) for
+    the given condition IDs. Returns {condition_id: [neighbour, ...]}.
+    """
+    if not condition_ids:
+        return {}
+    try:
+        db = get_supabase()
+        resp = await asyncio.to_thread(
+            db.table("market_correlations")
+            .select("market_id, neighbors")
+            .in_("market_id", condition_ids)
+            .execute
+        )
+        return {row["market_id"]: row.get("neighbors") or [] for row in resp.data or []}
+    except Exception as e:
+        logger.error(f"get_market_correlations error: {e}")
+        return {}
+
+
 async def save_agent_decision(user_id: str, decision: dict) -> bool:
     """Persist an agent decision to the agent_decisions table for the feed."""
     try:
@@ -0,0 +1,26 @@
+-- Signals feed: wallet age as a real column + keyset pagination indexes
+-- Run this in Supabase SQL Editor
+
+-- 1. Promote metadata.wallet_age_days to a column so the feed filters in SQL
+ALTER TABLE public.insider_signals
+ADD COLUMN IF NOT EXISTS wallet_age_days NUMERIC;
+
+UPDATE public.insider_signals
+SET wallet_age_days = (metadata->>'wallet_age_days')::NUMERIC
+WHERE wallet_age_days IS NULL
+  AND metadata ? 'wallet_age_days';
+
+-- 2. Keyset order of both endpoints: (radar_score, created_at, id) DESC.
+--    The composite indexes replace the single-column score/wallet ones.
+CREATE INDEX IF NOT EXISTS idx_insider_signals_feed
+    ON public.insider_signals(radar_score DESC, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_insider_signals_wallet_feed
+    ON public.insider_signals(wallet_address, radar_score DESC, created_at DESC, id DESC);
+
+-- Selective age filters (fresh wallets) can start from the age index instead
+CREATE INDEX IF NOT EXISTS idx_insider_signals_wallet_age
+    ON public.insider_signals(wallet_age_days);
+
+DROP INDEX IF EXISTS public.idx_insider_signals_score;
+DROP INDEX IF EXISTS public.idx_insider_signals_wallet;
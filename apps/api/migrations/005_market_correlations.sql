@@ -0,0 +1,20 @@
+-- Market correlations: top-k correlated neighbours per watched market
+-- Run this in Supabase SQL Editor
+
+-- Written by the API's correlation job (one row per market, replaced on
+-- every run) and read by the markets endpoints and the agent.
+CREATE TABLE IF NOT EXISTS public.market_correlations (
+    market_id TEXT PRIMARY KEY, -- condition ID
+    question TEXT,
+    slug TEXT,
+    neighbors JSONB NOT NULL DEFAULT '[]', -- [{market_id, question, slug, correlation, overlap}], strongest first
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Stale rows (markets no longer watched) are pruned by age
+CREATE INDEX IF NOT EXISTS idx_market_correlations_computed_at
+    ON public.market_correlations(computed_at);
+
+ALTER TABLE public.market_correlations ENABLE ROW LEVEL SECURITY;
+
+GRANT ALL ON public.market_correlations TO service_role;
@@ -0,0 +1,12 @@
+-- Insider signals: one row per trade
+-- Run this in Supabase SQL Editor
+
+-- The radar retries a cycle whose cursor commit failed, and overlapping
+-- workers can score the same trades; the trade key (transaction hash,
+-- asset, wallet) lets inserts skip rows that already exist.
+ALTER TABLE public.insider_signals
+ADD COLUMN IF NOT EXISTS trade_id TEXT;
+
+-- Older rows have no trade_id; NULLs never conflict
+CREATE UNIQUE INDEX IF NOT EXISTS idx_insider_signals_trade_id
+    ON public.insider_signals(trade_id);
@@ -0,0 +1,109 @@
+"""
+Copy-Trade Backtest Benchmark
+
+Times src.services.backtest.simulate on a synthetic multi-year trade
+history (packing included) against a straightforward per-trade Python
+replay of the same rules, and checks that both agree.
+
+Usage: pipenv run python scripts/bench_backtest.py [--trades 100000] [--tokens 2000]
+"""
+import argparse
+import bisect
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.backtest import PriceTable, TradeArrays, simulate
+from src.services.normalizer import TradeData
+
+START = 1_600_000_000
+YEARS = 4
+
+
+def make_data(n_trades: int, n_tokens: int, seed: int = 11) -> tuple[list[TradeData], dict[str, dict]]:
+    rng = random.Random(seed)
+    tokens = [str(rng.getrandbits(64)) for _ in range(n_tokens)]
+    span = YEARS * 365 * 86400
+    histories = {}
+    for token in tokens:
+        t = sorted(rng.sample(range(START, START + span, 60), 200))
+        histories[token] = {"t": t, "p": [round(rng.uniform(0.02, 0.98), 3) for _ in t]}
+    trades = []
+    for _ in range(n_trades):
+        token = rng.choice(tokens)
+        trades.append(TradeData(
+            proxyWallet="0xbench", side=rng.choice(["BUY", "BUY", "SELL"]), asset=token, conditionId=token,
+            size=rng.uniform(10, 5000), price=round(rng.uniform(0.02, 0.98), 3),
+            timestamp=START + rng.randrange(span),
+        ))
+    return trades, histories
+
+
+def python_replay(trades: list[TradeData], histories: dict[str, dict], cfg: dict, now: int) -> tuple[float, float]:
+    """Per-trade loop: total PnL and hit rate."""
+    slip = cfg["slippage_bps"] / 10_000
+
+    def fill(t: TradeData) -> float:
+        h = histories.get(t.asset)
+        if h:
+            i = bisect.bisect_right(h["t"], t.timestamp + cfg["delay_seconds"]) - 1
+            if i >= 0 and h["t"][i] > t.timestamp:
+                return h["p"][i]
+        return t.price
+
+    open_lots: dict[str, list[tuple[float, float]]] = {}
+    pnls = []
+    for t in sorted(trades, key=lambda t: t.timestamp):
+        if t.size * t.price < cfg["min_trade_size"] or (cfg["only_buy_orders"] and t.side != "BUY"):
+            continue
+        if t.side == "BUY":
+            entry = min(fill(t) * (1 + slip), 0.999)
+            open_lots.setdefault(t.asset, []).append((cfg["stake_usd"] / entry, entry))
+        else:
+            exit_price = max(fill(t) * (1 - slip), 0.0)
+            for shares, entry in open_lots.pop(t.asset, []):
+                pnls.append(shares * (exit_price - entry))
+    last_price = {t.asset: t.price for t in sorted(trades, key=lambda t: t.timestamp)}
+    for asset, lots in open_lots.items():
+        h = histories.get(asset)
+        mark = h["p"][-1] if h else last_price[asset]
+        pnls.extend(shares * (mark - entry) for shares, entry in lots)
+    return sum(pnls), sum(p > 0 for p in pnls) / len(pnls)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trades", type=int, default=100_000)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    trades, histories = make_data(args.trades, args.tokens)
+    cfg = {"min_trade_size": 500.0, "only_buy_orders": False, "delay_seconds": 300, "slippage_bps": 50.0, "stake_usd": 100.0}
+    now = START + YEARS * 365 * 86400
+
+    start = time.perf_counter()
+    arrays = TradeArrays.from_trades(trades)
+    codes = {asset: i for i, asset in enumerate(arrays.tokens)}
+    prices = PriceTable({codes[a]: h for a, h in histories.items() if a in codes}, len(arrays.tokens))
+    packed = time.perf_counter()
+    result = simulate(arrays, prices, now=now, **cfg)
+    vectorized = time.perf_counter()
+
+    total, hit_rate = python_replay(trades, histories, cfg, now)
+    loop = time.perf_counter()
+
+    print(f"{args.trades} trades over {YEARS} years, {args.tokens} tokens")
+    print(f"  pack:        {(packed - start) * 1000:8.1f} ms")
+    print(f"  simulate:    {(vectorized - packed) * 1000:8.1f} ms")
+    print(f"  python loop: {(loop - vectorized) * 1000:8.1f} ms")
+    assert abs(result["total_pnl"] - total) < 0.01 * max(1.0, abs(total)), (result["total_pnl"], total)
+    assert abs(result["hit_rate"] - hit_rate) < 1e-3, (result["hit_rate"], hit_rate)
+    print(f"  results agree (total PnL {result['total_pnl']:,.2f}, hit rate {result['hit_rate']:.2%})")
+
+
+if __name__ == "__main__":
+    main()
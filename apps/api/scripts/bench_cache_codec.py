@@ -0,0 +1,122 @@
+"""
+Cache Codec Microbenchmark
+
+Compares the legacy cache path (json.dumps / json.loads + MarketData(**m))
+with each CacheCodec configuration on synthetic payloads shaped like the
+closed-positions and trending-markets cache entries. Codec rows rebuild
+market lists with the bulk TypeAdapter used by PolymarketService.
+
+Usage: pipenv run python scripts/bench_cache_codec.py [--rounds 200]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.codec import CacheCodec, orjson, msgpack, zstandard
+from src.services.polymarket import MarketData, _MARKET_LIST
+
+
+def make_markets(n: int) -> list[dict]:
+    return [MarketData(
+        id=str(500000 + i),
+        question=f"Will outcome #{i} resolve YES before the end of the quarter?",
+        slug=f"will-outcome-{i}-resolve-yes",
+        volume=random.uniform(1e3, 5e7),
+        liquidity=random.uniform(1e3, 5e6),
+        yes_price=round(random.random(), 3),
+        no_price=round(random.random(), 3),
+        end_date="2026-12-31T00:00:00Z",
+        image=f"https://polymarket-upload.s3.amazonaws.com/market-{i}.png",
+        category="Politics",
+        description="Resolution source: official announcements. " * 4,
+        clob_token_id=str(random.getrandbits(250)),
+        condition_id="0x" + "%064x" % random.getrandbits(256),
+    ).model_dump() for i in range(n)]
+
+
+def make_closed_positions(n: int) -> list[dict]:
+    return [{
+        "proxyWallet": "0x" + "%040x" % random.getrandbits(160),
+        "asset": str(random.getrandbits(250)),
+        "conditionId": "0x" + "%064x" % random.getrandbits(256),
+        "avgPrice": random.random(),
+        "totalBought": random.uniform(10, 1e5),
+        "realizedPnl": random.uniform(-5e4, 5e4),
+        "curPrice": random.choice([0, 1]),
+        "timestamp": 1700000000 + i * 3600,
+        "title": f"Market title number {i} with a reasonably long question",
+        "slug": f"market-title-number-{i}",
+        "outcome": random.choice(["Yes", "No"]),
+        "outcomeIndex": random.choice([0, 1]),
+        "endDate": "2026-06-30T00:00:00Z",
+    } for i in range(n)]
+
+
+def bench(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(name: str, payload: list[dict], rounds: int, as_models: bool):
+    print(f"\n── {name} ({len(payload)} items) " + "─" * 30)
+    print(f"{'codec':<22}{'bytes':>10}{'encode µs':>12}{'decode µs':>12}")
+
+    def rebuild(obj, mode: str):
+        if not as_models:
+            return obj
+        if mode == "bulk":
+            return _MARKET_LIST.validate_python(obj)
+        factory = MarketData.model_construct if mode == "construct" else MarketData
+        return [factory(**m) for m in obj]
+
+    # Legacy path: stdlib json text + per-item Pydantic validation on every hit
+    text = json.dumps(payload)
+    enc = bench(lambda: json.dumps(payload), rounds)
+    dec = bench(lambda: rebuild(json.loads(text), "per-item"), rounds)
+    print(f"{'legacy json':<22}{len(text.encode()):>10}{enc:>12.1f}{dec:>12.1f}")
+    if as_models:
+        dec = bench(lambda: rebuild(json.loads(text), "construct"), rounds)
+        print(f"{'legacy+model_construct':<22}{len(text.encode()):>10}{'':>12}{dec:>12.1f}")
+
+    configs = [("json", 0)]
+    if orjson is not None:
+        configs.append(("orjson", 0))
+    if msgpack is not None:
+        configs.append(("msgpack", 0))
+    if zstandard is not None:
+        configs += [(fmt + "+zstd", 1) for fmt, _ in list(configs)]
+
+    for label, compress in configs:
+        codec = CacheCodec(label.split("+")[0], compress_min_bytes=compress)
+        blob = codec.encode(payload)
+        enc = bench(lambda: codec.encode(payload), rounds)
+        dec = bench(lambda: rebuild(codec.decode(blob), "bulk"), rounds)
+        print(f"{label:<22}{len(blob):>10}{enc:>12.1f}{dec:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(7)
+    print("Installed: "
+          f"orjson={'yes' if orjson else 'no'} "
+          f"msgpack={'yes' if msgpack else 'no'} "
+          f"zstandard={'yes' if zstandard else 'no'}")
+
+    run("trending markets", make_markets(50), args.rounds, as_models=True)
+    run("closed positions", make_closed_positions(100), args.rounds, as_models=False)
+    run("closed positions x30 (smart-money fan-out)", make_closed_positions(3000), max(10, args.rounds // 20), as_models=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Endpoint Load Benchmark
+
+Drives the FastAPI app from src.main:create_app in-process against the
+upstream simulator, the in-memory Redis and the in-memory Supabase, and
+reports p50/p95/p99 latency and requests/second per endpoint at several
+concurrency levels. "cold" is the median latency of a request that finds
+the cache empty.
+
+Results are compared with scripts/bench_baselines.json; the script exits
+non-zero when p95 or throughput regresses past the tolerance. Baselines
+are machine-specific: regenerate them with --update-baseline on the
+machine (or CI runner class) that runs the check.
+
+Usage: pipenv run python scripts/bench_endpoints.py [--requests 300]
+       [--concurrency 1,8,32] [--tolerance 0.3] [--update-baseline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+# Everything runs in-process: no Redis, no database, no network
+os.environ["UPSTASH_REDIS_URL"] = "memory://"
+os.environ["SUPABASE_URL"] = "memory://"
+os.environ.setdefault("SUPABASE_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "memory://")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from src.core import get_async_redis, get_supabase
+from src.core.http import set_transport_override
+from src.simulator import SimulatorConfig, SimulatorTransport, create_simulator_app
+
+BASELINE_PATH = Path(__file__).parent / "bench_baselines.json"
+
+ENDPOINTS = {
+    "markets_trending": "/api/v1/markets/trending?limit=10",
+    "squads_smart_money": "/api/v1/squads/smart-money?limit=20&min_trades=5",
+    "intel_feed": "/api/v1/intel/feed?limit=30",
+    "signals_feed": "/api/v1/signals/feed?min_score=50&limit=50",
+}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+        "rps": round(total / wall, 1),
+        "errors": errors,
+    }
+
+
+async def measure_cold(client: httpx.AsyncClient, path: str, rounds: int = 3) -> float:
+    cache = get_async_redis()
+    samples = []
+    for _ in range(rounds):
+        await cache.flushall()
+        start = time.perf_counter()
+        await client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return round(samples[len(samples) // 2], 3)
+
+
+async def run(args) -> dict:
+    sim = create_simulator_app(SimulatorConfig(
+        seed=args.seed, latency_ms=args.upstream_latency_ms, jitter_ms=args.upstream_latency_ms / 2,
+    ))
+    set_transport_override(SimulatorTransport(sim))
+    get_supabase().seed(sim.state.data, seed=args.seed)
+
+    from src.main import create_app
+    app = create_app()
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    selected = {k: v for k, v in ENDPOINTS.items() if not args.only or k in args.only.split(",")}
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+        for name, path in selected.items():
+            cold = await measure_cold(client, path)
+            await client.get(path)  # warm the cache
+            results[name] = {"cold_ms": cold, "levels": {}}
+            for c in levels:
+                results[name]["levels"][str(c)] = await run_level(client, path, args.requests, c)
+    return results
+
+
+def print_table(results: dict):
+    print(f"{'endpoint':<22}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'err':>6}{'cold ms':>10}")
+    for name, r in results.items():
+        for c, m in r["levels"].items():
+            print(f"{name:<22}{c:>6}{m['p50']:>10.2f}{m['p95']:>10.2f}{m['p99']:>10.2f}"
+                  f"{m['rps']:>10.1f}{m['errors']:>6}{r['cold_ms']:>10.1f}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Regressions: p95 slower or throughput lower than baseline by more than `tolerance`."""
+    failures = []
+    for name, r in results.items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        for c, m in r["levels"].items():
+            b = base["levels"].get(c)
+            if not b:
+                continue
+            if m["p95"] > b["p95"] * (1 + tolerance) and m["p95"] - b["p95"] > min_delta_ms:
+                failures.append(f"{name} @ {c}: p95 {m['p95']:.2f}ms vs baseline {b['p95']:.2f}ms")
+            if m["rps"] < b["rps"] * (1 - tolerance):
+                failures.append(f"{name} @ {c}: {m['rps']:.1f} rps vs baseline {b['rps']:.1f} rps")
+            if m["errors"] > b.get("errors", 0):
+                failures.append(f"{name} @ {c}: {m['errors']} errors vs baseline {b.get('errors', 0)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint per level")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--only", default="", help="comma-separated endpoint names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_table(results)
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {"endpoints": {}}
+        baseline["meta"] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "requests": args.requests,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        }
+        baseline["endpoints"].update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return
+
+    if not BASELINE_PATH.exists():
+        print("\nNo baseline found; run with --update-baseline first.")
+        return
+
+    failures = compare(results, json.loads(BASELINE_PATH.read_text()), args.tolerance, args.min_delta_ms)
+    if failures:
+        print(f"\n{len(failures)} regression(s) beyond {args.tolerance:.0%}:")
+        for f in failures:
+            print(f"  - {f}")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
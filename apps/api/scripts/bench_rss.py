@@ -0,0 +1,147 @@
+"""
+RSS/Atom Parser Benchmark
+
+Parses synthetic RSS 2.0 and Atom feeds with the streaming parser in
+src.services.feed_parser and with feedparser, checks that both extract the
+same title, link and published date, and times them per feed. It then parses
+many feeds concurrently while a ticker measures event-loop stalls, the
+latency the API would see: feedparser in the default thread pool (the old
+path) against FeedParserPool.
+
+Usage: pipenv run python scripts/bench_rss.py [--items 100] [--feeds 200] [--workers 2]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Only the parser is benchmarked, but settings must load if anything imports them
+os.environ.setdefault("UPSTASH_REDIS_URL", "memory://")
+os.environ.setdefault("SUPABASE_URL", "memory://")
+os.environ.setdefault("SUPABASE_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "memory://")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.feed_parser import FeedParserPool, parse_feedparser, parse_stream
+
+START = 1_700_000_000
+WORDS = "market election rate cut senate vote poll crypto court ruling deal talks".split()
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(8)).capitalize() + " &amp; more"
+
+
+def make_rss(n_items: int, seed: int = 3) -> bytes:
+    rng = random.Random(seed)
+    items = "".join(
+        f"<item><title>{_title(rng)}</title><link>https://news.example/{seed}/{i}</link>"
+        f"<guid isPermaLink=\"false\">{seed}-{i}</guid>"
+        f"<pubDate>{datetime.fromtimestamp(START - i * 600, tz=timezone.utc).strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>"
+        f"<category>World</category><dc:creator>Desk</dc:creator>"
+        f"<description><![CDATA[<p>{' '.join(rng.choice(WORDS) for _ in range(120))}</p>]]></description></item>"
+        for i in range(n_items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>Bench</title><link>https://news.example</link><description>Bench feed</description>{items}"
+        "</channel></rss>"
+    ).encode()
+
+
+def make_atom(n_items: int, seed: int = 5) -> bytes:
+    rng = random.Random(seed)
+    entries = "".join(
+        f"<entry><title type=\"html\">{_title(rng)}</title>"
+        f"<link rel=\"alternate\" href=\"https://atom.example/{seed}/{i}\"/>"
+        f"<link rel=\"replies\" href=\"https://atom.example/{seed}/{i}/comments\"/>"
+        f"<id>urn:bench:{seed}:{i}</id>"
+        f"<updated>{datetime.fromtimestamp(START - i * 600 + 60, tz=timezone.utc).isoformat()}</updated>"
+        f"<published>{datetime.fromtimestamp(START - i * 600, tz=timezone.utc).isoformat()}</published>"
+        f"<content type=\"html\">{' '.join(rng.choice(WORDS) for _ in range(120))}</content></entry>"
+        for i in range(n_items)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>Bench</title><id>urn:bench</id><updated>2024-01-01T00:00:00Z</updated>{entries}</feed>"
+    ).encode()
+
+
+def time_per_call(fn, content: bytes, limit: int, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(content, limit)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def loop_stall(parse_all) -> tuple[float, float]:
+    """Run `parse_all` while a 1ms ticker records the worst event-loop stall (wall, stall ms)."""
+    worst = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - before - 0.001)
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await parse_all()
+    wall = time.perf_counter() - start
+    done = True
+    await task
+    return wall * 1000, worst * 1000
+
+
+async def concurrent(feeds: list[bytes], limit: int, workers: int):
+    async def threaded():
+        await asyncio.gather(*(asyncio.to_thread(parse_feedparser, f, limit) for f in feeds))
+
+    pool = FeedParserPool(workers)
+    # Spawn the workers outside the timed run
+    await asyncio.gather(*(pool.parse(f, limit) for f in feeds[:workers]))
+
+    async def pooled():
+        await asyncio.gather(*(pool.parse(f, limit) for f in feeds))
+
+    for name, run in (("feedparser in threads", threaded), (f"FeedParserPool({workers})", pooled)):
+        wall, stall = await loop_stall(run)
+        print(f"  {name:24s} {wall:8.1f} ms total, worst loop stall {stall:6.1f} ms")
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100, help="entries per feed")
+    parser.add_argument("--feeds", type=int, default=200, help="feeds parsed concurrently")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=10, help="entries kept per feed (as in fetch_rss)")
+    args = parser.parse_args()
+
+    for name, content in (("RSS 2.0", make_rss(args.items)), ("Atom", make_atom(args.items))):
+        fast = parse_stream(content, args.items)
+        slow = parse_feedparser(content, args.items)
+        assert fast is not None, name
+        assert fast == slow, (name, next((a, b) for a, b in zip(fast, slow) if a != b))
+        print(f"{name}: {args.items} entries, {len(content) / 1024:.0f} KB, both parsers agree")
+        for limit in (args.limit, args.items):
+            stream_ms = time_per_call(parse_stream, content, limit)
+            fp_ms = time_per_call(parse_feedparser, content, limit, repeat=5)
+            print(f"  limit {limit:4d}: stream {stream_ms:7.2f} ms, feedparser {fp_ms:7.2f} ms ({fp_ms / stream_ms:5.1f}x)")
+
+    feeds = [make_rss(args.items, seed) if seed % 2 else make_atom(args.items, seed) for seed in range(args.feeds)]
+    print(f"\n{args.feeds} feeds x {args.items} entries parsed concurrently (limit {args.limit}):")
+    asyncio.run(concurrent(feeds, args.limit, args.workers))
+
+
+if __name__ == "__main__":
+    main()
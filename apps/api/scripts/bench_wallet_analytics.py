@@ -0,0 +1,99 @@
+"""
+Wallet Analytics Benchmark
+
+Times ranking N wallets with src.services.wallet_analytics (packing +
+grouped NumPy reductions) against a straightforward per-wallet Python
+loop computing the same metrics, and checks that both agree.
+
+Usage: pipenv run python scripts/bench_wallet_analytics.py [--wallets 1000] [--positions 100]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.services.wallet_analytics import PositionBatch, compute_metrics, rank_wallets
+
+
+def make_positions(wallets: int, max_positions: int, seed: int = 7) -> dict[str, list[dict]]:
+    rng = random.Random(seed)
+    data = {}
+    for w in range(wallets):
+        skill = rng.gauss(0, 15)
+        data["0x%040x" % rng.getrandbits(160)] = [{
+            "realizedPnl": rng.gauss(skill, 60),
+            "totalBought": rng.uniform(10, 2000),
+            "avgPrice": rng.uniform(0.05, 0.95),
+            "timestamp": 1_700_000_000 + rng.randint(0, 10_000_000),
+        } for _ in range(rng.randint(1, max_positions))]
+    return data
+
+
+def python_metrics(rows: list[dict]) -> dict:
+    rows = sorted(rows, key=lambda p: p["timestamp"])
+    pnl = [p["realizedPnl"] for p in rows]
+    gross_profit = sum(x for x in pnl if x > 0)
+    gross_loss = -sum(x for x in pnl if x < 0)
+    equity = peak = drawdown = 0.0
+    for x in pnl:
+        equity += x
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+    returns = [p["realizedPnl"] / (p["totalBought"] * p["avgPrice"]) for p in rows]
+    return {
+        "win_rate": sum(1 for x in pnl if x > 0) / len(pnl),
+        "profit_factor": gross_profit / gross_loss if gross_loss else None,
+        "expectancy": sum(pnl) / len(pnl),
+        "sharpe": statistics.mean(returns) / statistics.stdev(returns) if len(returns) > 1 else None,
+        "max_drawdown": drawdown,
+    }
+
+
+def best_of(fn, rounds: int) -> float:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wallets", type=int, default=1000)
+    parser.add_argument("--positions", type=int, default=100, help="max positions per wallet")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_positions(args.wallets, args.positions)
+    total = sum(len(v) for v in data.values())
+    print(f"{args.wallets} wallets, {total} positions\n")
+
+    batch = PositionBatch.from_positions(data)
+    rows = [
+        ("python loop", best_of(lambda: {w: python_metrics(r) for w, r in data.items()}, args.rounds)),
+        ("numpy pack", best_of(lambda: PositionBatch.from_positions(data), args.rounds)),
+        ("numpy metrics", best_of(lambda: compute_metrics(batch), args.rounds)),
+        ("numpy rank (end-to-end)", best_of(lambda: rank_wallets(data), args.rounds)),
+    ]
+    for name, ms in rows:
+        print(f"{name:<26}{ms:>10.2f} ms")
+
+    # Cross-check a sample against the reference loop
+    ranked = {r["address"]: r for r in rank_wallets(data)}
+    worst = 0.0
+    for wallet in list(data)[:200]:
+        ref = python_metrics(data[wallet])
+        for key in ("win_rate", "expectancy", "max_drawdown", "sharpe"):
+            if ref[key] is not None:
+                worst = max(worst, abs(ref[key] - ranked[wallet][key]))
+    print(f"\nmax abs difference vs reference: {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
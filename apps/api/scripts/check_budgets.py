@@ -0,0 +1,367 @@
+"""
+Upstream-Call and DB-Query Budget Check
+
+Runs each public endpoint and each tracker background cycle in-process
+(upstream simulator, in-memory Redis and Supabase) at a small and a large
+scale, counting HTTP requests per upstream host and Supabase queries per
+table. Every scenario declares budgets; a budget is either a constant or
+a function of the scale, so a change that turns an O(1) call pattern into
+O(n) fails at the large scale. Exits non-zero on any violation.
+
+Usage: pipenv run python scripts/check_budgets.py [-v]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Union
+
+# Everything runs in-process: no Redis, no database, no network
+os.environ["UPSTASH_REDIS_URL"] = "memory://"
+os.environ["SUPABASE_URL"] = "memory://"
+os.environ.setdefault("SUPABASE_KEY", "budget")
+os.environ.setdefault("DATABASE_URL", "memory://")
+os.environ["WAREHOUSE_DIR"] = tempfile.mkdtemp(prefix="budget-warehouse-")
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from src.core import get_async_redis, get_supabase
+from src.core.http import set_transport_override
+from src.simulator import SimulatorConfig, SimulatorTransport, create_simulator_app
+
+Budget = Union[int, Callable[[int], int]]
+
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """Counts requests per upstream host before handing them to `inner`."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+        self.calls: Counter = Counter()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls[request.url.host] += 1
+        return await self.inner.handle_async_request(request)
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: Callable[["Harness", int], Awaitable[None]]
+    budgets: dict[str, Budget]
+    scales: tuple[int, ...] = (2, 20)
+    # Seeding knobs derived from the scale
+    seed_kwargs: Callable[[int], dict] = field(default=lambda n: {})
+
+
+class Harness:
+    def __init__(self):
+        self.sim = create_simulator_app(SimulatorConfig())
+        self.transport = CountingTransport(SimulatorTransport(self.sim))
+        set_transport_override(self.transport)
+        self.db = get_supabase()
+
+        from src.main import create_app
+        self.app = create_app()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://budget")
+
+    async def reset(self, **seed_kwargs):
+        await get_async_redis().flushall()
+        self.db.tables.clear()
+        self.db.seed(self.sim.state.data, **seed_kwargs)
+        from src.services.notifications import get_notification_service
+        get_notification_service()._contacts.clear()
+
+    def start_counting(self):
+        self.transport.calls.clear()
+        self.db.reset_counters()
+
+    def counts(self) -> Counter:
+        out = Counter()
+        for host, n in self.transport.calls.items():
+            out[f"http:{host}"] += n
+            out["http:*"] += n
+        for table, n in self.db.queries.items():
+            out[f"db:{table}"] += n
+            out["db:*"] += n
+        return out
+
+    async def get(self, path: str, user_id: str | None = None):
+        headers = {"Authorization": f"Bearer {user_id}"} if user_id else {}
+        response = await self.client.get(path, headers=headers)
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {path} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+
+# ── Scenarios ────────────────────────────────────────────────────
+
+async def markets_trending(h: Harness, n: int):
+    await h.get(f"/api/v1/markets/trending?limit={min(n, 50)}")
+
+
+async def squads_list(h: Harness, n: int):
+    user_id = h.db.tables["users"][0]["id"]
+    await h.get("/api/v1/squads/", user_id=user_id)
+
+
+async def signals_feed(h: Harness, n: int):
+    await h.get(f"/api/v1/signals/feed?limit={min(n * 5, 200)}")
+
+
+async def intel_feed(h: Harness, n: int):
+    await h.get(f"/api/v1/intel/feed?limit={min(n * 2, 100)}")
+
+
+async def intel_feed_warm(h: Harness, n: int):
+    # The canonical feed serves every limit, filter and page without touching a source
+    await h.get("/api/v1/intel/feed")
+    h.start_counting()
+    filters = ("all", "rising", "hot", "bullish", "bearish")
+    cursor = None
+    for i in range(n):
+        query = f"limit={i + 1}&filter={filters[i % len(filters)]}&kind={('all', 'news')[i % 2]}"
+        page = (await h.get(f"/api/v1/intel/feed?{query}" + (f"&cursor={cursor}" if cursor else ""))).json()
+        cursor = page["next_cursor"]
+
+
+async def intel_refresh_warm(h: Harness, n: int):
+    # Background refreshes within every source's TTL make no upstream requests
+    from src.services.intel import get_intel_service
+    await get_intel_service().refresh(force=True)
+    h.start_counting()
+    for _ in range(n):
+        await get_intel_service().refresh()
+
+
+async def smart_money_cold(h: Harness, n: int):
+    await h.get(f"/api/v1/squads/smart-money?limit={n}")
+
+
+async def smart_money_warm(h: Harness, n: int):
+    # Prime outside the counted window; other parameters must reuse the same table
+    await h.get("/api/v1/squads/smart-money")
+    h.start_counting()
+    for min_trades in range(n):
+        await h.get(f"/api/v1/squads/smart-money?limit={n}&min_trades={min_trades}")
+
+
+async def smart_money_stampede(h: Harness, n: int):
+    # n concurrent cold requests with different parameters compute the table once
+    await asyncio.gather(*(
+        h.get(f"/api/v1/squads/smart-money?limit={i + 1}&min_trades={i % 5}") for i in range(n)
+    ))
+
+
+async def tracker_wallet_cycle(h: Harness, n: int):
+    from src.services.tracker import get_tracker
+    tracker = get_tracker()
+
+    # First cycle seeds the last-seen trade per wallet (not counted)
+    await tracker._monitor_wallets()
+
+    # Rewind each cursor a few trades so the counted cycle sees new activity
+    cache = get_async_redis()
+    wallets = {t["wallet_address"] for t in h.db.tables["tracked_targets"]}
+    data = h.sim.state.data
+    for wallet in wallets:
+        trades = data.wallet_trades(wallet, limit=4)
+        if len(trades) == 4:
+            await cache.set(f"tracker:last_trade:{wallet}", trades[3]["transactionHash"])
+
+    h.start_counting()
+    await tracker._monitor_wallets()
+
+
+async def tracker_price_cycle(h: Harness, n: int):
+    from src.services.tracker import get_tracker
+    await get_tracker()._monitor_prices()
+
+
+async def radar_cycle(h: Harness, n: int):
+    from src.services.radar import get_radar_pipeline
+    await get_radar_pipeline().run_cycle()
+
+
+async def squad_positions_cold(h: Harness, n: int):
+    user_id = h.db.tables["users"][0]["id"]
+    squad_id = h.db.tables["squads"][0]["id"]
+    await h.get(f"/api/v1/squads/{squad_id}/positions", user_id=user_id)
+
+
+async def squad_positions_warm(h: Harness, n: int):
+    # Books and marks built outside the counted window are served from Redis
+    user_id = h.db.tables["users"][0]["id"]
+    squad_id = h.db.tables["squads"][0]["id"]
+    await h.get(f"/api/v1/squads/{squad_id}/positions", user_id=user_id)
+    h.start_counting()
+    await h.get(f"/api/v1/squads/{squad_id}/positions", user_id=user_id)
+
+
+async def backtest_configs(h: Harness, n: int):
+    # First run fetches history and price histories; other configs reuse both
+    wallet = h.db.tables["tracked_targets"][0]["wallet_address"]
+    await h.get(f"/api/v1/squads/wallets/{wallet}/backtest")
+    h.start_counting()
+    for i in range(n):
+        await h.get(f"/api/v1/squads/wallets/{wallet}/backtest?min_trade_size={i * 100}&delay_seconds={i * 30}")
+
+
+async def correlations_refresh(h: Harness, n: int):
+    from src.services.correlations import get_market_correlations
+    await get_market_correlations().refresh()
+
+
+async def correlations_read(h: Harness, n: int):
+    # Neighbours computed outside the counted window; a watchlist reads them in one query
+    from src.services.correlations import get_market_correlations
+    await get_market_correlations().refresh()
+    rows = h.db.tables["market_correlations"]
+    h.start_counting()
+    await h.get(f"/api/v1/markets/correlations?market_ids={','.join(r['market_id'] for r in rows[:n])}")
+
+
+async def backtest_warehouse(h: Harness, n: int):
+    # After the result caches expire, history is read from the local warehouse
+    # topped up with one Data API page, instead of being re-downloaded
+    wallet = h.db.tables["tracked_targets"][0]["wallet_address"]
+    await h.get(f"/api/v1/squads/wallets/{wallet}/backtest")
+    for i in range(n):
+        await get_async_redis().flushall()
+        h.start_counting()
+        await h.get(f"/api/v1/squads/wallets/{wallet}/backtest?delay_seconds={i * 30}")
+
+
+def _alert_seed(n: int) -> dict:
+    return {"users": n, "squads_per_user": 1, "targets_per_squad": 3, "alert_channels": ["in-app", "telegram"]}
+
+
+SCENARIOS = [
+    Scenario("GET /markets/trending", markets_trending, {"http:gamma-api.polymarket.com": 1, "http:*": 1}),
+    Scenario(
+        "GET /squads/", squads_list,
+        {"db:squads": 1, "db:tracked_targets": 1, "http:*": 0},
+        seed_kwargs=lambda n: {"users": 3, "squads_per_user": n},
+    ),
+    Scenario("GET /signals/feed", signals_feed, {"db:insider_signals": 1, "db:*": 1, "http:*": 0}),
+    Scenario(
+        "GET /intel/feed (cold)", intel_feed,
+        {"http:api.gdeltproject.org": 1, "http:cryptopanic.com": 1, "http:*": 5, "db:*": 0},
+    ),
+    Scenario("GET /intel/feed (warm)", intel_feed_warm, {"http:*": 0, "db:*": 0}),
+    Scenario("intel refresh (sources fresh)", intel_refresh_warm, {"http:*": 0}),
+    # Leaderboard + closed positions for at most 50 candidates, independent of `limit`;
+    # category lookups for their markets are one batched Gamma call per 50 markets
+    Scenario(
+        "GET /squads/smart-money (cold)", smart_money_cold,
+        {"http:data-api.polymarket.com": 51, "http:gamma-api.polymarket.com": 5, "db:*": 0},
+    ),
+    Scenario("GET /squads/smart-money (warm)", smart_money_warm, {"http:*": 0, "db:*": 0}),
+    Scenario("GET /squads/smart-money (cold, concurrent)", smart_money_stampede, {"http:data-api.polymarket.com": 51}),
+    # History replay is paged and capped per wallet; one price call per distinct open token
+    Scenario(
+        "GET /squads/{id}/positions (cold)", squad_positions_cold,
+        {"http:data-api.polymarket.com": lambda n: 20 * n, "db:squads": 1, "db:tracked_targets": 1},
+        seed_kwargs=lambda n: {"users": 1, "squads_per_user": 1, "targets_per_squad": n},
+    ),
+    Scenario(
+        "GET /squads/{id}/positions (warm)", squad_positions_warm,
+        {"http:*": 0, "db:*": 2},
+        seed_kwargs=lambda n: {"users": 1, "squads_per_user": 1, "targets_per_squad": n},
+    ),
+    Scenario("GET /squads/wallets/{addr}/backtest (config sweep)", backtest_configs, {"http:*": 0, "db:*": 0}),
+    Scenario(
+        "GET /squads/wallets/{addr}/backtest (warehouse)", backtest_warehouse,
+        {"http:data-api.polymarket.com": 1, "db:*": 0},
+    ),
+    # Watched markets resolved in batches of 50; one price history per distinct market
+    Scenario(
+        "correlations refresh", correlations_refresh,
+        {
+            "db:watchlists": 1,
+            "db:market_correlations": 2,
+            "http:gamma-api.polymarket.com": lambda n: 1 + 8 * n // 50,
+            "http:clob.polymarket.com": lambda n: 8 * n,
+        },
+        seed_kwargs=lambda n: {"users": n},
+    ),
+    Scenario("GET /markets/correlations", correlations_read, {"db:*": 1, "http:*": 0}),
+    Scenario(
+        "tracker wallet cycle", tracker_wallet_cycle,
+        {
+            "db:tracked_targets": 1,
+            # One trades call per distinct tracked wallet is inherent
+            "http:data-api.polymarket.com": lambda n: 3 * n,
+            # Contact lookups: at most once per user, not once per message
+            "db:users": lambda n: n,
+        },
+        seed_kwargs=_alert_seed,
+    ),
+    Scenario(
+        "tracker price cycle", tracker_price_cycle,
+        {
+            # One read, plus one last_triggered_at update per fired alert
+            "db:price_alerts": lambda n: 1 + n,
+            "http:clob.polymarket.com": lambda n: n,
+            "db:users": lambda n: n,
+        },
+        seed_kwargs=lambda n: {"users": n},
+    ),
+    Scenario(
+        "radar cycle", radar_cycle,
+        {
+            # One feed page plus capped wallet-age lookups, however many trades arrive
+            "http:data-api.polymarket.com": 1 + 25,
+            # Market features in batches of 50
+            "http:gamma-api.polymarket.com": 5,
+            # All signals of a cycle in one insert
+            "db:insider_signals": 1,
+        },
+    ),
+]
+
+
+async def main(verbose: bool) -> int:
+    h = Harness()
+    failures = []
+
+    for scenario in SCENARIOS:
+        for n in scenario.scales:
+            await h.reset(**scenario.seed_kwargs(n))
+            h.start_counting()
+            await scenario.run(h, n)
+            counts = h.counts()
+
+            violations = []
+            for key, budget in scenario.budgets.items():
+                limit = budget(n) if callable(budget) else budget
+                if counts[key] > limit:
+                    violations.append(f"{key}={counts[key]} > {limit}")
+
+            status = "FAIL" if violations else "ok"
+            print(f"[{status:>4}] {scenario.name} (n={n})" + (f": {', '.join(violations)}" if violations else ""))
+            if verbose:
+                for key, value in sorted(counts.items()):
+                    print(f"         {key}: {value}")
+            failures.extend(f"{scenario.name} (n={n}): {v}" for v in violations)
+
+    await h.client.aclose()
+    if failures:
+        print(f"\n{len(failures)} budget violation(s)")
+        return 1
+    print("\nAll budgets respected.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every counter")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.verbose)))
@@ -1,7 +1,7 @@
 """Core module initialization."""
 from src.core.config import get_settings, Settings
 from src.core.database import get_db, get_supabase
-from src.core.cache import get_cache, get_redis, get_async_cache, get_async_redis
+from src.core.cache import get_cache, get_redis, get_async_cache, get_async_redis, get_payload_cache
 
 __all__ = [
     "get_settings",
@@ -12,4 +12,5 @@ __all__ = [
     "get_redis",
     "get_async_cache",
     "get_async_redis",
+    "get_payload_cache",
 ]
@@ -1,9 +1,19 @@
+from typing import Any
+
 import redis
 import redis.asyncio as async_redis
 from src.core.config import get_settings
+from src.core.codec import CacheCodec
 
 _redis_client: redis.Redis | None = None
 _async_redis_client: async_redis.Redis | None = None
+_async_binary_redis_client: async_redis.Redis | None = None
+_payload_cache: "PayloadCache | None" = None
+
+
+def _memory_url(url: str) -> bool:
+    """UPSTASH_REDIS_URL=memory:// selects the in-process store (local runs, benchmarks)."""
+    return url.startswith("memory://")
 
 
 def get_redis() -> redis.Redis:
@@ -28,6 +38,10 @@ def get_async_redis() -> async_redis.Redis:
     
     if _async_redis_client is None:
         settings = get_settings()
+        if _memory_url(settings.upstash_redis_url):
+            from src.simulator.memory_redis import MemoryRedis
+            _async_redis_client = MemoryRedis(decode_responses=True)
+            return _async_redis_client
         _async_redis_client = async_redis.from_url(
             settings.upstash_redis_url,
             decode_responses=True,
@@ -38,6 +52,71 @@ def get_async_redis() -> async_redis.Redis:
     return _async_redis_client
 
 
+def get_async_binary_redis() -> async_redis.Redis:
+    """Get or create Async Redis client singleton that returns raw bytes."""
+    global _async_binary_redis_client
+    
+    if _async_binary_redis_client is None:
+        settings = get_settings()
+        if _memory_url(settings.upstash_redis_url):
+            from src.simulator.memory_redis import MemoryRedis
+            _async_binary_redis_client = MemoryRedis(decode_responses=False)
+            return _async_binary_redis_client
+        _async_binary_redis_client = async_redis.from_url(
+            settings.upstash_redis_url,
+            decode_responses=False,
+            socket_timeout=5.0,
+            ssl_cert_reqs="none" if "rediss://" in settings.upstash_redis_url else None
+        )
+    
+    return _async_binary_redis_client
+
+
+class PayloadCache:
+    """
+    Async cache for structured payloads (lists/dicts).
+
+    Mirrors the Redis get/setex API but takes and returns Python objects,
+    encoded with the configured CacheCodec.
+    """
+    
+    def __init__(self, client: async_redis.Redis, codec: CacheCodec):
+        self.client = client
+        self.codec = codec
+    
+    async def get(self, key: str) -> Any:
+        data = await self.client.get(key)
+        if data is None:
+            return None
+        return self.codec.decode(data)
+    
+    async def mget(self, keys: list[str]) -> list[Any]:
+        if not keys:
+            return []
+        return [None if data is None else self.codec.decode(data) for data in await self.client.mget(keys)]
+
+    async def setex(self, key: str, ttl: int, value: Any):
+        await self.client.setex(key, ttl, self.codec.encode(value))
+    
+    async def set(self, key: str, value: Any):
+        await self.client.set(key, self.codec.encode(value))
+    
+    async def delete(self, *keys: str):
+        await self.client.delete(*keys)
+
+
+def get_payload_cache() -> PayloadCache:
+    """Get or create the structured payload cache singleton."""
+    global _payload_cache
+    
+    if _payload_cache is None:
+        settings = get_settings()
+        codec = CacheCodec(settings.cache_codec, settings.cache_compress_min_bytes)
+        _payload_cache = PayloadCache(get_async_binary_redis(), codec)
+    
+    return _payload_cache
+
+
 def get_cache() -> redis.Redis:
     return get_redis()
 
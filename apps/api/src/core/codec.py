@@ -0,0 +1,102 @@
+"""
+Foresynth API - Cache Codec
+
+Pluggable serialization for cached payloads. Supports stdlib json,
+orjson and msgpack, with optional zstd compression above a size
+threshold. orjson, msgpack and zstandard are optional; a missing
+package falls back to stdlib json / no compression.
+
+Wire format: one tag byte followed by the body. The low bits of the
+tag select the format, the high bit marks zstd compression. Values
+without a tag (first byte is printable) are legacy plain-JSON entries
+and are still decoded.
+"""
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+TAG_JSON = 0x01
+TAG_MSGPACK = 0x02
+FLAG_ZSTD = 0x80
+
+
+def _json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheCodec:
+    """Encode/decode cache payloads in the configured format."""
+
+    def __init__(self, fmt: str = "json", compress_min_bytes: int = 0, level: int = 3):
+        if fmt == "msgpack" and msgpack is None:
+            print("CacheCodec: msgpack not installed, falling back to json")
+            fmt = "json"
+        if fmt == "orjson" and orjson is None:
+            print("CacheCodec: orjson not installed, falling back to json")
+        if compress_min_bytes and zstandard is None:
+            print("CacheCodec: zstandard not installed, compression disabled")
+            compress_min_bytes = 0
+
+        self.fmt = fmt
+        self.compress_min_bytes = compress_min_bytes
+        self._compressor = zstandard.ZstdCompressor(level=level) if compress_min_bytes else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, obj: Any) -> bytes:
+        if self.fmt == "msgpack":
+            tag, body = TAG_MSGPACK, msgpack.packb(obj, use_bin_type=True)
+        else:
+            # "json" and "orjson" share a wire format; orjson is used whenever installed
+            tag, body = TAG_JSON, _json_dumps(obj)
+
+        if self._compressor is not None and len(body) >= self.compress_min_bytes:
+            tag |= FLAG_ZSTD
+            body = self._compressor.compress(body)
+
+        return bytes((tag,)) + body
+
+    def decode(self, data: bytes | str) -> Any:
+        if isinstance(data, str):
+            data = data.encode()
+        if not data:
+            return None
+
+        tag = data[0]
+        if tag >= 0x20 and not tag & FLAG_ZSTD:
+            # Legacy entry written as plain JSON text
+            return _json_loads(data)
+
+        body = data[1:]
+        if tag & FLAG_ZSTD:
+            if self._decompressor is None:
+                raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+            body = self._decompressor.decompress(body)
+
+        fmt = tag & ~FLAG_ZSTD
+        if fmt == TAG_MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack cache entry but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        return _json_loads(body)
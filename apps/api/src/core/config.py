@@ -20,6 +20,10 @@ class Settings(BaseSettings):
     # Upstash Redis
     upstash_redis_url: str
     
+    # Cache serialization: json | orjson | msgpack; compress payloads >= N bytes with zstd (0 = off)
+    cache_codec: str = "orjson"
+    cache_compress_min_bytes: int = 0
+    
     # External APIs
     polymarket_api_key: str = ""
     polymarket_api_secret: str = ""
@@ -27,6 +31,28 @@ class Settings(BaseSettings):
     telegram_bot_token: str = ""
     telegram_webhook_secret: str = ""
     
+    # Upstream base URLs (point these at src.simulator for local load tests)
+    gamma_api_base: str = "https://gamma-api.polymarket.com"
+    clob_api_base: str = "https://clob.polymarket.com"
+    data_api_base: str = "https://data-api.polymarket.com"
+    cryptopanic_api_base: str = "https://cryptopanic.com/api/v1"
+    gdelt_api_base: str = "https://api.gdeltproject.org/api/v2"
+    telegram_api_base: str = "https://api.telegram.org"
+    rss_feed_base: str = ""  # if set, RSS feeds are fetched from <base>/<feed-slug>.xml
+    rss_parse_workers: int = 2  # processes parsing large RSS/Atom feeds
+    
+    # HTTP fixtures: off | record | replay
+    http_fixtures_mode: str = "off"
+    http_fixtures_dir: str = "fixtures/http"
+    
+    # Whale detector sharding: each process scores markets with crc32(conditionId) % count == index
+    whale_shard_count: int = 1
+    whale_shard_index: int = 0
+    
+    # Trade warehouse: day-partitioned Parquet under this directory (empty = off; needs pyarrow)
+    warehouse_dir: str = ""
+    warehouse_retention_days: int = 400
+    
     # Server
     debug: bool = True
     api_prefix: str = "/api/v1"
@@ -15,6 +15,11 @@ def get_supabase() -> Client:
     
     if _supabase_client is None:
         settings = get_settings()
+        if settings.supabase_url.startswith("memory://"):
+            # In-process tables for local runs and benchmarks
+            from src.simulator.supabase import MemorySupabase
+            _supabase_client = MemorySupabase()
+            return _supabase_client
         _supabase_client = create_client(
             settings.supabase_url,
             settings.supabase_key
@@ -0,0 +1,153 @@
+"""
+Foresynth API - HTTP Client Factory
+
+Every outbound httpx client is created through `get_http_client` so the
+transport can be swapped without touching call sites:
+
+- HTTP_FIXTURES_MODE=record: real calls, each response saved as a fixture
+- HTTP_FIXTURES_MODE=replay: responses served from fixtures, no network
+- set_transport_override(): in-process transport (simulator, counters)
+"""
+import base64
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+
+from src.core.config import get_settings
+
+_transport_override: httpx.AsyncBaseTransport | None = None
+_fixture_transport: "RecordReplayTransport | None" = None
+
+# Query parameters that never take part in fixture matching
+_VOLATILE_PARAMS = {"auth_token", "api_key"}
+
+# Secrets carried in the path (Telegram: /bot<token>/sendMessage)
+_PATH_SECRETS = re.compile(r"^/bot[^/]+")
+
+
+def _redacted_path(url: httpx.URL) -> str:
+    return _PATH_SECRETS.sub("/botREDACTED", url.path)
+
+
+def _redacted_url(url: httpx.URL) -> str:
+    """URL as stored in a fixture: no path secrets or volatile parameters."""
+    params = [(k, v) for k, v in url.params.multi_items() if k not in _VOLATILE_PARAMS]
+    return str(url.copy_with(path=_redacted_path(url), query=urlencode(params).encode() or None))
+
+
+def fixture_key(request: httpx.Request) -> str:
+    """Stable key for a request: method, host, redacted path, sorted query and body hash."""
+    params = sorted(
+        (k, v) for k, v in request.url.params.multi_items() if k not in _VOLATILE_PARAMS
+    )
+    body = request.content or b""
+    parts = [
+        request.method,
+        request.url.host,
+        _redacted_path(request.url),
+        urlencode(params),
+        hashlib.sha1(body).hexdigest() if body else "",
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that records responses to JSON fixtures or replays them.
+
+    Fixtures live at <dir>/<host>/<key>.json. Replay of an unknown request
+    raises httpx.ConnectError, which callers already handle as an upstream
+    failure.
+    """
+
+    def __init__(self, mode: str, directory: str, inner: httpx.AsyncBaseTransport | None = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown fixtures mode: {mode}")
+        self.mode = mode
+        self.directory = Path(directory)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    def _path(self, request: httpx.Request) -> Path:
+        return self.directory / (request.url.host or "local") / f"{fixture_key(request)}.json"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = self._path(request)
+
+        if self.mode == "replay":
+            if not path.exists():
+                raise httpx.ConnectError(f"No fixture for {request.method} {request.url}", request=request)
+            fixture = json.loads(path.read_text(encoding="utf-8"))
+            return httpx.Response(
+                status_code=fixture["status"],
+                headers=fixture["headers"],
+                content=base64.b64decode(fixture["body"]),
+                request=request,
+            )
+
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "request": {"method": request.method, "url": _redacted_url(request.url)},
+            "status": response.status_code,
+            "headers": {
+                k: v for k, v in response.headers.items()
+                if k.lower() in ("content-type", "etag", "last-modified", "retry-after")
+            },
+            "body": base64.b64encode(body).decode(),
+        }, indent=2), encoding="utf-8")
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            content=body,
+            request=request,
+        )
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def set_transport_override(transport: httpx.AsyncBaseTransport | None):
+    """Route every client created by get_http_client through `transport` (None to reset)."""
+    global _transport_override
+    _transport_override = transport
+
+
+def get_transport() -> httpx.AsyncBaseTransport | None:
+    """Transport for new clients, or None for httpx's default."""
+    global _fixture_transport
+
+    if _transport_override is not None:
+        return _transport_override
+
+    settings = get_settings()
+    if settings.http_fixtures_mode == "off":
+        return None
+
+    if _fixture_transport is None:
+        _fixture_transport = RecordReplayTransport(settings.http_fixtures_mode, settings.http_fixtures_dir)
+    return _fixture_transport
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Wraps a shared transport so closing one client doesn't close it for all."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.inner.handle_async_request(request)
+
+
+def get_http_client(**kwargs) -> httpx.AsyncClient:
+    """Create an httpx.AsyncClient wired to the configured transport."""
+    transport = get_transport()
+    if transport is not None and "transport" not in kwargs:
+        kwargs["transport"] = _SharedTransport(transport)
+    return httpx.AsyncClient(**kwargs)
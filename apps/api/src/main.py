@@ -10,6 +10,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from src.core.config import get_settings
 from src.routers import markets, watchlists, squads, signals, intel, notifications, telegram, agent
 from src.services.tracker import get_tracker
+from src.services.smart_money import get_smart_money_service
+from src.services.radar import get_radar_pipeline
+from src.services.whales import get_whale_detector
+from src.services.correlations import get_market_correlations
+from src.services.warehouse import get_trade_warehouse
+from src.services.intel import get_intel_service
 
 
 @asynccontextmanager
@@ -19,15 +25,45 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     print(f"🚀 Foresynth API starting in {'DEBUG' if settings.debug else 'PROD'} mode")
     
+    # Local trade store the tracker and radar append to
+    warehouse = get_trade_warehouse()
+    await warehouse.start()
+    
     # Start Tactical Tracker Engine
     tracker = get_tracker()
     await tracker.start()
     
+    # Keep the smart-money table warm
+    smart_money = get_smart_money_service()
+    await smart_money.start()
+    
+    # Anomaly Radar: score the global trade flow into insider_signals
+    radar = get_radar_pipeline()
+    await radar.start()
+    
+    # Whale detector for this process's market shard
+    whales = get_whale_detector()
+    await whales.start()
+    
+    # Correlated neighbours of watched markets
+    correlations = get_market_correlations()
+    await correlations.start()
+    
+    # Intel feed prefetch: requests only read the snapshot
+    intel = get_intel_service()
+    await intel.start()
+    
     yield
     
     # Shutdown
     print("👋 Foresynth API shutting down")
     await tracker.stop()
+    await smart_money.stop()
+    await radar.stop()
+    await whales.stop()
+    await correlations.stop()
+    await intel.stop()
+    await warehouse.stop()
 
 
 def create_app() -> FastAPI:
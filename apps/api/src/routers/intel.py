@@ -3,15 +3,16 @@ Foresynth API - Intel Router (News Aggregation)
 
 Endpoints for fetching news/intel feed.
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 import httpx
+import math
 
-from src.services.intel import IntelService
+from src.services.intel import get_intel_service
 
 router = APIRouter()
-intel_service = IntelService()
+intel_service = get_intel_service()
 
 
 class IntelItem(BaseModel):
@@ -23,25 +24,46 @@ class IntelItem(BaseModel):
     published_at: str
     domain: Optional[str] = None
     kind: Optional[str] = None  # news, media
+    sources: list[str] = []  # every source carrying the story
+    tags: list[str] = []  # rising, hot, bullish, bearish
+    cluster_size: int = 1  # near-duplicate reports merged into the story
 
 
 class IntelFeedResponse(BaseModel):
     """Response model for intel feed."""
     items: list[IntelItem]
     count: int
+    next_cursor: Optional[str] = None
 
 
 @router.get("/feed", response_model=IntelFeedResponse)
 async def get_intel_feed(
-    filter: str = Query("all", description="Filter: all, rising, hot, bullish, bearish"),
-    kind: str = Query("all", description="Kind: all, news, media"),
+    filter: Literal["all", "rising", "hot", "bullish", "bearish"] = Query("all"),
+    kind: Literal["all", "news", "media"] = Query("all"),
+    source: Optional[str] = Query(None, description="Source name, e.g. 'BBC News'"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     limit: int = Query(30, ge=1, le=100),
 ):
     """
     Get aggregated news/intel feed from multiple sources:
     CryptoPanic, GDELT, and major RSS feeds.
+
+    Served from one canonical, deduplicated feed; every filter and page
+    is a read of the same prefetched data.
     """
-    items_raw = await intel_service.get_aggregated_feed(limit=limit)
+    # Cursors are feed scores; anything else would reach Redis as a bad range bound
+    after = None
+    if cursor is not None:
+        try:
+            after = float(cursor)
+            if not math.isfinite(after):
+                raise ValueError(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    items_raw, next_cursor = await intel_service.get_feed(
+        limit=limit, cursor=after, kind=kind, source=source, filter=filter
+    )
     
     items = []
     for p in items_raw:
@@ -52,10 +74,13 @@ async def get_intel_feed(
             url=p.get("url", ""),
             published_at=p.get("published_at", ""),
             domain=p.get("domain", ""),
-            kind=p.get("kind", "news")
+            kind=p.get("kind", "news"),
+            sources=p.get("sources", []),
+            tags=p.get("tags", []),
+            cluster_size=p.get("cluster_size", 1),
         ))
     
-    return IntelFeedResponse(items=items, count=len(items))
+    return IntelFeedResponse(items=items, count=len(items), next_cursor=next_cursor)
 
 
 @router.get("/sources")
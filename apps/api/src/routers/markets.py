@@ -5,13 +5,19 @@ Endpoints for fetching and searching Polymarket markets.
 """
 from fastapi import APIRouter, Query, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Literal
 import httpx
 
-router = APIRouter()
+from src.core.http import get_http_client
+from src.services.polymarket import get_polymarket_service, GAMMA_API_BASE
+from src.services.normalizer import normalize_markets
+from src.services.downsample import DOWNSAMPLERS
+from src.services.candles import get_candle_aggregator
+from src.services.flow import get_flow_aggregator
+from src.services.correlations import get_market_correlations
 
-# Polymarket Gamma API base URL
-GAMMA_API_BASE = "https://gamma-api.polymarket.com"
+router = APIRouter()
+pm_service = get_polymarket_service()
 
 
 class Market(BaseModel):
@@ -34,6 +40,30 @@ class MarketSearchResponse(BaseModel):
     count: int
 
 
+class PriceHistoryResponse(BaseModel):
+    """Downsampled price history as column arrays (t = unix seconds, p = price)."""
+    market_id: str
+    token_id: str
+    interval: str
+    t: list[int]
+    p: list[float]
+    count: int
+
+
+class CandleResponse(BaseModel):
+    """OHLCV candles as column arrays (t = bucket start, v = USD volume, n = trade count)."""
+    market_id: str
+    resolution: str
+    t: list[int]
+    o: list[float]
+    h: list[float]
+    l: list[float]
+    c: list[float]
+    v: list[float]
+    n: list[int]
+    count: int
+
+
 @router.get("/search", response_model=MarketSearchResponse)
 async def search_markets(
     q: str = Query(..., min_length=1, description="Search query"),
@@ -47,7 +77,7 @@ async def search_markets(
     """
     try:
         # Fetch a larger batch of active events to search within
-        async with httpx.AsyncClient() as client:
+        async with get_http_client() as client:
             response = await client.get(
                 f"{GAMMA_API_BASE}/events",
                 params={
@@ -60,61 +90,17 @@ async def search_markets(
                 timeout=10.0
             )
             response.raise_for_status()
-            data = response.json()
     except httpx.HTTPError as e:
         print(f"Polymarket API error: {e}")
         return MarketSearchResponse(markets=[], count=0)
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return MarketSearchResponse(markets=[], count=0)
     
     # Filter locally in Python
     query = q.lower()
-    matches = []
-    
-    for m in data:
-        try:
-            question = m.get("question", "") or m.get("title", "")
-            slug = m.get("slug", "")
-            # Events might have description?
-            
-            # Weighted search matching
-            text_corpus = f"{question} {slug}".lower()
-            
-            if query in text_corpus:
-                # Handle mixed volume types
-                vol_raw = m.get("volume", 0)
-                volume = float(vol_raw) if vol_raw else 0.0
-
-                # Handle outcomePrices (can be list or JSON string)
-                prices_raw = m.get("outcomePrices")
-                if isinstance(prices_raw, str):
-                    try:
-                        prices = json.loads(prices_raw)
-                    except:
-                        prices = [0.5, 0.5]
-                elif isinstance(prices_raw, list):
-                    prices = prices_raw
-                else:
-                    prices = [0.5, 0.5]
-
-                yes_price = float(prices[0]) if prices and len(prices) > 0 else 0.5
-                no_price = float(prices[1]) if prices and len(prices) > 1 else 0.5
-                
-                matches.append(Market(
-                    id=str(m.get("id", "")), # Force ID to string
-                    question=question,
-                    slug=slug,
-                    volume=volume,
-                    liquidity=float(m.get("liquidity", 0) or 0),
-                    yes_price=yes_price,
-                    no_price=no_price,
-                    end_date=m.get("endDate"),
-                    image=m.get("image"),
-                    category="Event" # Events usually have implicit category
-                ))
-        except Exception:
-            continue
+    matches = [
+        Market(**m.model_dump())
+        for m in normalize_markets(response.content, default_category="Event")
+        if query in f"{m.question} {m.slug}".lower()
+    ]
             
     # Apply limit after filtering
     return MarketSearchResponse(markets=matches[:limit], count=len(matches))
@@ -124,7 +110,7 @@ async def search_markets(
 async def get_trending_markets(limit: int = Query(10, ge=1, le=50)):
     """Get top trending markets (events) by volume."""
     try:
-        async with httpx.AsyncClient() as client:
+        async with get_http_client() as client:
             response = await client.get(
                 f"{GAMMA_API_BASE}/events",
                 params={
@@ -137,81 +123,161 @@ async def get_trending_markets(limit: int = Query(10, ge=1, le=50)):
                 timeout=10.0
             )
             response.raise_for_status()
-            data = response.json()
     except httpx.HTTPError as e:
         print(f"Polymarket trending error: {e}")
         return {"markets": []}
     
     # Sort locally by volume (double check)
-    markets = []
-    for m in data:
-        try:
-            # Handle mixed volume types (string/number)
-            vol_raw = m.get("volume", 0)
-            volume = float(vol_raw) if vol_raw else 0.0
-
-            # Handle outcomePrices (can be list or JSON string)
-            prices_raw = m.get("outcomePrices")
-            if isinstance(prices_raw, str):
-                try:
-                    prices = json.loads(prices_raw)
-                except:
-                    prices = [0.5, 0.5]
-            elif isinstance(prices_raw, list):
-                prices = prices_raw
-            else:
-                prices = [0.5, 0.5]
-
-            # Ensure prices has elements
-            yes_price = float(prices[0]) if prices and len(prices) > 0 else 0.5
-            
-            # Get No price
-            no_price = float(prices[1]) if prices and len(prices) > 1 else 0.5
-            
-            markets.append({
-                "id": str(m.get("id")),
-                "question": m.get("question") or m.get("title", "Untitled"),
-                "slug": m.get("slug", ""),
-                "volume": volume,
-                "liquidity": float(m.get("liquidity", 0) or 0),
-                "yes_price": yes_price,
-                "no_price": no_price,
-                "end_date": m.get("endDate"),
-                "image": m.get("image"),
-                "category": m.get("category") or "Event"
-            })
-        except Exception as e:
-            continue
-            
-    # Sort descending by volume
-    markets.sort(key=lambda x: x["volume"], reverse=True)
-    return {"markets": markets[:limit]}
+    markets = normalize_markets(response.content, default_category="Event")
+    markets.sort(key=lambda m: m.volume, reverse=True)
+    return {"markets": [Market(**m.model_dump()).model_dump() for m in markets[:limit]]}
+
+
+@router.get("/flow")
+async def get_smart_money_flow(
+    window: Literal["1h", "6h", "24h"] = Query("1h"),
+    sort: Literal["net", "volume", "wallets"] = Query("net"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Markets with tracked-wallet flow in the window: net USD flow (YES-
+    equivalent), distinct buyers/sellers and average entry per market.
+    """
+    markets = await get_flow_aggregator().get_top(window=window, limit=limit, sort=sort)
+    return {"window": window, "markets": markets, "count": len(markets)}
+
+
+@router.get("/correlations")
+async def get_correlated_markets(
+    market_ids: str = Query(..., description="Comma-separated condition IDs"),
+):
+    """
+    Stored correlation neighbours for a set of markets (e.g. a watchlist),
+    plus the correlated pairs within the set: the overlapping exposures.
+    """
+    ids = list(dict.fromkeys(m.strip() for m in market_ids.split(",") if m.strip()))[:200]
+    rows = await get_market_correlations().get_neighbors(ids)
+
+    wanted = set(ids)
+    pairs = {}
+    for cid, row in rows.items():
+        for n in row["neighbors"]:
+            if n["market_id"] in wanted:
+                key = tuple(sorted((cid, n["market_id"])))
+                pairs[key] = {"markets": list(key), "correlation": n["correlation"], "overlap": n["overlap"]}
+    overlapping = sorted(pairs.values(), key=lambda p: abs(p["correlation"]), reverse=True)
+    return {"markets": [rows[c] for c in ids if c in rows], "pairs": overlapping, "count": len(rows)}
 
 
 @router.get("/{market_id}", response_model=Market)
 async def get_market(market_id: str):
     """Get detailed market data by ID."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{GAMMA_API_BASE}/markets/{market_id}",
-                timeout=10.0
-            )
-            response.raise_for_status()
-            m = response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=404, detail=f"Market not found: {str(e)}")
+    market = await pm_service.get_market(market_id)
+    if market is None:
+        raise HTTPException(status_code=404, detail="Market not found")
     
-    prices = m.get("outcomePrices", [0.5, 0.5])
-    return Market(
-        id=m.get("id", ""),
-        question=m.get("question", ""),
-        slug=m.get("slug", ""),
-        volume=float(m.get("volume", 0) or 0),
-        liquidity=float(m.get("liquidity", 0) or 0),
-        yes_price=float(prices[0]) if prices else 0.5,
-        no_price=float(prices[1]) if len(prices) > 1 else 0.5,
-        end_date=m.get("endDate"),
-        image=m.get("image"),
-        category=m.get("category")
+    return Market(**market.model_dump())
+
+
+@router.get("/{market_id}/history", response_model=PriceHistoryResponse)
+async def get_market_history(
+    market_id: str,
+    interval: Literal["1h", "6h", "1d", "1w", "1m", "max"] = Query("1d"),
+    points: int = Query(200, ge=10, le=2000, description="Maximum points returned"),
+    method: Literal["lttb", "minmax"] = Query("lttb", description="Downsampling algorithm"),
+):
+    """
+    Get chart-ready price history for a market's YES token.
+
+    Raw CLOB history is cached per (token, interval) and downsampled
+    server-side to at most `points` samples.
+    """
+    market = await pm_service.get_market(market_id)
+    if not market or not market.clob_token_id:
+        raise HTTPException(status_code=404, detail="Market not found")
+
+    history = await pm_service.get_price_history(market.clob_token_id, interval)
+    if history is None:
+        raise HTTPException(status_code=502, detail="Price history unavailable")
+
+    t, p = DOWNSAMPLERS[method](history["t"], history["p"], points)
+
+    return PriceHistoryResponse(
+        market_id=market_id,
+        token_id=market.clob_token_id,
+        interval=interval,
+        t=t,
+        p=[round(v, 4) for v in p],
+        count=len(t),
     )
+
+
+async def _resolve_condition_id(market_id: str) -> str:
+    """Condition ID for a condition ID (0x...) or Gamma market ID; 404 if unknown."""
+    if market_id.startswith("0x"):
+        return market_id
+    market = await pm_service.get_market(market_id)
+    if not market or not market.condition_id:
+        raise HTTPException(status_code=404, detail="Market not found")
+    return market.condition_id
+
+
+@router.get("/{market_id}/candles", response_model=CandleResponse)
+async def get_market_candles(
+    market_id: str,
+    resolution: Literal["1m", "5m", "1h"] = Query("5m"),
+    limit: int = Query(200, ge=1, le=1440),
+):
+    """
+    Get OHLCV candles built from trades observed by the tracker.
+
+    Accepts a condition ID (0x...) or a Gamma market ID. Candles are
+    served from memory/Redis without any upstream trade calls.
+    """
+    condition_id = await _resolve_condition_id(market_id)
+
+    candles = await get_candle_aggregator().get_candles(condition_id, resolution, limit)
+    if candles is None:
+        candles = {name: [] for name in ("t", "o", "h", "l", "c", "v", "n")}
+
+    return CandleResponse(
+        market_id=condition_id,
+        resolution=resolution,
+        count=len(candles["t"]),
+        **candles,
+    )
+
+
+@router.get("/{market_id}/flow")
+async def get_market_flow(
+    market_id: str,
+    window: Literal["1h", "6h", "24h"] = Query("1h"),
+):
+    """
+    Tracked-wallet flow for one market over a sliding window.
+
+    Accepts a condition ID (0x...) or a Gamma market ID.
+    """
+    condition_id = await _resolve_condition_id(market_id)
+
+    flow = await get_flow_aggregator().get_flow(condition_id, window)
+    if flow is None:
+        flow = {"market_id": condition_id, "window": window, "trades": 0, "buy_usd": 0.0, "sell_usd": 0.0,
+                "net_usd": 0.0, "buyers": 0, "sellers": 0, "avg_buy_price": None, "avg_sell_price": None}
+    return flow
+
+
+@router.get("/{market_id}/correlations")
+async def get_market_correlations_for(market_id: str):
+    """
+    Markets whose hourly returns correlate most with this one (strongest first).
+
+    Accepts a condition ID (0x...) or a Gamma market ID. Only watched markets
+    are covered; others return an empty list.
+    """
+    condition_id = await _resolve_condition_id(market_id)
+
+    row = (await get_market_correlations().get_neighbors([condition_id])).get(condition_id)
+    if row is None:
+        return {"market_id": condition_id, "neighbors": [], "computed_at": None}
+    return row
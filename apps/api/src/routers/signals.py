@@ -3,14 +3,21 @@ Foresynth API - Signals Router (Insiders / Anomaly Radar)
 
 Endpoints for fetching insider trading signals.
 """
-from fastapi import APIRouter, Query, Depends
+import base64
+import json
+import re
+import uuid
+
+from fastapi import APIRouter, Query, Depends, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 
 from src.core import get_db
+from src.services.whales import get_whale_detector
 
 router = APIRouter()
+whale_detector = get_whale_detector()
 
 
 class InsiderSignal(BaseModel):
@@ -28,6 +35,50 @@ class SignalFeedResponse(BaseModel):
     """Response model for signal feed."""
     signals: list[InsiderSignal]
     count: int
+    next_cursor: Optional[str] = None
+
+
+# Keyset order shared by every signal listing; backed by the composite
+# indexes in migrations/004_signal_feed_indexes.sql
+def _keyset(query, cursor: Optional[str], limit: int):
+    """Order by (radar_score, created_at, id) DESC and resume after `cursor`."""
+    if cursor:
+        score, created_at, signal_id = _decode_cursor(cursor)
+        query = query.or_(
+            f'radar_score.lt.{score},'
+            f'and(radar_score.eq.{score},created_at.lt."{created_at}"),'
+            f'and(radar_score.eq.{score},created_at.eq."{created_at}",id.lt.{signal_id})'
+        )
+    # One extra row tells whether another page exists
+    return query.order("radar_score", desc=True).order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+
+def _encode_cursor(row: dict) -> str:
+    raw = json.dumps([row.get("radar_score", 0), row["created_at"], row["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str, str]:
+    """
+    Cursor fields, validated: they are interpolated into the PostgREST filter,
+    so anything but a timestamp and a UUID is rejected.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, created_at, signal_id = json.loads(raw)
+        created_at = str(created_at)
+        # PostgREST trims trailing zeros from fractional seconds; fromisoformat (3.10) wants 3 or 6 digits
+        datetime.fromisoformat(re.sub(r"\.(\d{1,6})", lambda m: "." + m[1].ljust(6, "0"), created_at.replace("Z", "+00:00")))
+        return int(score), created_at, str(uuid.UUID(str(signal_id)))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(rows: list[dict], limit: int) -> tuple[list[dict], Optional[str]]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, _encode_cursor(rows[-1])
+    return rows, None
 
 
 @router.get("/feed", response_model=SignalFeedResponse)
@@ -35,6 +86,7 @@ async def get_signal_feed(
     min_score: int = Query(0, ge=0, le=100, description="Minimum radar score"),
     max_age_days: int = Query(30, ge=1, le=365, description="Maximum wallet age in days"),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db = Depends(get_db)
 ):
     """
@@ -43,6 +95,9 @@ async def get_signal_feed(
     Filters:
     - min_score: Minimum radar score (0-100)
     - max_age_days: Filter signals from wallets younger than X days
+      (signals with unknown wallet age are kept)
+    
+    Pages are keyset-based: pass `next_cursor` back as `cursor`.
     """
     # Build query
     query = db.table("insider_signals").select("*")
@@ -50,31 +105,50 @@ async def get_signal_feed(
     # Apply filters
     if min_score > 0:
         query = query.gte("radar_score", min_score)
+    query = query.or_(f"wallet_age_days.lte.{max_age_days},wallet_age_days.is.null")
     
     # Order by score descending, then by recency
-    query = query.order("radar_score", desc=True).order("created_at", desc=True)
-    query = query.limit(limit)
+    response = _keyset(query, cursor, limit).execute()
+    rows, next_cursor = _page(response.data, limit)
     
-    response = query.execute()
+    signals = [
+        InsiderSignal(
+            id=s["id"],
+            wallet_address=s["wallet_address"],
+            market_id=s["market_id"],
+            trade_size=float(s.get("trade_size") or 0),
+            radar_score=s.get("radar_score", 0),
+            metadata=s.get("metadata") or {},
+            created_at=s["created_at"]
+        )
+        for s in rows
+    ]
     
-    # Filter by wallet age from metadata (if available)
-    signals = []
-    for s in response.data:
-        metadata = s.get("metadata", {})
-        wallet_age = metadata.get("wallet_age_days", 0)
-        
-        if wallet_age <= max_age_days:
-            signals.append(InsiderSignal(
-                id=s["id"],
-                wallet_address=s["wallet_address"],
-                market_id=s["market_id"],
-                trade_size=float(s.get("trade_size", 0)),
-                radar_score=s.get("radar_score", 0),
-                metadata=metadata,
-                created_at=s["created_at"]
-            ))
-    
-    return SignalFeedResponse(signals=signals, count=len(signals))
+    return SignalFeedResponse(signals=signals, count=len(signals), next_cursor=next_cursor)
+
+
+@router.get("/whales")
+async def get_whale_trades(
+    limit: int = Query(50, ge=1, le=200),
+    market_id: Optional[str] = Query(None, description="Only whale trades in this market (condition ID)"),
+):
+    """
+    Whale trades across all markets: trades above their market's 99th
+    percentile of size relative to liquidity, newest first.
+    """
+    events = await whale_detector.get_events(limit=limit, market_id=market_id)
+    return {"whales": events, "count": len(events)}
+
+
+@router.get("/whales/percentiles")
+async def get_whale_percentiles(
+    market_id: Optional[str] = Query(None, description="One market; omit to merge every market"),
+):
+    """Trade size / liquidity percentiles behind the whale threshold."""
+    stats = await whale_detector.get_percentiles(market_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No trades observed for this market")
+    return stats
 
 
 @router.get("/{signal_id}")
@@ -94,9 +168,13 @@ async def get_signal(
 @router.get("/wallet/{wallet_address}")
 async def get_signals_by_wallet(
     wallet_address: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db = Depends(get_db)
 ):
-    """Get all signals for a specific wallet address."""
-    response = db.table("insider_signals").select("*").eq("wallet_address", wallet_address).execute()
+    """Get signals for a specific wallet address, highest score first."""
+    query = db.table("insider_signals").select("*").eq("wallet_address", wallet_address)
+    response = _keyset(query, cursor, limit).execute()
+    rows, next_cursor = _page(response.data, limit)
     
-    return {"signals": response.data, "count": len(response.data)}
+    return {"signals": rows, "count": len(rows), "next_cursor": next_cursor}
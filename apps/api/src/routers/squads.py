@@ -3,18 +3,30 @@ Foresynth API - Squads Router
 
 CRUD endpoints for Smart Money target squads and tracked wallets.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from pydantic import BaseModel, Field
 from typing import Optional
 
-from src.core import get_db, get_async_cache
+from src.core import get_db
 from src.core.security import get_current_user
+from src.services.backtest import get_backtester
+from src.services.category_leaderboards import STATS as CATEGORY_STATS, get_category_leaderboards
+from src.services.lead_lag import get_lead_lag_analyzer
 from src.services.polymarket import get_polymarket_service
-import asyncio
-import json
+from src.services.positions import get_position_engine
+from src.services.smart_money import SORT_FIELDS, get_smart_money_service
 
 router = APIRouter()
 pm_service = get_polymarket_service()
+smart_money_service = get_smart_money_service()
+category_boards = get_category_leaderboards()
+position_engine = get_position_engine()
+lead_lag_analyzer = get_lead_lag_analyzer()
+backtester = get_backtester()
+
+# Any wallet can be analysed without auth, so only well-formed addresses reach upstream
+WALLET_ADDRESS = Path(..., pattern="^0x[0-9a-fA-F]{40}$")
 
 
 class AlertConfig(BaseModel):
@@ -32,6 +44,13 @@ class TargetCreate(BaseModel):
     alert_config: AlertConfig = AlertConfig()
 
 
+class BacktestParams(BaseModel):
+    """Execution assumptions for a copy-trade backtest."""
+    delay_seconds: int = Field(60, ge=0, le=86400)
+    slippage_bps: float = Field(50, ge=0, le=1000)
+    stake_usd: float = Field(100, gt=0)
+
+
 class SquadCreate(BaseModel):
     """Request model for creating a squad."""
     name: str
@@ -52,15 +71,16 @@ async def list_squads(
     # Get squads
     squads_response = db.table("squads").select("*").eq("user_id", user_id).execute()
     squads = squads_response.data
+    if not squads:
+        return {"squads": []}
+    
+    # Get targets for all squads in one query, then group by squad
+    targets_response = db.table("tracked_targets").select("*").in_("squad_id", [s["id"] for s in squads]).execute()
+    targets_by_squad: dict[str, list] = {}
+    for target in targets_response.data:
+        targets_by_squad.setdefault(target["squad_id"], []).append(target)
     
-    # Get targets for each squad
-    result = []
-    for squad in squads:
-        targets_response = db.table("tracked_targets").select("*").eq("squad_id", squad["id"]).execute()
-        result.append({
-            **squad,
-            "targets": targets_response.data
-        })
+    result = [{**squad, "targets": targets_by_squad.get(squad["id"], [])} for squad in squads]
     
     return {"squads": result}
 
@@ -93,98 +113,104 @@ async def get_global_leaderboard(
     return await pm_service.get_leaderboard(timeframe=window)
 
 
+@router.get("/leaderboard/categories")
+async def list_leaderboard_categories():
+    """Categories with a per-category leaderboard, largest first."""
+    return await category_boards.list_categories()
+
+
+@router.get("/leaderboard/categories/{category}")
+async def get_category_leaderboard(
+    category: str,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    sort: str = Query("pnl", description=f"One of: {', '.join(CATEGORY_STATS)}")
+):
+    """
+    Leaderboard for one market category (e.g. politics, sports).
+    
+    Built from the closed positions of every trader the smart-money refresh
+    has scored, so it ranks far more than the global top 20.
+    """
+    if sort not in CATEGORY_STATS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(CATEGORY_STATS)}")
+    board = await category_boards.get_leaderboard(category, limit=limit, offset=offset, sort=sort)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return board
+
+
 @router.get("/smart-money")
 async def get_smart_money_list(
     limit: int = 20,
-    min_trades: int = 5
+    min_trades: int = 5,
+    sort: str = Query("adjustedWinRate", description=f"One of: {', '.join(SORT_FIELDS)}")
 ):
     """
-    Get 'Smart Money' list: Top traders sorted by Win Rate.
+    Get 'Smart Money' list: Top traders sorted by (sample-size adjusted) Win Rate.
     
-    Aggregates global leaderboard with closed position history 
-    to calculate win/loss metrics.
+    Served from the table pre-computed in the background by
+    SmartMoneyService (leaderboard + closed position history). Rows carry
+    lead-lag fields (leaderScore, role, clusterId) once the analysis has run;
+    sort=leaderScore puts wallets that trade ahead of price first.
     """
-    cache = get_async_cache()
-    cache_key = f"smart_money_list:{limit}:{min_trades}"
-    
-    # Check cache
-    if cache:
-        try:
-            cached = await cache.get(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception as e:
-            print(f"SmartMoney: Cache read error: {e}")
-            
-    # 1. Fetch Global Leaderboard (Monthly provides recent reliable signal)
-    leaderboard = await pm_service.get_leaderboard(timeframe="monthly")
-    
-    # 2. Extract top candidates (Limit to top 30 to manage rate limits/latency)
-    candidates = leaderboard[:30] if leaderboard else []
-    
-    # 3. Fetch trade history for each candidate in parallel
-    tasks = []
-    for trader in candidates:
-        address = trader.get("address") or trader.get("proxyWallet")
-        if address:
-            tasks.append(pm_service.get_closed_positions(address, limit=100))
-        else:
-            # Placeholder for missing address (shouldn't happen with valid leaderboard data)
-            tasks.append(asyncio.sleep(0, result=[]))
-            
-    # Execute parallel fetch
-    histories = await asyncio.gather(*tasks)
-    
-    # 4. Compute Metrics
-    smart_money = []
-    for i, trader in enumerate(candidates):
-        history = histories[i]
-        
-        # Skip if no history found or fetch failed
-        if not history or not isinstance(history, list):
-            continue
-            
-        total_trades = len(history)
-        if total_trades < min_trades:
-            continue
-            
-        # Calculate Wins/Losses based on realized PnL
-        wins = sum(1 for trade in history if trade.get("realizedPnl", 0) > 0)
-        losses = sum(1 for trade in history if trade.get("realizedPnl", 0) <= 0)
-        
-        # Calculate Win Rate
-        win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
-        
-        # Prepare trader profile
-        profile = {
-            "rank": trader.get("rank", i + 1),
-            "address": trader.get("address") or trader.get("proxyWallet"),
-            "name": trader.get("name") or trader.get("username") or "Unknown Trader",
-            "profileImage": trader.get("profileImage") or trader.get("image"),
-            "totalProfit": float(trader.get("pnl", 0)),  # Use leaderboard PnL
-            "volume": float(trader.get("volume", 0)),
-            "totalBets": total_trades, # In our sample
-            "wins": wins,
-            "losses": losses,
-            "winRate": round(win_rate, 2),
-            "tracked": False # Placeholder, client can check against their list
-        }
-        smart_money.append(profile)
-        
-    # 5. Sort by Win Rate (Descending)
-    smart_money.sort(key=lambda x: x["winRate"], reverse=True)
-    
-    # Return requested limit
-    result = smart_money[:limit]
-    
-    # Cache result for 10 minutes
-    if cache:
-        try:
-            await cache.setex(cache_key, 600, json.dumps(result))
-        except Exception as e:
-            print(f"SmartMoney: Cache write error: {e}")
-            
-    return result
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_FIELDS)}")
+    return await smart_money_service.get_list(limit=limit, min_trades=min_trades, sort=sort)
+
+
+@router.get("/smart-money/lead-lag")
+async def get_smart_money_lead_lag(
+    wallet: Optional[str] = Query(None, description="Only pairs and the cluster involving this wallet"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Lead-lag pairs (who trades first, by how many hours) and copy-trading
+    clusters among smart-money wallets, from the last background run.
+    """
+    results = await lead_lag_analyzer.get_results()
+    if results is None:
+        return {"pairs": [], "clusters": [], "computed_at": None}
+
+    pairs, clusters = results["pairs"], results["clusters"]
+    if wallet:
+        wallet = wallet.lower()
+        pairs = [p for p in pairs if wallet in p["wallets"]]
+        clusters = [c for c in clusters if wallet in c["wallets"]]
+    return {
+        "pairs": pairs[:limit],
+        "clusters": clusters,
+        "window_hours": results["window_hours"],
+        "computed_at": results["computed_at"],
+    }
+
+
+@router.get("/wallets/{wallet_address}/positions")
+async def get_wallet_positions(wallet_address: str = WALLET_ADDRESS):
+    """
+    Open book of any wallet: FIFO lots from its trade history, marked at
+    current prices, with unrealized and realized PnL per position.
+    """
+    return await position_engine.get_book(wallet_address)
+
+
+@router.get("/wallets/{wallet_address}/backtest")
+async def backtest_wallet(
+    wallet_address: str = WALLET_ADDRESS,
+    min_trade_size: float = Query(AlertConfig().min_trade_size, ge=0),
+    only_buy_orders: bool = AlertConfig().only_buy_orders,
+    params: BacktestParams = Depends(),
+):
+    """
+    What copying this wallet with the given alert filters would have returned:
+    equity curve, drawdown and hit rate, with entries delayed and slipped.
+    """
+    try:
+        return await backtester.run(
+            wallet_address, min_trade_size=min_trade_size, only_buy_orders=only_buy_orders, **params.model_dump()
+        )
+    except httpx.HTTPError:
+        raise HTTPException(status_code=503, detail="Trade history unavailable, try again later")
 
 
 @router.get("/{squad_id}")
@@ -207,6 +233,28 @@ async def get_squad(
     }
 
 
+@router.get("/{squad_id}/positions")
+async def get_squad_positions(
+    squad_id: str,
+    user_id: str = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Marked open books of every wallet in a squad, plus squad totals."""
+    squad_response = db.table("squads").select("id").eq("id", squad_id).execute()
+    if not squad_response.data:
+        raise HTTPException(status_code=404, detail="Squad not found")
+
+    targets_response = db.table("tracked_targets").select("wallet_address").eq("squad_id", squad_id).execute()
+    books = await position_engine.get_books([t["wallet_address"] for t in targets_response.data])
+    return {
+        "squad_id": squad_id,
+        "wallets": books,
+        "open_value": round(sum(b["open_value"] for b in books), 2),
+        "unrealized_pnl": round(sum(b["unrealized_pnl"] for b in books), 2),
+        "realized_pnl": round(sum(b["realized_pnl"] for b in books), 2),
+    }
+
+
 @router.patch("/{squad_id}")
 async def update_squad(
     squad_id: str,
@@ -287,6 +335,30 @@ async def remove_target(
     return None
 
 
+@router.get("/{squad_id}/targets/{target_id}/backtest")
+async def backtest_target(
+    squad_id: str,
+    target_id: str,
+    params: BacktestParams = Depends(),
+    user_id: str = Depends(get_current_user),
+    db = Depends(get_db)
+):
+    """Backtest a tracked target with its stored alert configuration."""
+    response = db.table("tracked_targets").select("wallet_address, alert_config") \
+        .eq("id", target_id).eq("squad_id", squad_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Target not found")
+
+    target = response.data[0]
+    config = AlertConfig(**(target.get("alert_config") or {}))
+    return await backtester.run(
+        target["wallet_address"],
+        min_trade_size=config.min_trade_size,
+        only_buy_orders=config.only_buy_orders,
+        **params.model_dump(),
+    )
+
+
 @router.patch("/{squad_id}/targets/{target_id}")
 async def update_target_config(
     squad_id: str,
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Header, Request
 from src.core import get_db, get_async_cache
 from src.core.security import get_current_user
 from src.services.telegram import get_telegram_service
+from src.services.notifications import get_notification_service
 from src.core.config import get_settings
 
 import logging
@@ -86,6 +87,7 @@ async def telegram_webhook(
                 
             try:
                 db.table("users").update({"telegram_chat_id": chat_id}).eq("id", user_id).execute()
+                get_notification_service().invalidate_contact(user_id)
                 
                 await telegram_service.send_message(
                     chat_id, 
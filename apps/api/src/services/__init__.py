@@ -1,10 +1,23 @@
-"""Services package initialization."""
-from src.services.notifications import NotificationService, get_notification_service
-from src.services.polymarket import PolymarketService, get_polymarket_service
-
-__all__ = [
-    "NotificationService",
-    "get_notification_service",
-    "PolymarketService",
-    "get_polymarket_service",
-]
+"""
+Services package initialization.
+
+Exports resolve on first access, so importing a standalone module such as
+src.services.feed_parser (e.g. in a spawned parser worker) does not build
+Settings or the service stack.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "NotificationService": "src.services.notifications",
+    "get_notification_service": "src.services.notifications",
+    "PolymarketService": "src.services.polymarket",
+    "get_polymarket_service": "src.services.polymarket",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name]), name)
@@ -0,0 +1,285 @@
+"""
+Foresynth API - Copy-Trade Backtester
+
+What would shadowing a wallet with a squad's alert rules have returned?
+The wallet's trade history is replayed through the same filters the
+tracker applies (`min_trade_size`, `only_buy_orders`): every copied BUY
+opens a fixed-stake lot, entered `delay_seconds` after the wallet's trade
+with `slippage_bps` against the copier, and the next copied SELL of the
+same token exits it under the same delay and slippage. Lots the wallet
+never exits (or sells the copier never sees) are marked at the latest price.
+
+All of it runs on flat NumPy arrays: delayed prices are one searchsorted
+over the concatenated price histories, exits one searchsorted over the
+copied sells, and the equity curve a cumulative sum, so years of trades
+replay in milliseconds. Results are cached per (wallet, config hash).
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.core import get_payload_cache
+from src.services.downsample import lttb
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+from src.services.warehouse import get_trade_warehouse, pc
+
+# Token codes and timestamps are packed into one sortable int64 key
+_TS_SPAN = 1 << 40
+
+CURVE_POINTS = 200
+
+
+def _keys(token: np.ndarray, ts: np.ndarray) -> np.ndarray:
+    return token.astype(np.int64) * _TS_SPAN + ts.astype(np.int64)
+
+
+class TradeArrays:
+    """A wallet's trades as time-ordered columns, tokens coded as integers."""
+
+    __slots__ = ("tokens", "ts", "token", "is_buy", "size", "price")
+
+    def __init__(self, tokens: list[str], ts, token, is_buy, size, price):
+        self.tokens = tokens
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.token = np.asarray(token, dtype=np.int64)
+        self.is_buy = np.asarray(is_buy, dtype=bool)
+        self.size = np.asarray(size, dtype=float)
+        self.price = np.asarray(price, dtype=float)
+
+    @classmethod
+    def from_trades(cls, trades: list[TradeData]) -> "TradeArrays":
+        trades = sorted((t for t in trades if t.asset and t.price > 0), key=lambda t: t.timestamp)
+        tokens = list(dict.fromkeys(t.asset for t in trades))
+        codes = {asset: i for i, asset in enumerate(tokens)}
+        return cls(
+            tokens,
+            [t.timestamp for t in trades],
+            [codes[t.asset] for t in trades],
+            [t.side == "BUY" for t in trades],
+            [t.size for t in trades],
+            [t.price for t in trades],
+        )
+
+    @classmethod
+    def from_table(cls, table) -> "TradeArrays":
+        """From a time-ordered warehouse table (timestamp, asset, side, size, price)."""
+        table = table.filter(pc.greater(table["price"], 0))
+        # Dictionary encoding assigns codes in order of first appearance, like from_trades
+        assets = pc.dictionary_encode(table["asset"]).combine_chunks()
+        return cls(
+            assets.dictionary.to_pylist(),
+            table["timestamp"].to_numpy(),
+            assets.indices.to_numpy(zero_copy_only=False),
+            pc.equal(table["side"], "BUY").to_numpy(zero_copy_only=False),
+            table["size"].to_numpy(),
+            table["price"].to_numpy(),
+        )
+
+    def to_payload(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            **{name: getattr(self, name).tolist() for name in ("ts", "token", "is_buy", "size", "price")},
+        }
+
+    @classmethod
+    def from_payload(cls, data: dict) -> "TradeArrays":
+        return cls(data["tokens"], data["ts"], data["token"], data["is_buy"], data["size"], data["price"])
+
+
+class PriceTable:
+    """Price histories of many tokens concatenated and sorted by (token, time)."""
+
+    __slots__ = ("keys", "price", "last")
+
+    def __init__(self, histories: dict[int, dict], n_tokens: int):
+        token = np.concatenate([np.full(len(h["t"]), code) for code, h in histories.items()] or [np.zeros(0)])
+        ts = np.concatenate([np.asarray(h["t"]) for h in histories.values()] or [np.zeros(0)])
+        price = np.concatenate([np.asarray(h["p"], dtype=float) for h in histories.values()] or [np.zeros(0)])
+        keys = _keys(token, ts)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.price = price[order]
+        # Latest known price per token (NaN without a history)
+        self.last = np.full(n_tokens, np.nan)
+        for code, h in histories.items():
+            if h["p"]:
+                self.last[code] = h["p"][-1]
+
+    def at(self, token: np.ndarray, after: np.ndarray, until: np.ndarray) -> np.ndarray:
+        """Latest price in (after, until] per query, NaN where the history has none."""
+        if not len(self.keys):
+            return np.full(len(token), np.nan)
+        idx = np.searchsorted(self.keys, _keys(token, until), side="right") - 1
+        found = (idx >= 0) & (self.keys[np.maximum(idx, 0)] > _keys(token, after))
+        return np.where(found, self.price[np.maximum(idx, 0)], np.nan)
+
+
+def simulate(
+    trades: TradeArrays,
+    prices: PriceTable,
+    min_trade_size: float = 0.0,
+    only_buy_orders: bool = False,
+    delay_seconds: int = 60,
+    slippage_bps: float = 50.0,
+    stake_usd: float = 100.0,
+    now: Optional[int] = None,
+) -> dict:
+    """Replay `trades` through the alert filters; returns summary stats and the equity curve."""
+    copied = trades.size * trades.price >= min_trade_size
+    if only_buy_orders:
+        copied &= trades.is_buy
+    buys = np.flatnonzero(copied & trades.is_buy)
+    sells = np.flatnonzero(copied & ~trades.is_buy)
+    slip = slippage_bps / 10_000
+
+    # Fill at the latest price seen between the wallet's trade and our delayed order,
+    # or at the wallet's own price when the history has no point in that window
+    fill_ts = trades.ts + delay_seconds
+    fills = prices.at(trades.token, trades.ts, fill_ts)
+    fills = np.where(np.isnan(fills), trades.price, fills)
+
+    entry = np.minimum(fills[buys] * (1 + slip), 0.999)
+    shares = stake_usd / entry
+
+    # Exit: first copied sell of the same token after the entry
+    sell_keys = _keys(trades.token[sells], trades.ts[sells])
+    order = np.argsort(sell_keys, kind="stable")
+    sell_keys, sells = sell_keys[order], sells[order]
+    j = np.searchsorted(sell_keys, _keys(trades.token[buys], trades.ts[buys]), side="right")
+    exited = j < len(sells)
+    exited[exited] = trades.token[sells[j[exited]]] == trades.token[buys[exited]]
+    exit_idx = sells[np.minimum(j, max(len(sells) - 1, 0))] if len(sells) else np.zeros(len(buys), dtype=int)
+
+    mark = prices.last[trades.token[buys]]
+    # No history at all: the wallet's last trade price for the token
+    last_trade_price = np.zeros(len(trades.tokens))
+    last_trade_price[trades.token] = trades.price  # later trades overwrite earlier ones
+    mark = np.where(np.isnan(mark), last_trade_price[trades.token[buys]], mark)
+
+    exit_price = np.where(exited, np.maximum(fills[exit_idx] * (1 - slip), 0.0), mark)
+    now = now if now is not None else int(trades.ts[-1]) if len(trades.ts) else 0
+    close_ts = np.where(exited, fill_ts[exit_idx], max(now, int(fill_ts[buys].max()) if len(buys) else now))
+    pnl = shares * (exit_price - entry)
+
+    # Equity curve over close times
+    order = np.argsort(close_ts, kind="stable")
+    equity = np.cumsum(pnl[order])
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0)) - equity if len(equity) else np.zeros(0)
+    curve_t, curve_v = lttb(close_ts[order].tolist(), equity.tolist(), CURVE_POINTS)
+
+    staked = stake_usd * len(buys)
+    realized = pnl[exited]
+    return {
+        "trades_seen": int(len(trades.ts)),
+        "trades_copied": int(copied.sum()),
+        "lots": int(len(buys)),
+        "closed_lots": int(exited.sum()),
+        "open_lots": int((~exited).sum()),
+        "staked_usd": round(float(staked), 2),
+        "total_pnl": round(float(pnl.sum()), 2),
+        "realized_pnl": round(float(realized.sum()), 2),
+        "unrealized_pnl": round(float(pnl[~exited].sum()), 2),
+        "roi": round(float(pnl.sum() / staked), 4) if staked else None,
+        "hit_rate": round(float((pnl > 0).mean()), 4) if len(pnl) else None,
+        "max_drawdown": round(float(drawdown.max()), 2) if len(drawdown) else 0.0,
+        "avg_entry_vs_wallet": round(float((entry - trades.price[buys]).mean()), 4) if len(buys) else None,
+        "equity_curve": [{"t": int(t), "equity": round(v, 2)} for t, v in zip(curve_t, curve_v)],
+    }
+
+
+class CopyTradeBacktester:
+    """Fetches history and prices, runs `simulate`, caches per (wallet, config hash)."""
+
+    CACHE_PREFIX = "backtest"
+    CACHE_TTL = 600
+    PAGE_SIZE = 500
+    MAX_PAGES = 20  # trades per wallet: the Data API's offset limit
+    MAX_PRICED_TOKENS = 100  # most-traded tokens get price histories (the rest fill at trade price)
+    CONCURRENCY = 8  # parallel price history fetches per run
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+        self.cache = get_payload_cache()
+        self.warehouse = get_trade_warehouse()
+
+    @staticmethod
+    def config_hash(config: dict) -> str:
+        return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+    async def _history(self, wallet: str) -> TradeArrays:
+        """
+        The wallet's packed trade history, cached so other configs skip the
+        rescan. A failed page raises (httpx.HTTPError) instead of caching a
+        truncated history.
+        """
+        cache_key = f"{self.CACHE_PREFIX}:history:{wallet}"
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return TradeArrays.from_payload(cached)
+
+        # Local history (backfilled once, then topped up) when the warehouse is on
+        table = await self.warehouse.wallet_history(wallet, columns=["timestamp", "asset", "side", "size", "price"])
+        if table is not None:
+            arrays = TradeArrays.from_table(table)
+        else:
+            trades: list[TradeData] = []
+            for page in range(self.MAX_PAGES):
+                batch = await self.polymarket.get_trades(
+                    wallet, limit=self.PAGE_SIZE, offset=page * self.PAGE_SIZE, raise_errors=True
+                )
+                trades.extend(batch)
+                if len(batch) < self.PAGE_SIZE:
+                    break
+            arrays = TradeArrays.from_trades(trades)
+        await self.cache.setex(cache_key, self.CACHE_TTL, arrays.to_payload())
+        return arrays
+
+    async def run(self, wallet: str, **config) -> dict:
+        """Backtest copying `wallet` with `config` (see `simulate` for the keys)."""
+        wallet = wallet.lower()
+        cache_key = f"{self.CACHE_PREFIX}:{wallet}:{self.config_hash(config)}"
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        arrays = await self._history(wallet)
+        counts = np.bincount(arrays.token, minlength=len(arrays.tokens))
+        priced = np.argsort(-counts, kind="stable")[:self.MAX_PRICED_TOKENS]
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def _history(token: str) -> Optional[dict]:
+            async with semaphore:
+                return await self.polymarket.get_price_history(token, "max")
+
+        histories = await asyncio.gather(*(_history(arrays.tokens[c]) for c in priced))
+        prices = PriceTable({int(c): h for c, h in zip(priced, histories) if h and h["t"]}, len(arrays.tokens))
+
+        result = await asyncio.to_thread(simulate, arrays, prices, now=int(time.time()), **config)
+        result.update(
+            wallet=wallet,
+            config=config,
+            priced_tokens=int(np.isfinite(prices.last).sum()),
+            tokens=len(arrays.tokens),
+            first_trade=int(arrays.ts[0]) if len(arrays.ts) else None,
+        )
+        # A failed price history fills its token at trade prices: serve, don't cache
+        if all(h is not None for h in histories):
+            await self.cache.setex(cache_key, self.CACHE_TTL, result)
+        return result
+
+
+# Singleton
+_backtester: CopyTradeBacktester | None = None
+
+
+def get_backtester() -> CopyTradeBacktester:
+    """Get copy-trade backtester singleton."""
+    global _backtester
+    if _backtester is None:
+        _backtester = CopyTradeBacktester()
+    return _backtester
@@ -0,0 +1,239 @@
+"""
+Foresynth API - Candle Aggregator
+
+Folds every trade the tracker observes into OHLCV candles per market
+at several resolutions. Candles are kept in array-backed buffers in
+memory and flushed to Redis periodically, so volume and price-action
+views need no extra upstream calls.
+"""
+import base64
+import json
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Optional
+
+from src.core import get_async_cache
+from src.services.normalizer import TradeData
+
+# Resolution name -> bucket width in seconds
+RESOLUTIONS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+
+# Candles retained per (market, resolution): 1 day of 1m, ~3.5 days of 5m, ~60 days of 1h
+MAX_CANDLES = 1440
+
+# Column name -> array typecode (fixed-size codes only: dumps are shared through Redis)
+COLUMNS = {
+    "t": "q",  # bucket start (unix seconds)
+    "o": "d",
+    "h": "d",
+    "l": "d",
+    "c": "d",
+    "v": "d",  # USD volume
+    "n": "q",  # trade count
+    "to": "q",  # timestamp of the opening trade
+    "tc": "q",  # timestamp of the closing trade
+}
+
+# Bookkeeping columns, not part of the served candles
+_TRADE_TIMES = ("to", "tc")
+
+
+class CandleSeries:
+    """OHLCV candles for one market at one resolution, stored column-wise."""
+
+    __slots__ = ("width", "cols")
+
+    def __init__(self, width: int):
+        self.width = width
+        self.cols = {name: array(code) for name, code in COLUMNS.items()}
+
+    def add(self, ts: int, price: float, usd: float) -> bool:
+        """Fold one trade into its bucket. Returns False if it is too old to keep."""
+        start = ts - ts % self.width
+        t = self.cols["t"]
+
+        row = (("t", start), ("o", price), ("h", price), ("l", price),
+               ("c", price), ("v", usd), ("n", 1), ("to", ts), ("tc", ts))
+
+        if not t or start > t[-1]:
+            for name, value in row:
+                self.cols[name].append(value)
+            self._trim()
+            return True
+
+        # Late trade: locate its bucket (trades from different wallets interleave)
+        i = bisect_left(t, start)
+        if i < len(t) and t[i] == start:
+            c = self.cols
+            c["h"][i] = max(c["h"][i], price)
+            c["l"][i] = min(c["l"][i], price)
+            c["v"][i] += usd
+            c["n"][i] += 1
+            # Open and close follow trade time, not arrival order
+            if ts < c["to"][i]:
+                c["o"][i], c["to"][i] = price, ts
+            if ts >= c["tc"][i]:
+                c["c"][i], c["tc"][i] = price, ts
+            return True
+
+        if i == 0 and len(t) >= MAX_CANDLES:
+            return False
+
+        for name, value in row:
+            self.cols[name].insert(i, value)
+        self._trim()
+        return True
+
+    def _trim(self):
+        # Drop in chunks so trimming stays amortized O(1) per trade
+        excess = len(self.cols["t"]) - MAX_CANDLES
+        if excess > MAX_CANDLES // 8:
+            for col in self.cols.values():
+                del col[:excess]
+
+    def tail(self, limit: int) -> dict:
+        """Return the newest `limit` candles as plain column lists."""
+        return {name: col[-limit:].tolist() for name, col in self.cols.items() if name not in _TRADE_TIMES}
+
+    def dump(self) -> dict:
+        """Serialize columns as base64-encoded raw arrays."""
+        return {name: base64.b64encode(col.tobytes()).decode() for name, col in self.cols.items()}
+
+    @classmethod
+    def load(cls, width: int, data: dict) -> "CandleSeries":
+        series = cls(width)
+        for name, code in COLUMNS.items():
+            col = array(code)
+            col.frombytes(base64.b64decode(data.get(name, "")))
+            series.cols[name] = col
+        # Series cached before trade times were kept: bucket bounds stand in for them
+        for name, offset in (("to", 0), ("tc", width - 1)):
+            if len(series.cols[name]) != len(series.cols["t"]):
+                series.cols[name] = array("q", (t + offset for t in series.cols["t"]))
+        return series
+
+
+class CandleAggregator:
+    """
+    Streaming OHLCV aggregator keyed by market condition ID.
+
+    Prices are normalized to the YES outcome so every trade on a market
+    lands on the same series regardless of which side was traded.
+    """
+
+    CACHE_KEY_PREFIX = "candles"
+    MAX_MARKETS = 2000  # series kept in memory, least recently used evicted first
+    REFRESH_AFTER = 30  # seconds before a series read from Redis is re-read (the tracker's flush interval)
+
+    def __init__(self):
+        self.cache = get_async_cache()
+        self._series: OrderedDict[str, dict[str, CandleSeries]] = OrderedDict()
+        self._dirty: set[str] = set()
+        # Markets restored from Redis and not ingested here since: another worker owns them
+        self._restored_at: dict[str, float] = {}
+
+    async def ingest(self, trades: list[TradeData]):
+        """Fold a batch of normalized trades into the candle buffers."""
+        for trade in sorted(trades, key=lambda t: t.timestamp):
+            market = trade.condition_id
+            if not market or trade.timestamp <= 0 or not 0 < trade.price < 1:
+                continue
+
+            price = 1.0 - trade.price if trade.outcome_index == 1 else trade.price
+
+            series = await self._get_or_restore(market)
+            for candles in series.values():
+                candles.add(trade.timestamp, price, trade.usd_size)
+            self._dirty.add(market)
+            self._restored_at.pop(market, None)
+        self._evict()
+
+    async def get_candles(self, market: str, resolution: str, limit: int = 200) -> Optional[dict]:
+        """Return the newest candles for a market, or None if none were observed."""
+        series = self._series.get(market)
+        restored_at = self._restored_at.get(market)
+        if series is None or (restored_at is not None and time.monotonic() - restored_at > self.REFRESH_AFTER):
+            series = await self._restore(market) or series
+            if series is None:
+                return None
+        self._series.move_to_end(market)
+        self._evict(keep=market)
+        return series[resolution].tail(limit)
+
+    async def flush(self):
+        """Persist every market touched since the last flush."""
+        if not self._dirty or not self.cache:
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        for market in dirty:
+            payload = {res: s.dump() for res, s in self._series[market].items()}
+            try:
+                await self.cache.set(f"{self.CACHE_KEY_PREFIX}:{market}", json.dumps(payload))
+            except Exception as e:
+                self._dirty.add(market)
+                print(f"CandleAggregator: Flush error for {market}: {e}")
+        self._evict()
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop least recently used series beyond MAX_MARKETS (unflushed ones stay until flushed)."""
+        excess = len(self._series) - self.MAX_MARKETS
+        if excess <= 0:
+            return
+        victims = []
+        for market in self._series:
+            if market not in self._dirty and market != keep:
+                victims.append(market)
+                if len(victims) == excess:
+                    break
+        for market in victims:
+            del self._series[market]
+            self._restored_at.pop(market, None)
+
+    async def _get_or_restore(self, market: str) -> dict[str, CandleSeries]:
+        series = self._series.get(market)
+        if series is None:
+            series = await self._restore(market)
+        if series is None:
+            series = {res: CandleSeries(width) for res, width in RESOLUTIONS.items()}
+            self._series[market] = series
+        self._series.move_to_end(market)
+        return series
+
+    async def _restore(self, market: str) -> Optional[dict[str, CandleSeries]]:
+        if not self.cache:
+            return None
+        try:
+            cached = await self.cache.get(f"{self.CACHE_KEY_PREFIX}:{market}")
+        except Exception as e:
+            print(f"CandleAggregator: Cache read error: {e}")
+            return None
+        if not cached:
+            return None
+
+        data = json.loads(cached)
+        series = {
+            res: CandleSeries.load(width, data[res]) if res in data else CandleSeries(width)
+            for res, width in RESOLUTIONS.items()
+        }
+        self._series[market] = series
+        self._restored_at[market] = time.monotonic()
+        return series
+
+
+# Singleton
+_candle_aggregator: CandleAggregator | None = None
+
+
+def get_candle_aggregator() -> CandleAggregator:
+    """Get candle aggregator singleton."""
+    global _candle_aggregator
+    if _candle_aggregator is None:
+        _candle_aggregator = CandleAggregator()
+    return _candle_aggregator
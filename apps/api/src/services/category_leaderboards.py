@@ -0,0 +1,188 @@
+"""
+Foresynth API - Category Leaderboards
+
+Per-category trader leaderboards built from the closed positions the
+smart-money refresh already fetches. Each position is joined to its
+market's category through a cached conditionId -> category hash and added
+to Redis sorted sets (one per category and stat) with ZINCRBY. A per-wallet
+timestamp cursor makes ingestion incremental: re-fetched positions are
+skipped, so the boards only grow by what is new, and they accumulate every
+wallet ever scored instead of a single top-20 page.
+"""
+from typing import Optional
+
+from src.core import get_async_redis
+from src.services.polymarket import get_polymarket_service
+
+# Stats kept per (category, wallet); each is one sorted set
+STATS = ("pnl", "volume", "positions", "wins")
+
+UNCATEGORIZED = "Other"
+
+
+def category_slug(category: str) -> str:
+    return category.strip().lower().replace(" ", "-")
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CategoryLeaderboards:
+    """Incrementally maintained per-category leaderboards in Redis sorted sets."""
+
+    CATEGORY_KEY = "market_category"  # hash: conditionId -> category (never expires)
+    CATEGORIES_KEY = "leaderboard:categories"  # zset: category -> positions ingested
+    CURSOR_KEY = "leaderboard:cursor"  # hash: wallet -> newest ingested close timestamp
+    NAMES_KEY = "leaderboard:names"  # hash: wallet -> display name
+    PREFIX = "leaderboard:category"
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+
+    def _key(self, slug: str, stat: str) -> str:
+        return f"{self.PREFIX}:{slug}:{stat}"
+
+    async def resolve_categories(self, condition_ids: list[str]) -> dict[str, str]:
+        """Category per market: cached hash first, one batched Gamma lookup for the rest."""
+        redis = get_async_redis()
+        wanted = list(dict.fromkeys(c for c in condition_ids if c))
+        if not wanted:
+            return {}
+
+        cached = await redis.hmget(self.CATEGORY_KEY, wanted)
+        result = {cid: cat for cid, cat in zip(wanted, cached) if cat}
+        missing = [cid for cid in wanted if cid not in result]
+        if missing:
+            markets = await self.polymarket.get_markets_by_condition_ids(missing)
+            found = {m.condition_id: m.category or UNCATEGORIZED for m in markets if m.condition_id}
+            # Markets Gamma doesn't return are cached as uncategorized, not re-fetched
+            fetched = {cid: found.get(cid, UNCATEGORIZED) for cid in missing}
+            await redis.hset(self.CATEGORY_KEY, mapping=fetched)
+            result.update(fetched)
+        return result
+
+    async def ingest(self, wallets: list[dict]) -> int:
+        """
+        Add new closed positions to the boards.
+
+        `wallets` is a list of {"address", "name", "positions"} with positions
+        as returned by the Data API. Returns the number of positions added.
+        """
+        redis = get_async_redis()
+        wallets = [w for w in wallets if w.get("address") and w.get("positions")]
+        if not wallets:
+            return 0
+
+        cursors = await redis.hmget(self.CURSOR_KEY, [w["address"] for w in wallets])
+        fresh: list[tuple[str, dict]] = []
+        newest: dict[str, int] = {}
+        for wallet, cursor in zip(wallets, cursors):
+            since = int(cursor or 0)
+            for p in wallet["positions"]:
+                ts = int(_float(p.get("timestamp")))
+                if ts > since and p.get("conditionId"):
+                    fresh.append((wallet["address"], p))
+                    newest[wallet["address"]] = max(newest.get(wallet["address"], 0), ts)
+        if not fresh:
+            return 0
+
+        categories = await self.resolve_categories([p["conditionId"] for _, p in fresh])
+
+        # Aggregate in Python so each (category, wallet, stat) is one ZINCRBY
+        totals: dict[tuple[str, str], list[float]] = {}
+        for address, p in fresh:
+            category = categories.get(p["conditionId"], UNCATEGORIZED)
+            row = totals.setdefault((category, address), [0.0, 0.0, 0.0, 0.0])
+            pnl = _float(p.get("realizedPnl"))
+            row[0] += pnl
+            row[1] += _float(p.get("totalBought")) * _float(p.get("avgPrice"))
+            row[2] += 1
+            row[3] += pnl > 0
+
+        per_category: dict[str, float] = {}
+        pipe = redis.pipeline(transaction=False)
+        for (category, address), row in totals.items():
+            slug = category_slug(category)
+            # Zero increments too, so every stat's set lists the wallet
+            for stat, value in zip(STATS, row):
+                pipe.zincrby(self._key(slug, stat), value, address)
+            per_category[category] = per_category.get(category, 0) + row[2]
+        for category, count in per_category.items():
+            pipe.zincrby(self.CATEGORIES_KEY, count, category)
+
+        names = {w["address"]: w["name"] for w in wallets if w.get("name")}
+        if names:
+            pipe.hset(self.NAMES_KEY, mapping=names)
+        # Cursor last: a crash before this point re-applies the batch at worst
+        pipe.hset(self.CURSOR_KEY, mapping=newest)
+        await pipe.execute()
+        return len(fresh)
+
+    async def list_categories(self) -> list[dict]:
+        """Every category with ingested positions, largest first."""
+        redis = get_async_redis()
+        rows = await redis.zrevrange(self.CATEGORIES_KEY, 0, -1, withscores=True)
+        pipe = redis.pipeline(transaction=False)
+        for category, _ in rows:
+            pipe.zcard(self._key(category_slug(category), "positions"))
+        traders = await pipe.execute()
+        return [
+            {"category": category, "slug": category_slug(category), "positions": int(score), "traders": count}
+            for (category, score), count in zip(rows, traders)
+        ]
+
+    async def get_leaderboard(self, category: str, limit: int = 50, offset: int = 0,
+                              sort: str = "pnl") -> Optional[dict]:
+        """One page of a category board ordered by `sort`; None for an unknown category."""
+        if sort not in STATS:
+            raise ValueError(f"sort must be one of: {', '.join(STATS)}")
+
+        redis = get_async_redis()
+        slug = category_slug(category)
+        total = await redis.zcard(self._key(slug, "positions"))
+        if not total:
+            return None
+
+        page = await redis.zrevrange(self._key(slug, sort), offset, offset + limit - 1, withscores=True)
+        addresses = [address for address, _ in page]
+
+        traders = []
+        if addresses:
+            pipe = redis.pipeline(transaction=False)
+            for stat in STATS:
+                pipe.zmscore(self._key(slug, stat), addresses)
+            pipe.hmget(self.NAMES_KEY, addresses)
+            *stats, names = await pipe.execute()
+            columns = dict(zip(STATS, stats))
+
+            for i, address in enumerate(addresses):
+                positions = int(columns["positions"][i] or 0)
+                wins = int(columns["wins"][i] or 0)
+                traders.append({
+                    "rank": offset + i + 1,
+                    "address": address,
+                    "name": names[i] or "Unknown Trader",
+                    "pnl": round(columns["pnl"][i] or 0.0, 2),
+                    "volume": round(columns["volume"][i] or 0.0, 2),
+                    "positions": positions,
+                    "wins": wins,
+                    "winRate": round(wins / positions * 100, 2) if positions else 0.0,
+                })
+
+        return {"category": slug, "sort": sort, "total": total, "traders": traders}
+
+
+# Singleton
+_category_leaderboards: CategoryLeaderboards | None = None
+
+
+def get_category_leaderboards() -> CategoryLeaderboards:
+    """Get category leaderboards singleton."""
+    global _category_leaderboards
+    if _category_leaderboards is None:
+        _category_leaderboards = CategoryLeaderboards()
+    return _category_leaderboards
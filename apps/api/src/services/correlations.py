@@ -0,0 +1,234 @@
+"""
+Foresynth API - Market Correlations
+
+Users with large watchlists are often exposed to the same underlying event
+several times over. A background job resamples the YES price history of
+every watched market onto one hourly grid, takes hourly returns and
+computes the pairwise Pearson correlation matrix in row blocks with NumPy:
+each block is six matrix products over the return and validity matrices,
+so every pair is correlated over exactly the hours both markets traded.
+Pairs with too little overlap are dropped, and the strongest neighbours of
+each market are stored in Supabase
+
+    market_correlations  market_id -> [{market_id, question, slug, correlation, overlap}]
+
+where the markets endpoints and the agent read them with one query.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+from src.core import get_async_redis, get_supabase
+from src.services.polymarket import get_polymarket_service
+
+BUCKET = 3600  # seconds per return
+STALE_AFTER = 6 * 3600  # a market's last price stops carrying forward after this
+
+
+def hourly_returns(histories: list[dict], start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Resample `{"t", "p"}` histories onto a common hourly grid and difference them.
+
+    Returns (returns, valid), both (n_markets, n_hours - 1); a return is valid
+    when both of its closes fall inside the market's own history.
+    """
+    grid = np.arange(start - start % BUCKET, end + 1, BUCKET, dtype=np.int64)
+    closes = np.full((len(histories), len(grid)), np.nan)
+    for i, h in enumerate(histories):
+        t = np.asarray(h["t"], dtype=np.int64)
+        if not len(t):
+            continue
+        idx = np.searchsorted(t, grid, side="right") - 1
+        inside = (idx >= 0) & (grid - t[np.maximum(idx, 0)] <= STALE_AFTER)
+        closes[i, inside] = np.asarray(h["p"], dtype=float)[idx[inside]]
+
+    returns = np.diff(closes, axis=1)
+    valid = np.isfinite(returns)
+    return np.where(valid, returns, 0.0), valid
+
+
+def top_correlations(
+    returns: np.ndarray,
+    valid: np.ndarray,
+    k: int,
+    min_overlap: int,
+    block: int = 256,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Top-`k` neighbours per market by |Pearson r| over pairwise-overlapping returns.
+
+    `returns` must be zero wherever `valid` is False. Returns (index, r, overlap),
+    each (n, k); missing neighbours have index -1 and r NaN. Memory is
+    O(block * n), so thousands of markets never materialize the full matrix.
+    """
+    n = len(returns)
+    k = min(k, max(n - 1, 0))
+    index = np.full((n, k), -1, dtype=np.int64)
+    corr = np.full((n, k), np.nan)
+    overlap = np.zeros((n, k), dtype=np.int64)
+    if not k:
+        return index, corr, overlap
+
+    m = valid.astype(float)
+    x = returns
+    x2 = x * x
+    for lo in range(0, n, block):
+        hi = min(lo + block, n)
+        mb, xb = m[lo:hi], x[lo:hi]
+        # Sums over the hours where both markets of each pair have a return
+        cnt = mb @ m.T
+        sx = xb @ m.T
+        sy = mb @ x.T
+        sxx = (xb * xb) @ m.T
+        syy = mb @ x2.T
+        sxy = xb @ x.T
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy - sx * sy / cnt
+            var = (sxx - sx * sx / cnt) * (syy - sy * sy / cnt)
+            r = cov / np.sqrt(var)
+        # Flat or barely overlapping pairs carry no signal
+        r[(cnt < min_overlap) | ~(var > 1e-12)] = np.nan
+        r[np.arange(hi - lo), np.arange(lo, hi)] = np.nan
+
+        strength = np.nan_to_num(np.abs(r), nan=-1.0)
+        top = np.argpartition(-strength, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(strength, top, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        picked = np.take_along_axis(r, top, axis=1)
+        found = np.isfinite(picked)
+        index[lo:hi] = np.where(found, top, -1)
+        corr[lo:hi] = picked
+        overlap[lo:hi] = np.where(found, np.take_along_axis(cnt, top, axis=1), 0)
+    return index, corr, overlap
+
+
+class MarketCorrelations:
+    """Hourly job computing correlated neighbours for every watched market."""
+
+    TABLE = "market_correlations"
+    LOCK_KEY = "correlations:refresh_lock"
+    REFRESH_INTERVAL = 3600  # seconds
+    INTERVAL = "1m"  # price history window (Gamma/CLOB interval name)
+    TOP_K = 10
+    MIN_OVERLAP = 72  # hourly returns both markets must share
+    MIN_CORRELATION = 0.3  # weaker neighbours are not stored
+    CONCURRENCY = 8  # parallel price-history fetches
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+        self.db = get_supabase()
+        self.is_running = False
+
+    async def start(self):
+        """Start the background refresh loop."""
+        if self.is_running:
+            return
+        self.is_running = True
+        asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+
+    async def _loop(self):
+        while self.is_running:
+            try:
+                if await self._acquire_lock():
+                    await self.refresh()
+            except Exception as e:
+                print(f"MarketCorrelations: Refresh error: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+
+    async def _acquire_lock(self) -> bool:
+        try:
+            lock = await get_async_redis().set(self.LOCK_KEY, "1", nx=True, ex=self.REFRESH_INTERVAL - 60)
+            return bool(lock)
+        except Exception as e:
+            print(f"MarketCorrelations: Lock error: {e}")
+            return True
+
+    async def _watched_market_ids(self) -> list[str]:
+        response = await asyncio.to_thread(self.db.table("watchlists").select("market_ids").execute)
+        return list(dict.fromkeys(m for row in response.data or [] for m in row.get("market_ids") or []))
+
+    async def refresh(self) -> int:
+        """Recompute neighbours for all watched markets; returns the number of rows written."""
+        resolved = await self.polymarket.resolve_markets(await self._watched_market_ids())
+        markets = list({m.condition_id: m for m in resolved.values() if m.condition_id and m.clob_token_id}.values())
+        if len(markets) < 2:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def _history(token_id: str) -> dict:
+            async with semaphore:
+                try:
+                    history = await self.polymarket.get_price_history(token_id, self.INTERVAL)
+                except Exception as e:
+                    print(f"MarketCorrelations: History error for {token_id}: {e}")
+                    history = None
+                # get_price_history returns None on HTTP errors; that market just has no returns
+                return history or {"t": [], "p": []}
+
+        histories = await asyncio.gather(*(_history(m.clob_token_id) for m in markets))
+        end = int(time.time())
+        start = min((h["t"][0] for h in histories if h["t"]), default=end)
+        returns, valid = hourly_returns(histories, start, end)
+        index, corr, overlap = await asyncio.to_thread(
+            top_correlations, returns, valid, self.TOP_K, self.MIN_OVERLAP
+        )
+
+        computed_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for i, market in enumerate(markets):
+            neighbors = [
+                {
+                    "market_id": markets[j].condition_id,
+                    "question": markets[j].question,
+                    "slug": markets[j].slug,
+                    "correlation": round(float(r), 4),
+                    "overlap": int(o),
+                }
+                for j, r, o in zip(index[i], corr[i], overlap[i])
+                if j >= 0 and abs(r) >= self.MIN_CORRELATION
+            ]
+            rows.append({
+                "market_id": market.condition_id,
+                "question": market.question,
+                "slug": market.slug,
+                "neighbors": neighbors,
+                "computed_at": computed_at,
+            })
+
+        await asyncio.to_thread(self.db.table(self.TABLE).upsert(rows, on_conflict="market_id").execute)
+        # Markets no longer on any watchlist
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.REFRESH_INTERVAL * 3)).isoformat()
+        await asyncio.to_thread(self.db.table(self.TABLE).delete().lt("computed_at", cutoff).execute)
+        print(f"MarketCorrelations: {len(rows)} markets, {sum(len(r['neighbors']) for r in rows)} neighbours")
+        return len(rows)
+
+    async def get_neighbors(self, condition_ids: list[str]) -> dict[str, dict]:
+        """Stored rows by condition ID in one query (markets without a row are omitted)."""
+        condition_ids = list(dict.fromkeys(c for c in condition_ids if c))
+        if not condition_ids:
+            return {}
+        response = await asyncio.to_thread(
+            self.db.table(self.TABLE).select("*").in_("market_id", condition_ids).execute
+        )
+        return {row["market_id"]: row for row in response.data or []}
+
+
+# Singleton
+_market_correlations: MarketCorrelations | None = None
+
+
+def get_market_correlations() -> MarketCorrelations:
+    """Get market correlations singleton."""
+    global _market_correlations
+    if _market_correlations is None:
+        _market_correlations = MarketCorrelations()
+    return _market_correlations
@@ -0,0 +1,114 @@
+"""
+Foresynth API - Time Series Downsampling
+
+Reduces raw price histories to a fixed number of points for charting.
+Both algorithms keep the first and last sample so the chart spans the
+full requested interval.
+"""
+from typing import Sequence
+
+
+def lttb(
+    ts: Sequence[float],
+    values: Sequence[float],
+    threshold: int
+) -> tuple[list[float], list[float]]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the points that preserve the visual shape of the series,
+    which is what a line chart needs.
+    """
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return list(ts), list(values)
+
+    out_t = [ts[0]]
+    out_v = [values[0]]
+
+    # Bucket size for the points between the fixed first and last samples
+    every = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        if span > 0:
+            avg_t = sum(ts[next_start:next_end]) / span
+            avg_v = sum(values[next_start:next_end]) / span
+        else:
+            avg_t, avg_v = ts[n - 1], values[n - 1]
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        at, av = ts[a], values[a]
+
+        max_area = -1.0
+        chosen = start
+        for j in range(start, end):
+            area = abs(
+                (at - avg_t) * (values[j] - av)
+                - (at - ts[j]) * (avg_v - av)
+            )
+            if area > max_area:
+                max_area = area
+                chosen = j
+
+        out_t.append(ts[chosen])
+        out_v.append(values[chosen])
+        a = chosen
+
+    out_t.append(ts[n - 1])
+    out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+def minmax(
+    ts: Sequence[float],
+    values: Sequence[float],
+    threshold: int
+) -> tuple[list[float], list[float]]:
+    """
+    Min/max bucketing.
+
+    Emits the lowest and highest sample of each bucket in time order,
+    so spikes are never smoothed away.
+    """
+    n = len(ts)
+    if threshold >= n or threshold < 4:
+        return list(ts), list(values)
+
+    out_t = [ts[0]]
+    out_v = [values[0]]
+
+    buckets = (threshold - 2) // 2
+    every = (n - 2) / buckets
+
+    for i in range(buckets):
+        start = int(i * every) + 1
+        end = min(int((i + 1) * every) + 1, n - 1)
+        if start >= end:
+            continue
+
+        lo = hi = start
+        for j in range(start + 1, end):
+            if values[j] < values[lo]:
+                lo = j
+            elif values[j] > values[hi]:
+                hi = j
+
+        for j in sorted({lo, hi}):
+            out_t.append(ts[j])
+            out_v.append(values[j])
+
+    out_t.append(ts[n - 1])
+    out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+DOWNSAMPLERS = {
+    "lttb": lttb,
+    "minmax": minmax,
+}
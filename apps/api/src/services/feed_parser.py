@@ -0,0 +1,174 @@
+"""
+Foresynth API - Feed Parser
+
+Streaming RSS/Atom parser for the only fields the intel feed uses (title,
+link, published date). Bytes are fed to an incremental XML pull parser and
+each <item>/<entry> is emitted and cleared as soon as it closes, so memory
+stays flat and parsing stops after `limit` entries instead of building a
+full document tree. Entity-heavy or malformed feeds the parser cannot read
+are handed to feedparser, which is far slower but tolerant.
+
+Large feeds are parsed in a bounded process pool so parsing never holds the
+API's GIL; small ones are parsed inline, where a pool round trip would cost
+more than the parse. Workers are spawned, not forked, so they never inherit
+the API's threads or sockets.
+"""
+import asyncio
+import html
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import feedparser
+
+CHUNK_SIZE = 64 * 1024
+INLINE_MAX_BYTES = 32 * 1024  # smaller feeds are parsed on the event loop
+
+_ROOTS = {"rss", "RDF", "feed"}
+_ENTRIES = {"item", "entry"}
+_DATE_TAGS = ("published", "pubDate", "issued", "date", "updated", "modified")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _utc_iso(dt: datetime) -> str:
+    """Naive UTC ISO string with a Z suffix, the format feedparser items used."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat() + "Z"
+
+
+def _parse_date(value: str) -> Optional[str]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        if value[:4].isdigit():  # ISO 8601 (Atom, dc:date)
+            return _utc_iso(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        return _utc_iso(parsedate_to_datetime(value))  # RFC 822 (RSS pubDate)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _clean(text: Optional[str]) -> str:
+    text = (text or "").strip()
+    if "<" in text:
+        text = html.unescape(_TAG_RE.sub("", text)).strip()
+    return text
+
+
+def parse_stream(content: bytes, limit: int = 10) -> Optional[list[dict]]:
+    """
+    Up to `limit` entries as {"title", "link", "published_at"} (published_at
+    None when undated), or None when the document is not a feed this parser
+    handles, so the caller can fall back to feedparser.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    entries: list[dict] = []
+    current: Optional[dict] = None
+    depth = 0
+    root_checked = False
+    try:
+        for offset in range(0, len(content), CHUNK_SIZE):
+            parser.feed(content[offset:offset + CHUNK_SIZE])
+            for event, elem in parser.read_events():
+                tag = _local(elem.tag)
+                if event == "start":
+                    if not root_checked:
+                        if tag not in _ROOTS:
+                            return None
+                        root_checked = True
+                    if tag in _ENTRIES and current is None:
+                        current, depth = {}, 0
+                    elif current is not None:
+                        depth += 1
+                    continue
+
+                if current is None:
+                    continue
+                if tag in _ENTRIES and depth == 0:
+                    if not current.get("title") and not current.get("link"):
+                        return None
+                    dates = current.get("dates", {})
+                    entries.append({
+                        "title": current.get("title") or "Untitled",
+                        "link": current.get("link", ""),
+                        "published_at": next((dates[t] for t in _DATE_TAGS if dates.get(t)), None),
+                    })
+                    current = None
+                    elem.clear()
+                    if len(entries) >= limit:
+                        return entries
+                    continue
+
+                depth -= 1
+                if depth != 0:
+                    continue  # only direct children of the entry
+                if tag == "title":
+                    current["title"] = _clean("".join(elem.itertext()))
+                elif tag == "link":
+                    # Atom: <link rel="alternate" href="..."/>; RSS: <link>url</link>
+                    href = elem.get("href")
+                    if href is None:
+                        current.setdefault("link", (elem.text or "").strip())
+                    elif elem.get("rel", "alternate") == "alternate":
+                        current["link"] = href.strip()
+                elif tag in _DATE_TAGS:
+                    current.setdefault("dates", {})[tag] = _parse_date(elem.text)
+        parser.close()
+    except ParseError:
+        return None
+    return entries if root_checked else None
+
+
+def parse_feedparser(content: bytes, limit: int = 10) -> list[dict]:
+    """The same entry shape via feedparser (tolerant of broken feeds, slow)."""
+    feed = feedparser.parse(content)
+    entries = []
+    for entry in feed.entries[:limit]:
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        entries.append({
+            "title": entry.get("title", "Untitled"),
+            "link": entry.get("link", ""),
+            "published_at": datetime(*parsed[:6]).isoformat() + "Z" if parsed else None,
+        })
+    return entries
+
+
+def parse(content: bytes, limit: int = 10) -> list[dict]:
+    """Streaming parse with feedparser as the fallback."""
+    entries = parse_stream(content, limit)
+    return entries if entries is not None else parse_feedparser(content, limit)
+
+
+class FeedParserPool:
+    """Bounded process pool for feed parsing; small feeds stay on the event loop."""
+
+    def __init__(self, workers: int = 2):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def parse(self, content: bytes, limit: int = 10) -> list[dict]:
+        if len(content) <= INLINE_MAX_BYTES:
+            entries = parse_stream(content, limit)
+            if entries is not None:
+                return entries
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), parse, content, limit)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,163 @@
+"""
+Foresynth API - Smart-Money Flow
+
+Rolling per-market aggregation of tracked-wallet trades: net USD flow,
+distinct buyers and sellers and size-weighted average entry over sliding
+windows. Trades land in fixed 15-minute buckets in Redis (a counter hash
+plus two HyperLogLogs of wallets per bucket, expiring after the longest
+window), so memory per market is constant and any window is the sum or
+union of its buckets.
+
+Direction is YES-equivalent: buying YES or selling NO is a buy, and prices
+are expressed as the YES price. "6 buyers, 1 seller" therefore means six
+wallets pushed the market toward YES.
+"""
+import time
+from typing import Optional
+
+from src.core import get_async_redis
+from src.services.normalizer import TradeData
+
+BUCKET = 900  # seconds
+
+# Window name -> seconds
+WINDOWS = {
+    "1h": 3600,
+    "6h": 21600,
+    "24h": 86400,
+}
+
+_COUNTERS = ("buy_usd", "sell_usd", "buy_shares", "sell_shares", "buy_px", "sell_px", "trades")
+
+
+def format_flow(summary: dict) -> str:
+    """One-line summary for alerts and prompts."""
+    net = summary["net_usd"]
+    parts = [
+        f"{summary['buyers']} buying / {summary['sellers']} selling wallets",
+        f"net {'+' if net >= 0 else '-'}${abs(net):,.0f}",
+    ]
+    if summary.get("avg_buy_price") is not None:
+        parts.append(f"avg YES entry {summary['avg_buy_price']:.3f}")
+    return f"{', '.join(parts)} ({summary['trades']} trades, {summary['window']})"
+
+
+class FlowAggregator:
+    """Time-bucketed flow counters per market, shared across workers via Redis."""
+
+    PREFIX = "flow"
+    MARKETS_KEY = "flow:markets"  # zset: conditionId -> last trade timestamp
+
+    def _bucket_key(self, condition_id: str, bucket: int) -> str:
+        return f"{self.PREFIX}:{condition_id}:{bucket}"
+
+    async def ingest(self, trades: list[TradeData]):
+        """Fold observed trades into their buckets (one pipeline per batch)."""
+        trades = [t for t in trades if t.condition_id and t.wallet and t.size > 0]
+        if not trades:
+            return
+
+        redis = get_async_redis()
+        ttl = max(WINDOWS.values()) + BUCKET
+        latest: dict[str, int] = {}
+        pipe = redis.pipeline(transaction=False)
+        for t in trades:
+            # YES-equivalent direction and price
+            bullish = (t.side == "BUY") == (t.outcome_index == 0)
+            yes_price = t.price if t.outcome_index == 0 else 1 - t.price
+            prefix = "buy" if bullish else "sell"
+
+            key = self._bucket_key(t.condition_id, t.timestamp - t.timestamp % BUCKET)
+            pipe.hincrbyfloat(key, f"{prefix}_usd", t.size * t.price)
+            pipe.hincrbyfloat(key, f"{prefix}_shares", t.size)
+            pipe.hincrbyfloat(key, f"{prefix}_px", yes_price * t.size)
+            pipe.hincrby(key, "trades", 1)
+            if t.title or t.slug:
+                pipe.hset(key, mapping={"title": t.title or "", "slug": t.slug or ""})
+            pipe.expire(key, ttl)
+            pipe.pfadd(f"{key}:{prefix}ers", t.wallet)
+            pipe.expire(f"{key}:{prefix}ers", ttl)
+            latest[t.condition_id] = max(latest.get(t.condition_id, 0), t.timestamp)
+
+        pipe.zadd(self.MARKETS_KEY, latest)
+        # Markets idle for longer than the longest window drop out of the index
+        pipe.zremrangebyscore(self.MARKETS_KEY, 0, time.time() - ttl)
+        await pipe.execute()
+
+    async def _summaries(self, condition_ids: list[str], window: str, now: Optional[float] = None) -> list[dict]:
+        span = WINDOWS[window]
+        now = now or time.time()
+        last = int(now) - int(now) % BUCKET
+        buckets = list(range(last - span + BUCKET, last + 1, BUCKET))
+
+        redis = get_async_redis()
+        pipe = redis.pipeline(transaction=False)
+        for cid in condition_ids:
+            keys = [self._bucket_key(cid, b) for b in buckets]
+            for key in keys:
+                pipe.hgetall(key)
+            pipe.pfcount(*[f"{k}:buyers" for k in keys])
+            pipe.pfcount(*[f"{k}:sellers" for k in keys])
+        results = await pipe.execute()
+
+        summaries = []
+        step = len(buckets) + 2
+        for i, cid in enumerate(condition_ids):
+            rows = results[i * step:i * step + len(buckets)]
+            buyers, sellers = results[i * step + len(buckets)], results[i * step + len(buckets) + 1]
+            totals = dict.fromkeys(_COUNTERS, 0.0)
+            title = slug = None
+            for row in rows:
+                for name in _COUNTERS:
+                    totals[name] += float(row.get(name) or 0)
+                title = row.get("title") or title
+                slug = row.get("slug") or slug
+            if not totals["trades"]:
+                continue
+
+            summaries.append({
+                "market_id": cid,
+                "title": title,
+                "slug": slug,
+                "window": window,
+                "trades": int(totals["trades"]),
+                "buy_usd": round(totals["buy_usd"], 2),
+                "sell_usd": round(totals["sell_usd"], 2),
+                "net_usd": round(totals["buy_usd"] - totals["sell_usd"], 2),
+                "buyers": buyers,
+                "sellers": sellers,
+                "avg_buy_price": round(totals["buy_px"] / totals["buy_shares"], 4) if totals["buy_shares"] else None,
+                "avg_sell_price": round(totals["sell_px"] / totals["sell_shares"], 4) if totals["sell_shares"] else None,
+            })
+        return summaries
+
+    async def get_flow(self, condition_id: str, window: str = "1h") -> Optional[dict]:
+        """Flow summary for one market, or None without trades in the window."""
+        summaries = await self._summaries([condition_id], window)
+        return summaries[0] if summaries else None
+
+    async def get_top(self, window: str = "1h", limit: int = 20, sort: str = "net") -> list[dict]:
+        """Markets with tracked-wallet flow in the window, strongest first."""
+        redis = get_async_redis()
+        active = await redis.zrevrangebyscore(self.MARKETS_KEY, "+inf", time.time() - WINDOWS[window])
+        summaries = await self._summaries(list(active), window)
+
+        keys = {
+            "net": lambda s: abs(s["net_usd"]),
+            "volume": lambda s: s["buy_usd"] + s["sell_usd"],
+            "wallets": lambda s: s["buyers"] + s["sellers"],
+        }
+        summaries.sort(key=keys[sort], reverse=True)
+        return summaries[:limit]
+
+
+# Singleton
+_flow_aggregator: FlowAggregator | None = None
+
+
+def get_flow_aggregator() -> FlowAggregator:
+    """Get flow aggregator singleton."""
+    global _flow_aggregator
+    if _flow_aggregator is None:
+        _flow_aggregator = FlowAggregator()
+    return _flow_aggregator
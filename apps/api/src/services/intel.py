@@ -1,29 +1,92 @@
+import asyncio
 import httpx
-import feedparser
+import hashlib
 import json
-import asyncio
-from typing import List, Dict, Any, Optional
+import re
+import time
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from src.core.config import get_settings
-from src.core.cache import get_redis
+from src.core.cache import get_async_redis
+from src.core.http import get_http_client
+from src.services.feed_parser import FeedParserPool
+from src.services.near_duplicates import MinHashLSH, shingles
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 settings = get_settings()
 
+# Feed reads decode one item per row; orjson when installed
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Per-source fetch state to save after a feed write: source key -> hash fields
+SourceStates = Dict[str, Dict[str, Any]]
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", (title or "").lower()).split())
+
+
+def _epoch(published_at: str) -> float:
+    try:
+        return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
 class IntelService:
     """
     Architecture Design:
-    1. Parallel Fetching: Uses `asyncio.gather` to fetch from all sources concurrently.
-    2. Global Gating: `asyncio.wait_for` ensures a hard timeout (8s) so the API never hangs.
-    3. Resilient Caching: Uses Redis (Upstash) to store results for 5 minutes.
-    4. Graceful Degradation: If a source fails or timeouts, partial results are returned.
-    5. Non-Blocking: Sync calls (Redis, feedparser) are wrapped in `asyncio.to_thread`.
+    1. Background Prefetch: a refresher rebuilds the feed shortly before it goes stale;
+       requests never touch the sources, and no query parameter changes upstream traffic.
+    2. Canonical Feed: one deduplicated feed in Redis. Near-duplicate titles (MinHash +
+       LSH banding, see near_duplicates) are clustered into one story item whose
+       representative is the earliest report and which lists every source carrying it:
+         intel:feed                 zset  item id -> publish time (newest first)
+         intel:items                hash  item id -> item JSON (with precomputed attributes)
+         intel:feed:{kind|source|tag}:{value}  zsets  per-attribute indexes
+       A refresh rewrites all keys in one MULTI, so readers never see a half-built feed.
+    3. Per-Source Merge: sources (CryptoPanic, GDELT, each RSS feed) are fetched under
+       one hard timeout (8s) and merged into the existing items; a source that fails
+       or times out simply adds nothing, and its earlier items stay until retention.
+    4. Server-Side Filters: kind, source and tag filters read their index; any limit
+       and cursor page is a ZREVRANGEBYSCORE below the cursor plus one HMGET.
+    5. Non-Blocking: Redis is async; RSS/Atom is parsed by a streaming parser, large
+       feeds in a bounded process pool (see feed_parser), so parsing stays off the GIL.
     """
     
-    CRYPTOPANIC_API = "https://cryptopanic.com/api/v1/posts/"
-    GDELT_DOC_API = "https://api.gdeltproject.org/api/v2/doc/doc"
-    CACHE_KEY_PREFIX = "foresynth:intel_feed"
-    CACHE_TTL = 300  # 5 minutes
+    CRYPTOPANIC_API = f"{settings.cryptopanic_api_base}/posts/"
+    GDELT_DOC_API = f"{settings.gdelt_api_base}/doc/doc"
+    FEED_KEY = "intel:feed"
+    ITEMS_KEY = "intel:items"
+    INDEX_KEYS_KEY = "intel:feed:indexes"  # index keys written by the last refresh
+    LOCK_KEY = "intel:refresh_lock"
+    COLD_BACKOFF_KEY = "intel:cold_backoff"  # set while a forced rebuild came back empty
+    COLD_BACKOFF = 60  # seconds before requests may force another rebuild
+    CACHE_TTL = 300  # 5 minutes: how old the feed may get
+    REFRESH_INTERVAL = CACHE_TTL - 30  # rebuild shortly before it goes stale
     GLOBAL_TIMEOUT = 8.0 
+    FETCH_LIMIT = 50  # items requested per API source
+    MAX_ITEMS = 500  # canonical feed size
+    RETENTION = 48 * 3600  # seconds
+
+    # Precomputed tags
+    FILTERS = ("rising", "hot", "bullish", "bearish")
+    HOT_SOURCES = 2  # distinct sources carrying a story
+    HOT_REPORTS = 3  # or reports clustered into it (one source may run several)
+    HOT_VOTES = 5  # or CryptoPanic important + positive + liked votes
+    RISING_WINDOW = 3 * 3600  # recent items with any traction
+    SENTIMENT_VOTES = 2  # net positive/negative votes for bullish/bearish
+    NEAR_DUP_THRESHOLD = 0.8  # title bigram Jaccard at which reports are one story
+    
+    # Per-source fetch cache: a source is not requested again within its TTL, then
+    # revalidated with If-None-Match / If-Modified-Since
+    SOURCE_KEY_PREFIX = "intel:source"
+    SOURCE_TTL = {"cryptopanic": 240, "gdelt": 900, "rss": 600}  # seconds
     
     RSS_FEEDS = {
         "The Guardian": "https://www.theguardian.com/world/rss",
@@ -32,72 +95,314 @@ class IntelService:
     }
 
     def __init__(self):
-        try:
-            self.redis = get_redis()
-        except Exception as e:
-            print(f"IntelService: Redis init failed (falling back to no-cache): {e}")
-            self.redis = None
+        self.is_running = False
+        self._inflight: Optional[asyncio.Task] = None
+        self.parser = FeedParserPool(settings.rss_parse_workers)
 
-    async def get_aggregated_feed(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Fetch and aggregate news from all sources with caching."""
-        cache_key = f"{self.CACHE_KEY_PREFIX}:{limit}"
-        
-        # 1. Attempt Cache Hit
-        if self.redis:
+    async def start(self):
+        """Start the background prefetch loop."""
+        if self.is_running:
+            return
+        self.is_running = True
+        asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+        self.parser.shutdown()
+
+    async def _loop(self):
+        while self.is_running:
             try:
-                cached = await asyncio.to_thread(self.redis.get, cache_key)
-                if cached:
-                    return json.loads(cached)
+                if await self._acquire_lock():
+                    # An empty feed (e.g. evicted keys) is rebuilt from full source responses
+                    await self.refresh(force=not await get_async_redis().zcard(self.FEED_KEY))
             except Exception as e:
-                print(f"IntelService: Cache read error: {e}")
-
-        # 2. Parallel Fetch with Exception Handling
-        tasks = [
-            self.fetch_cryptopanic(limit=limit // 2),
-            self.fetch_gdelt(limit=limit // 2),
-            self.fetch_rss_all()
-        ]
-        
+                print(f"IntelService: Refresh error: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+
+    async def _acquire_lock(self) -> bool:
         try:
-            # We use gather with return_exceptions to ensure partial success
-            # wrapped in wait_for for a hard global limit
-            results_wrapped = await asyncio.wait_for(
-                asyncio.gather(*tasks, return_exceptions=True),
-                timeout=self.GLOBAL_TIMEOUT
-            )
-            
-            all_items = []
-            for res in results_wrapped:
-                if isinstance(res, list):
-                    all_items.extend(res)
-                elif isinstance(res, Exception):
-                    print(f"IntelService: Source fetcher failed: {res}")
-                    
-        except asyncio.TimeoutError:
-            print(f"IntelService: Global timeout ({self.GLOBAL_TIMEOUT}s) reached. Serving partial/stored data.")
-            return [] # In a production system, we might return stale cache here if available
+            return bool(await get_async_redis().set(self.LOCK_KEY, "1", nx=True, ex=self.REFRESH_INTERVAL - 10))
         except Exception as e:
-            print(f"IntelService: Aggregation error: {e}")
-            return []
-        
-        # 3. Sort by date (descending)
-        all_items.sort(key=lambda x: x.get("published_at", ""), reverse=True)
-        final_items = all_items[:limit]
-        
-        # 4. Background Cache Update
-        if final_items and self.redis:
-            try:
-                data_str = json.dumps(final_items)
-                await asyncio.to_thread(self.redis.setex, cache_key, self.CACHE_TTL, data_str)
-            except Exception as e:
-                print(f"IntelService: Cache write error: {e}")
-                
-        return final_items
+            print(f"IntelService: Lock error: {e}")
+            return True
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    @staticmethod
+    def _slug(value: str) -> str:
+        return value.lower().replace(" ", "-")
+
+    def _index_key(self, kind: str = "all", source: Optional[str] = None, filter: str = "all") -> str:
+        """The narrowest index covering the request (other conditions are checked per item)."""
+        if filter != "all":
+            return f"{self.FEED_KEY}:tag:{filter}"
+        if source:
+            return f"{self.FEED_KEY}:source:{self._slug(source)}"
+        if kind != "all":
+            return f"{self.FEED_KEY}:kind:{kind}"
+        return self.FEED_KEY
+
+    async def get_feed(
+        self,
+        limit: int = 50,
+        cursor: Optional[float] = None,
+        kind: str = "all",
+        source: Optional[str] = None,
+        filter: str = "all",
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of the canonical feed, newest first, and the cursor of the next
+        page (None at the end). Built once on a cold start.
+        """
+        redis = get_async_redis()
+        key = self._index_key(kind, source, filter)
+        # Conditions the chosen index does not cover are checked per item
+        check_kind = kind != "all" and (filter != "all" or bool(source))
+        check_source = bool(source) and filter != "all"
+        batch = limit * 2 if check_kind or check_source else limit
+        upper = f"({cursor!r}" if cursor is not None else "+inf"
+        page: List[Dict[str, Any]] = []
+        last_score = None
+        while len(page) < limit:
+            ranked = await redis.zrevrangebyscore(key, upper, "-inf", start=0, num=batch, withscores=True)
+            if not ranked:
+                # Only an empty first page pays for the cold-start check
+                if page or cursor is not None or await redis.zcard(self.FEED_KEY) or not await self._cold_start():
+                    return page, None
+                continue
+            rows = await redis.hmget(self.ITEMS_KEY, [member for member, _ in ranked])
+            for (member, score), raw in zip(ranked, rows):
+                last_score = score
+                if raw is None:
+                    continue
+                item = _loads(raw)
+                if check_kind and item["kind"] != kind:
+                    continue
+                if check_source and self._slug(source) not in item["source_slugs"]:
+                    continue
+                page.append(item)
+                if len(page) == limit:
+                    break
+            upper = f"({last_score}"
+        return page, repr(last_score)
+
+    async def _cold_start(self) -> bool:
+        """Build an empty feed; False while a recent rebuild came back empty."""
+        # Single-flight: every caller during a cold start awaits the same refresh
+        if self._inflight is None or self._inflight.done():
+            # Sources that just returned nothing are not refetched on every request
+            if await get_async_redis().exists(self.COLD_BACKOFF_KEY):
+                return False
+            self._inflight = asyncio.create_task(self._rebuild())
+        await asyncio.shield(self._inflight)
+        return True
+
+    # ── Refresh ──────────────────────────────────────────────────
+
+    async def _rebuild(self) -> int:
+        """Forced refresh of an empty feed; backs off when it stays empty."""
+        size = await self.refresh(force=True)
+        if not size:
+            await get_async_redis().set(self.COLD_BACKOFF_KEY, "1", ex=self.COLD_BACKOFF)
+        return size
+
+    def _sources(self, force: bool = False) -> Dict[str, Any]:
+        """Source name -> coroutine factory; sources succeed or fail independently."""
+        sources = {
+            "cryptopanic": lambda: self.fetch_cryptopanic(limit=self.FETCH_LIMIT, force=force),
+            "gdelt": lambda: self.fetch_gdelt(limit=self.FETCH_LIMIT, force=force),
+        }
+        for name, url in self.RSS_FEEDS.items():
+            sources[f"rss:{name}"] = lambda name=name, url=url: self.fetch_rss(name, self._feed_url(name, url), force=force)
+        return sources
+
+    async def _fetch_all(self, force: bool = False) -> Tuple[List[Dict[str, Any]], SourceStates]:
+        """
+        New or changed items from every source that answers within the global
+        timeout, and the fetch state to save once they are in the feed.
+        """
+        tasks = {name: asyncio.create_task(factory()) for name, factory in self._sources(force).items()}
+        done, pending = await asyncio.wait(tasks.values(), timeout=self.GLOBAL_TIMEOUT)
+        for task in pending:
+            task.cancel()
 
-    async def fetch_cryptopanic(self, limit: int = 20) -> List[Dict[str, Any]]:
-        """Fetch from CryptoPanic with auth."""
+        items: List[Dict[str, Any]] = []
+        states: SourceStates = {}
+        for name, task in tasks.items():
+            if task in pending:
+                print(f"IntelService: {name} timed out after {self.GLOBAL_TIMEOUT}s, keeping its previous items")
+            elif task.exception():
+                print(f"IntelService: Source fetcher failed ({name}): {task.exception()}")
+            else:
+                source_items, state = task.result()
+                items.extend(source_items)
+                states.update(state)
+        return items, states
+
+    def _merge(self, items: List[Dict[str, Any]], now: float) -> List[Dict[str, Any]]:
+        """Cluster near-duplicate titles into stories, precompute attributes and apply retention."""
+        stories: Dict[str, Dict[str, Any]] = {}
+        index = MinHashLSH(self.NEAR_DUP_THRESHOLD)
+        for raw in items:
+            key = _normalize_title(raw.get("title", ""))
+            if not key:
+                continue
+            grams = shingles(key)
+            ts = raw.get("ts") or _epoch(raw.get("published_at", ""))
+            sources = raw.get("sources") or [raw.get("source", "Unknown")]
+            members = raw.get("members") or [raw.get("id") or key]
+            votes = raw.get("votes") or {}
+            story_id = index.match(grams)
+            if story_id is None:
+                # Stored stories keep their ID across refreshes
+                story_id = raw["id"] if "members" in raw else "in_" + hashlib.sha1(key.encode()).hexdigest()[:16]
+                index.add(story_id, grams)
+                stories[story_id] = {**raw, "id": story_id, "ts": ts, "sources": list(sources),
+                                     "members": list(members), "votes": dict(votes)}
+                continue
+            # Reworded titles join the index too, so later reports can match any of them
+            index.add(story_id, grams)
+            story = stories[story_id]
+            # Earliest report is the representative; coverage, reports and votes accumulate
+            if ts and (not story["ts"] or ts < story["ts"]):
+                story.update({k: raw[k] for k in ("title", "source", "url", "published_at", "domain") if k in raw}, ts=ts)
+            story["sources"] = list(dict.fromkeys(story["sources"] + list(sources)))
+            story["members"] = list(dict.fromkeys(story["members"] + list(members)))
+            for name, count in votes.items():
+                story["votes"][name] = max(story["votes"].get(name, 0), count or 0)
+            if raw.get("kind") == "media":
+                story["kind"] = "media"
+
+        merged = []
+        for story in stories.values():
+            if now - story["ts"] > self.RETENTION:
+                continue
+            votes = story["votes"]
+            traction = votes.get("important", 0) + votes.get("positive", 0) + votes.get("liked", 0)
+            sentiment = votes.get("positive", 0) - votes.get("negative", 0)
+            story["kind"] = story.get("kind") or "news"
+            story["source_slugs"] = [self._slug(name) for name in story["sources"]]
+            story["coverage"] = len(story["sources"])
+            story["cluster_size"] = len(story["members"])
+            hot = (story["coverage"] >= self.HOT_SOURCES or story["cluster_size"] >= self.HOT_REPORTS
+                   or traction >= self.HOT_VOTES)
+            story["tags"] = [tag for tag, on in (
+                ("hot", hot),
+                ("rising", now - story["ts"] <= self.RISING_WINDOW and (story["cluster_size"] > 1 or traction > 0)),
+                ("bullish", sentiment >= self.SENTIMENT_VOTES),
+                ("bearish", -sentiment >= self.SENTIMENT_VOTES),
+            ) if on]
+            merged.append(story)
+        merged.sort(key=lambda s: s["ts"], reverse=True)
+        return merged[:self.MAX_ITEMS]
+
+    def _score(self, item: Dict[str, Any]) -> float:
+        # Publish time plus a per-item fraction, so cursors never split same-second ties
+        return item["ts"] + (zlib.crc32(item["id"].encode()) % 1000) / 1000
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Merge new source items into the canonical feed; returns its size.
+        `force` bypasses the per-source fetch cache (used to rebuild an empty feed).
+        """
+        redis = get_async_redis()
+        previous = [json.loads(raw) for raw in (await redis.hgetall(self.ITEMS_KEY)).values()]
+        fetched, states = await self._fetch_all(force)
+        # Re-merged even when no source changed: retention and the rising tag move with time
+        items = self._merge(previous + fetched, time.time())
+
+        indexes: Dict[str, Dict[str, float]] = {}
+        for item in items:
+            score = self._score(item)
+            keys = [self._index_key(kind=item["kind"])]
+            keys += [f"{self.FEED_KEY}:source:{slug}" for slug in item["source_slugs"]]
+            keys += [self._index_key(filter=tag) for tag in item["tags"]]
+            for key in keys:
+                indexes.setdefault(key, {})[item["id"]] = score
+
+        stale = json.loads(await redis.get(self.INDEX_KEYS_KEY) or "[]")
+        pipe = redis.pipeline(transaction=True)
+        pipe.delete(self.FEED_KEY, self.ITEMS_KEY, *stale)
+        if items:
+            pipe.hset(self.ITEMS_KEY, mapping={item["id"]: json.dumps(item) for item in items})
+            pipe.zadd(self.FEED_KEY, {item["id"]: self._score(item) for item in items})
+        for key, members in indexes.items():
+            pipe.zadd(key, members)
+        pipe.set(self.INDEX_KEYS_KEY, json.dumps(list(indexes)))
+        await pipe.execute()
+
+        # Only now are the new items in the feed: saving fingerprints and
+        # validators earlier would mark them seen even if this write failed
+        if states:
+            pipe = redis.pipeline(transaction=False)
+            for key, mapping in states.items():
+                pipe.hset(key, mapping=mapping)
+            await pipe.execute()
+        return len(items)
+
+    # ── Per-source fetch cache ───────────────────────────────────
+
+    async def _conditional_get(
+        self, name: str, url: str, params: Optional[dict] = None, force: bool = False
+    ) -> Optional[httpx.Response]:
+        """
+        GET a source unless its cached copy is still fresh. Returns None when the
+        source was skipped (within its TTL), answered 304 Not Modified, returned
+        the same body as last time or failed; the caller only parses real changes.
+        """
+        redis = get_async_redis()
+        key = f"{self.SOURCE_KEY_PREFIX}:{name}"
+        state = await redis.hgetall(key)
+        now = time.time()
+        ttl = self.SOURCE_TTL.get(name.split(":", 1)[0], self.CACHE_TTL)
+        if not force and now - float(state.get("fetched_at") or 0) < ttl:
+            return None
+
+        headers = {}
+        if not force and state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if not force and state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        async with get_http_client() as client:
+            response = await client.get(url, params=params, headers=headers, timeout=5.0)
+        if response.status_code == 304:
+            await redis.hset(key, "fetched_at", now)
+            return None
+        if response.status_code != 200:
+            return None
+        # Sources without validators: an unchanged body is not parsed again
+        if not force and hashlib.sha1(response.content).hexdigest() == state.get("body_sha1"):
+            await redis.hset(key, "fetched_at", now)
+            return None
+        return response
+
+    async def _new_items(
+        self, name: str, response: httpx.Response, items: List[Dict[str, Any]], force: bool = False
+    ) -> Tuple[List[Dict[str, Any]], SourceStates]:
+        """
+        Items that are new or changed (e.g. new votes) since the previous
+        response of this source, and the source state (validators, fingerprints)
+        that refresh() saves after writing the feed.
+        `force` returns every item (a rebuild needs them even if seen before).
+        """
+        key = f"{self.SOURCE_KEY_PREFIX}:{name}"
+        seen = set(json.loads(await get_async_redis().hget(key, "fingerprints") or "[]"))
+        prints = [hashlib.sha1(json.dumps(item, sort_keys=True).encode()).hexdigest()[:16] for item in items]
+        state = {
+            "etag": response.headers.get("etag", ""),
+            "last_modified": response.headers.get("last-modified", ""),
+            "body_sha1": hashlib.sha1(response.content).hexdigest(),
+            "fingerprints": json.dumps(prints),
+            "fetched_at": time.time(),
+        }
+        return [item for item, fp in zip(items, prints) if force or fp not in seen], {key: state}
+
+    async def fetch_cryptopanic(self, limit: int = 20, force: bool = False) -> Tuple[List[Dict[str, Any]], SourceStates]:
+        """Fetch from CryptoPanic with auth (new or changed posts only)."""
         if not settings.cryptopanic_api_key:
-            return []
+            return [], {}
             
         params = {
             "auth_token": settings.cryptopanic_api_key,
@@ -105,26 +410,28 @@ class IntelService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.CRYPTOPANIC_API, params=params, timeout=5.0)
-                if response.status_code != 200:
-                    return []
-                data = response.json()
-                
-                return [{
-                    "id": f"cp_{p.get('id')}",
-                    "source": p.get("source", {}).get("title", "CryptoPanic"),
-                    "title": p.get("title"),
-                    "url": p.get("url"),
-                    "published_at": p.get("published_at"),
-                    "domain": p.get("domain", ""),
-                    "kind": "news"
-                } for p in data.get("results", [])[:limit]]
+            response = await self._conditional_get("cryptopanic", self.CRYPTOPANIC_API, params, force)
+            if response is None:
+                return [], {}
+            data = response.json()
+            
+            return await self._new_items("cryptopanic", response, [{
+                "id": f"cp_{p.get('id')}",
+                "source": p.get("source", {}).get("title", "CryptoPanic"),
+                "title": p.get("title"),
+                "url": p.get("url"),
+                "published_at": p.get("published_at"),
+                "domain": p.get("domain", ""),
+                "kind": p.get("kind") or "news",
+                "votes": p.get("votes") or {},
+            } for p in data.get("results", [])[:limit]], force)
         except Exception as e:
             print(f"IntelService: CryptoPanic error: {e}")
-            return []
+            return [], {}
 
-    async def fetch_gdelt(self, query: str = "polymarket OR prediction market OR election", limit: int = 20) -> List[Dict[str, Any]]:
+    async def fetch_gdelt(
+        self, query: str = "polymarket OR prediction market OR election", limit: int = 20, force: bool = False
+    ) -> Tuple[List[Dict[str, Any]], SourceStates]:
         """Fetch from GDELT Doc API (Robust handling)."""
         params = {
             "query": query,
@@ -135,81 +442,79 @@ class IntelService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.GDELT_DOC_API, params=params, timeout=5.0)
-                if response.status_code != 200:
-                    return []
+            response = await self._conditional_get("gdelt", self.GDELT_DOC_API, params, force)
+            if response is None:
+                return [], {}
+            
+            # Check if content-type is json
+            if "application/json" not in response.headers.get("content-type", "").lower():
+                return [], {}
                 
-                # Check if content-type is json
-                if "application/json" not in response.headers.get("content-type", "").lower():
-                    return []
-                    
-                data = response.json()
-                items = []
-                for p in data.get("articles", []):
-                    raw_date = p.get("seendate", "")
-                    try:
-                        dt = datetime.strptime(raw_date, "%Y%m%dT%H%M%SZ")
-                        published_at = dt.isoformat() + "Z"
-                    except:
-                        published_at = datetime.now().isoformat() + "Z"
-
-                    items.append({
-                        "id": f"gd_{p.get('url')}",
-                        "source": p.get("source", "GDELT"),
-                        "title": p.get("title"),
-                        "url": p.get("url"),
-                        "published_at": published_at,
-                        "domain": p.get("source", ""),
-                        "kind": "news"
-                    })
-                return items
+            data = response.json()
+            items = []
+            for p in data.get("articles", []):
+                raw_date = p.get("seendate", "")
+                try:
+                    dt = datetime.strptime(raw_date, "%Y%m%dT%H%M%SZ")
+                    published_at = dt.isoformat() + "Z"
+                except:
+                    published_at = datetime.now().isoformat() + "Z"
+
+                items.append({
+                    "id": f"gd_{p.get('url')}",
+                    "source": p.get("source", "GDELT"),
+                    "title": p.get("title"),
+                    "url": p.get("url"),
+                    "published_at": published_at,
+                    "domain": p.get("source", ""),
+                    "kind": "news"
+                })
+            return await self._new_items("gdelt", response, items, force)
         except Exception as e:
             print(f"IntelService: GDELT error: {e}")
-            return []
+            return [], {}
 
-    async def fetch_rss_all(self) -> List[Dict[str, Any]]:
-        """Interleave multiple RSS sources."""
-        tasks = [self.fetch_rss(name, url) for name, url in self.RSS_FEEDS.items()]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        items = []
-        for res in results:
-            if isinstance(res, list):
-                items.extend(res)
-        return items
-
-    async def fetch_rss(self, source_name: str, url: str) -> List[Dict[str, Any]]:
-        """Async fetch and thread-safe parse RSS."""
+    @staticmethod
+    def _feed_url(source_name: str, url: str) -> str:
+        """Route feeds to RSS_FEED_BASE (e.g. the local simulator) when configured."""
+        if not settings.rss_feed_base:
+            return url
+        return f"{settings.rss_feed_base}/{source_name.lower().replace(' ', '-')}.xml"
+
+    async def fetch_rss(self, source_name: str, url: str, force: bool = False) -> Tuple[List[Dict[str, Any]], SourceStates]:
+        """Async conditional fetch and off-loop parse of RSS/Atom (skipped when unchanged)."""
+        name = f"rss:{source_name}"
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=5.0)
-                if response.status_code != 200:
-                    return []
-                
-                # feedparser is synchronous and CPU-heavy; run in thread
-                feed = await asyncio.to_thread(feedparser.parse, response.text)
-                
-                items = []
-                for entry in feed.entries[:10]:
-                    published_at = ""
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_at = datetime(*entry.published_parsed[:6]).isoformat() + "Z"
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_at = datetime(*entry.updated_parsed[:6]).isoformat() + "Z"
-                    else:
-                        published_at = datetime.now().isoformat() + "Z"
-
-                    items.append({
-                        "id": f"rss_{entry.get('link')}",
-                        "source": source_name,
-                        "title": entry.get("title", "Untitled"),
-                        "url": entry.get("link", ""),
-                        "published_at": published_at,
-                        "domain": source_name.lower().replace(" ", ""),
-                        "kind": "news"
-                    })
-                return items
+            response = await self._conditional_get(name, url, force=force)
+            if response is None:
+                return [], {}
+            
+            entries = await self.parser.parse(response.content, limit=10)
+            
+            items = []
+            for entry in entries:
+                items.append({
+                    "id": f"rss_{entry['link']}",
+                    "source": source_name,
+                    "title": entry["title"],
+                    "url": entry["link"],
+                    "published_at": entry["published_at"] or datetime.now().isoformat() + "Z",
+                    "domain": source_name.lower().replace(" ", ""),
+                    "kind": "news"
+                })
+            return await self._new_items(name, response, items, force)
         except Exception as e:
             print(f"IntelService: RSS error ({source_name}): {e}")
-            return []
+            return [], {}
+
+
+# Singleton
+_intel_service: IntelService | None = None
+
+
+def get_intel_service() -> IntelService:
+    """Get intel service singleton."""
+    global _intel_service
+    if _intel_service is None:
+        _intel_service = IntelService()
+    return _intel_service
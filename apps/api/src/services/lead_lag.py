@@ -0,0 +1,327 @@
+"""
+Foresynth API - Lead-Lag Analysis
+
+Does a smart-money wallet lead the market or follow it? The last week of
+each smart-money wallet's trades is kept in Redis (one sorted set per
+wallet, topped up with only the trades newer than what is stored) and
+turned into hourly direction series per (wallet, market): +1 for an hour
+in which the wallet's YES-equivalent flow was a net buy, -1 for a net sell.
+
+- Wallet vs wallet: cross-correlation of direction series at lags of
+  0..MAX_LAG hours, one matrix product per lag and market. A peak at a
+  positive lag means the first wallet trades before the second.
+- Wallet vs price: correlation of direction with the YES price move over
+  the following hours (leading) and over the preceding hours (following).
+- Clusters: wallets that repeatedly trade the same direction in the same
+  market within an hour of each other are merged with union-find.
+
+The job runs after each background smart-money refresh; results are cached
+as one payload and merged into the smart-money table on read.
+"""
+import asyncio
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.core import get_async_redis, get_payload_cache
+from src.services.polymarket import get_polymarket_service
+
+BUCKET = 3600  # seconds per series step
+WINDOW = 7 * 86400  # matches the "1w" price history interval
+MAX_LAG = 6  # buckets
+
+MIN_CORRELATION = 0.2  # weakest pair correlation reported
+MIN_SHARED_MARKETS = 2  # markets both wallets traded before a pair counts
+MIN_CO_TRADES = 3  # same-direction co-trades that link two wallets into a cluster...
+MIN_CO_TRADE_SHARE = 0.25  # ...covering this share of the less active wallet's trading hours...
+MIN_AGREEMENT = 0.8  # ...with co-trades rarely in opposite directions
+ROLE_THRESHOLD = 0.1  # leaderScore needed to call a wallet a leader (or -x a follower)
+
+
+class DisjointSet:
+    """Union-find with path halving and union by size."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+def _direction_series(trades: dict[str, list[list]], start: int, steps: int) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """market -> (wallet indices, sign of net YES-equivalent flow per wallet x bucket)."""
+    by_market: dict[str, list[tuple[int, int, float]]] = {}
+    for i, wallet in enumerate(sorted(trades)):
+        for ts, cid, _, outcome_index, side, usd in trades[wallet]:
+            bucket = (ts - start) // BUCKET
+            if 0 <= bucket < steps:
+                bullish = (side == "BUY") == (outcome_index == 0)
+                by_market.setdefault(cid, []).append((i, bucket, usd if bullish else -usd))
+
+    series = {}
+    for cid, rows in by_market.items():
+        arr = np.array(rows)
+        wallets, inverse = np.unique(arr[:, 0].astype(int), return_inverse=True)
+        flow = np.zeros((len(wallets), steps))
+        np.add.at(flow, (inverse, arr[:, 1].astype(int)), arr[:, 2])
+        series[cid] = (wallets, np.sign(flow))
+    return series
+
+
+def _yes_closes(history: dict, outcome_index: int, start: int, steps: int) -> Optional[np.ndarray]:
+    """YES price at the close of each bucket (last point at or before it)."""
+    t = np.asarray(history.get("t") or [], dtype=float)
+    p = np.asarray(history.get("p") or [], dtype=float)
+    if not len(t):
+        return None
+    ends = start + BUCKET * np.arange(1, steps + 1)
+    closes = p[np.clip(np.searchsorted(t, ends, side="right") - 1, 0, None)]
+    return closes if outcome_index == 0 else 1 - closes
+
+
+def analyze(trades: dict[str, list[list]], prices: dict[str, tuple[int, dict]], now: float) -> dict:
+    """
+    Lead-lag statistics for wallets' trades ([ts, cid, asset, outcome_index,
+    side, usd] rows) against each other and against price histories
+    (cid -> (outcome_index of the priced token, {"t", "p"})).
+    """
+    wallets = sorted(trades)
+    n = len(wallets)
+    steps = WINDOW // BUCKET
+    start = int(now) - int(now) % BUCKET - (steps - 1) * BUCKET
+    series = _direction_series(trades, start, steps)
+
+    # Pair cross-correlation, summed over markets: xcorr[l, a, b] = sum_t x_a(t) x_b(t + l)
+    xcorr = np.zeros((MAX_LAG + 1, n, n))
+    co_trades, opposed = np.zeros((n, n)), np.zeros((n, n))
+    shared = np.zeros((n, n))
+    norm = np.zeros(n)
+    # Price correlation: direction against the move after / before each bucket
+    lead_dot, follow_dot = np.zeros(n), np.zeros(n)
+    priced_norm, lead_norm, follow_norm = np.zeros(n), np.zeros(n), np.zeros(n)
+
+    for cid, (idx, x) in series.items():
+        cell = np.ix_(idx, idx)
+        energy = (x * x).sum(axis=1)
+        norm[idx] += energy
+        shared[cell] += 1
+        for lag in range(MAX_LAG + 1):
+            xcorr[lag][cell] += x[:, :steps - lag] @ x[:, lag:].T
+
+        buys, sells = (x > 0).astype(float), (x < 0).astype(float)
+        same = buys @ buys.T + sells @ sells.T
+        near = buys[:, :-1] @ buys[:, 1:].T + sells[:, :-1] @ sells[:, 1:].T
+        co_trades[cell] += same + near + near.T
+        opposed[cell] += buys @ sells.T + sells @ buys.T
+
+        if cid in prices:
+            closes = _yes_closes(prices[cid][1], prices[cid][0], start, steps)
+            if closes is None:
+                continue
+            ahead = closes[np.minimum(np.arange(steps) + MAX_LAG, steps - 1)] - closes
+            behind = np.concatenate(([0.0], closes[:-1] - closes[np.maximum(np.arange(steps - 1) - MAX_LAG, 0)]))
+            lead_dot[idx] += x @ ahead
+            follow_dot[idx] += x @ behind
+            priced_norm[idx] += energy
+            lead_norm[idx] += ahead @ ahead
+            follow_norm[idx] += behind @ behind
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.nan_to_num(xcorr / np.sqrt(np.outer(norm, norm)))
+        price_lead = np.nan_to_num(lead_dot / np.sqrt(priced_norm * lead_norm))
+        price_follow = np.nan_to_num(follow_dot / np.sqrt(priced_norm * follow_norm))
+
+    # forward[a, b]: best correlation with a trading 1..MAX_LAG buckets before b
+    forward = corr[1:].max(axis=0)
+    best_lag = corr[1:].argmax(axis=0) + 1
+    pairs = []
+    leads, follows = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    for a, b in zip(*np.triu_indices(n, k=1)):
+        if shared[a, b] < MIN_SHARED_MARKETS:
+            continue
+        sync, ab, ba = corr[0, a, b], forward[a, b], forward[b, a]
+        if max(sync, ab, ba) < MIN_CORRELATION:
+            continue
+        pair = {"wallets": [wallets[a], wallets[b]], "shared_markets": int(shared[a, b]), "sync_correlation": round(float(sync), 3)}
+        if max(ab, ba) > sync:
+            leader, follower = (a, b) if ab >= ba else (b, a)
+            leads[leader] += 1
+            follows[follower] += 1
+            pair.update(leader=wallets[leader], follower=wallets[follower],
+                        lag_hours=int(best_lag[leader, follower]) * BUCKET // 3600,
+                        correlation=round(float(max(ab, ba)), 3))
+        else:
+            pair.update(leader=None, follower=None, lag_hours=0, correlation=round(float(sync), 3))
+        pairs.append(pair)
+    pairs.sort(key=lambda p: p["correlation"], reverse=True)
+
+    # Copy-trading clusters
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Entries are +-1, so `norm` counts each wallet's active buckets
+        share = np.nan_to_num(co_trades / np.minimum.outer(norm, norm))
+        agreement = np.nan_to_num(co_trades / (co_trades + opposed))
+    linked = (
+        (co_trades >= MIN_CO_TRADES) & (share >= MIN_CO_TRADE_SHARE)
+        & (agreement >= MIN_AGREEMENT) & (shared >= MIN_SHARED_MARKETS)
+    )
+    links = DisjointSet(n)
+    for a, b in zip(*np.nonzero(np.triu(linked, k=1))):
+        links.union(a, b)
+    members: dict[int, list[int]] = {}
+    for i in range(n):
+        members.setdefault(links.find(i), []).append(i)
+    groups = sorted((g for g in members.values() if len(g) > 1), key=len, reverse=True)
+    cluster_of = {i: c for c, group in enumerate(groups) for i in group}
+
+    stats = {}
+    for i, wallet in enumerate(wallets):
+        score = round(float(price_lead[i] - price_follow[i]), 3) if priced_norm[i] else None
+        if score is not None:
+            role = "leader" if score >= ROLE_THRESHOLD else "follower" if score <= -ROLE_THRESHOLD else "neutral"
+        else:
+            role = "leader" if leads[i] > follows[i] else "follower" if follows[i] > leads[i] else "neutral"
+        stats[wallet] = {
+            "leaderScore": score,
+            "priceLead": round(float(price_lead[i]), 3) if priced_norm[i] else None,
+            "priceFollow": round(float(price_follow[i]), 3) if priced_norm[i] else None,
+            "leads": int(leads[i]),
+            "follows": int(follows[i]),
+            "role": role,
+            "clusterId": cluster_of.get(i),
+        }
+
+    return {
+        "wallets": stats,
+        "pairs": pairs,
+        "clusters": [{"id": c, "wallets": [wallets[i] for i in group]} for c, group in enumerate(groups)],
+        "window_hours": WINDOW // 3600,
+    }
+
+
+class LeadLagAnalyzer:
+    """Incremental trade store plus the cached lead-lag results."""
+
+    PREFIX = "lead_lag:trades"  # zset per wallet: trade row JSON scored by timestamp
+    CACHE_KEY = "lead_lag:results"
+    CACHE_TTL = 3 * 3600
+    PAGE_SIZE = 100
+    MAX_PAGES = 10  # per wallet and refresh
+    MAX_MARKETS = 50  # most widely traded markets get price histories
+    CONCURRENCY = 8
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+        self.cache = get_payload_cache()
+
+    def _key(self, wallet: str) -> str:
+        return f"{self.PREFIX}:{wallet.lower()}"
+
+    async def _ingest(self, wallet: str, since: float):
+        """
+        Store the wallet's trades newer than the newest stored one. A failed
+        page raises before anything is stored: pages are newest first, so
+        storing the newer ones would move the next run past the missing trades.
+        """
+        redis = get_async_redis()
+        key = self._key(wallet)
+        newest = await redis.zrevrange(key, 0, 0, withscores=True)
+        last = max(newest[0][1] if newest else 0, since)
+
+        rows = {}
+        for page in range(self.MAX_PAGES):
+            batch = await self.polymarket.get_trades(
+                wallet, limit=self.PAGE_SIZE, offset=page * self.PAGE_SIZE, raise_errors=True
+            )
+            for t in batch:
+                if t.timestamp >= last and t.condition_id:
+                    row = [t.transaction_hash, t.condition_id, t.asset, t.outcome_index, t.side, round(t.usd_size, 2)]
+                    rows[json.dumps(row, separators=(",", ":"))] = t.timestamp
+            if len(batch) < self.PAGE_SIZE or (batch and batch[-1].timestamp < last):
+                break
+
+        pipe = redis.pipeline(transaction=False)
+        if rows:
+            pipe.zadd(key, rows)
+        pipe.zremrangebyscore(key, 0, since - 1)
+        pipe.expire(key, WINDOW)
+        await pipe.execute()
+
+    async def _load(self, wallets: list[str], since: float) -> dict[str, list[list]]:
+        """[ts, cid, asset, outcome_index, side, usd] rows per wallet in one round trip."""
+        pipe = get_async_redis().pipeline(transaction=False)
+        for wallet in wallets:
+            pipe.zrevrangebyscore(self._key(wallet), "+inf", since, withscores=True)
+        results = await pipe.execute()
+        trades = {}
+        for wallet, rows in zip(wallets, results):
+            trades[wallet] = [[int(ts), *json.loads(member)[1:]] for member, ts in rows]
+        return trades
+
+    async def refresh(self, wallets: list[str]) -> dict:
+        """Top up stored trades for `wallets`, recompute and cache the results."""
+        now = time.time()
+        since = now - WINDOW
+        wallets = list(dict.fromkeys(w.lower() for w in wallets if w))
+        semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+        async def _ingest(wallet: str):
+            async with semaphore:
+                try:
+                    await self._ingest(wallet, since)
+                except Exception as e:
+                    print(f"LeadLagAnalyzer: Ingest error for {wallet}: {e}")
+
+        await asyncio.gather(*(_ingest(w) for w in wallets))
+        trades = await self._load(wallets, since)
+
+        # Price histories for the markets traded by the most wallets
+        reach: dict[str, set] = {}
+        token: dict[str, tuple[str, int]] = {}
+        for wallet, rows in trades.items():
+            for _, cid, asset, outcome_index, _, _ in rows:
+                reach.setdefault(cid, set()).add(wallet)
+                token.setdefault(cid, (asset, outcome_index))
+        markets = sorted(reach, key=lambda c: len(reach[c]), reverse=True)[:self.MAX_MARKETS]
+        histories = await asyncio.gather(*(self.polymarket.get_price_history(token[c][0], "1w") for c in markets))
+        prices = {c: (token[c][1], h) for c, h in zip(markets, histories) if h}
+
+        results = await asyncio.to_thread(analyze, trades, prices, now)
+        results["computed_at"] = int(now)
+        await self.cache.setex(self.CACHE_KEY, self.CACHE_TTL, results)
+        print(f"LeadLagAnalyzer: {len(wallets)} wallets, {len(results['pairs'])} pairs, {len(results['clusters'])} clusters")
+        return results
+
+    async def get_results(self) -> Optional[dict]:
+        """Last computed results, or None before the first run."""
+        try:
+            return await self.cache.get(self.CACHE_KEY)
+        except Exception as e:
+            print(f"LeadLagAnalyzer: Cache read error: {e}")
+            return None
+
+
+# Singleton
+_lead_lag_analyzer: LeadLagAnalyzer | None = None
+
+
+def get_lead_lag_analyzer() -> LeadLagAnalyzer:
+    """Get lead-lag analyzer singleton."""
+    global _lead_lag_analyzer
+    if _lead_lag_analyzer is None:
+        _lead_lag_analyzer = LeadLagAnalyzer()
+    return _lead_lag_analyzer
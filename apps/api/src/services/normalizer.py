@@ -0,0 +1,208 @@
+"""
+Foresynth API - Polymarket Response Normalizer
+
+Single place where raw Gamma markets/events and Data API trades are
+parsed into typed models. Whole pages are validated in one pydantic-core
+pass; malformed items are reported instead of silently dropped.
+"""
+import json
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+
+
+class MarketData(BaseModel):
+    """Detailed market data from Polymarket."""
+    id: str
+    question: str
+    slug: str
+    volume: float
+    liquidity: float
+    yes_price: float
+    no_price: float
+    end_date: Optional[str] = None
+    image: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    active: bool = True
+    clob_token_id: Optional[str] = None
+    condition_id: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+def _json_list(value: Any) -> list:
+    """Gamma encodes some arrays as JSON strings ('["0.5", "0.5"]')."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError("expected a list or JSON-encoded list")
+    return value
+
+
+def _number(value: Any) -> float:
+    """Numbers arrive as floats, ints, numeric strings, '' or null."""
+    if value is None or value == "":
+        return 0.0
+    return float(value)
+
+
+class GammaMarket(BaseModel):
+    """Raw market (or event) as returned by the Gamma API."""
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    question: Optional[str] = None
+    title: Optional[str] = None
+    slug: str = ""
+    volume: float = 0.0
+    liquidity: float = 0.0
+    outcome_prices: list[float] = Field(default_factory=list, alias="outcomePrices")
+    clob_token_ids: list[str] = Field(default_factory=list, alias="clobTokenIds")
+    condition_id: Optional[str] = Field(None, alias="conditionId")
+    end_date: Optional[str] = Field(None, alias="endDate")
+    created_at: Optional[str] = Field(None, alias="createdAt")
+    image: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    active: bool = True
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def _id_to_str(cls, v):
+        return str(v)
+
+    @field_validator("volume", "liquidity", mode="before")
+    @classmethod
+    def _coerce_number(cls, v):
+        return _number(v)
+
+    @field_validator("outcome_prices", "clob_token_ids", mode="before")
+    @classmethod
+    def _coerce_list(cls, v):
+        return _json_list(v)
+
+    @field_validator("slug", mode="before")
+    @classmethod
+    def _coerce_slug(cls, v):
+        return v or ""
+
+    @field_validator("active", mode="before")
+    @classmethod
+    def _coerce_active(cls, v):
+        return True if v is None else v
+
+    def to_market_data(self, default_category: Optional[str] = None) -> MarketData:
+        prices = self.outcome_prices
+        return MarketData(
+            id=self.id,
+            question=self.question or self.title or "Untitled",
+            slug=self.slug,
+            volume=self.volume,
+            liquidity=self.liquidity,
+            yes_price=prices[0] if prices else 0.5,
+            no_price=prices[1] if len(prices) > 1 else 0.5,
+            end_date=self.end_date,
+            image=self.image,
+            category=self.category or default_category,
+            description=self.description,
+            active=self.active,
+            clob_token_id=self.clob_token_ids[0] if self.clob_token_ids else None,
+            condition_id=self.condition_id,
+            created_at=self.created_at,
+        )
+
+
+class TradeData(BaseModel):
+    """A single trade from the Data API /trades endpoint."""
+    model_config = ConfigDict(extra="ignore")
+
+    wallet: str = Field("", alias="proxyWallet")
+    side: str = ""
+    asset: str = ""
+    condition_id: str = Field("", alias="conditionId")
+    size: float = 0.0
+    price: float = 0.0
+    timestamp: int = 0
+    outcome: Optional[str] = None
+    outcome_index: int = Field(0, alias="outcomeIndex")
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    transaction_hash: Optional[str] = Field(None, alias="transactionHash")
+
+    @field_validator("size", "price", mode="before")
+    @classmethod
+    def _coerce_number(cls, v):
+        return _number(v)
+
+    @field_validator("side", mode="before")
+    @classmethod
+    def _upper_side(cls, v):
+        return (v or "").upper()
+
+    @field_validator("outcome_index", "timestamp", mode="before")
+    @classmethod
+    def _coerce_int(cls, v):
+        return 0 if v is None or v == "" else v
+
+    @property
+    def usd_size(self) -> float:
+        return self.size * self.price
+
+    @property
+    def trade_id(self) -> Optional[str]:
+        return self.transaction_hash
+
+
+_MARKET_PAGE = TypeAdapter(list[GammaMarket])
+_TRADE_PAGE = TypeAdapter(list[TradeData])
+
+
+def _validate_page(adapter: TypeAdapter, raw: Any, label: str) -> list:
+    """
+    Validate a whole page at once. If some items are malformed, report
+    them and re-validate the remaining items in a second bulk pass.
+    """
+    if isinstance(raw, (bytes, str)):
+        try:
+            return adapter.validate_json(raw)
+        except ValidationError:
+            try:
+                raw = json.loads(raw)
+            except ValueError as e:
+                print(f"Normalizer: Invalid JSON page of {label}: {e}")
+                return []
+
+    if not isinstance(raw, list):
+        print(f"Normalizer: Expected a list of {label}, got {type(raw).__name__}")
+        return []
+
+    try:
+        return adapter.validate_python(raw)
+    except ValidationError as e:
+        bad = {err["loc"][0] for err in e.errors() if err["loc"] and isinstance(err["loc"][0], int)}
+        first = e.errors()[0]
+        print(
+            f"Normalizer: Dropped {len(bad)}/{len(raw)} malformed {label} "
+            f"(first: item {first['loc'][0] if first['loc'] else '?'} - {first['msg']})"
+        )
+        if not bad:
+            return []
+        return adapter.validate_python([item for i, item in enumerate(raw) if i not in bad])
+
+
+def normalize_markets(raw: Any, default_category: Optional[str] = None) -> list[MarketData]:
+    """Parse a Gamma markets/events page (list or raw JSON bytes) into MarketData."""
+    return [m.to_market_data(default_category) for m in _validate_page(_MARKET_PAGE, raw, "markets")]
+
+
+def normalize_market(raw: dict, default_category: Optional[str] = None) -> Optional[MarketData]:
+    """Parse a single Gamma market; returns None (and reports) if malformed."""
+    markets = normalize_markets([raw], default_category)
+    return markets[0] if markets else None
+
+
+def normalize_trades(raw: Any) -> list[TradeData]:
+    """Parse a Data API trades page into TradeData."""
+    return _validate_page(_TRADE_PAGE, raw, "trades")
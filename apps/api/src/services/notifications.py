@@ -1,9 +1,10 @@
 from typing import Literal
 from pydantic import BaseModel
-import httpx
 import logging
+import time
 
 from src.core import get_supabase
+from src.core.http import get_http_client
 from src.services.telegram import get_telegram_service
 
 logger = logging.getLogger(__name__)
@@ -28,9 +29,28 @@ class NotificationService:
     - Discord: Via Webhook
     """
     
+    # Contact details change rarely; reuse them across a burst of alerts
+    CONTACT_TTL = 300  # seconds
+    
     def __init__(self):
         self.db = get_supabase()
         self.telegram = get_telegram_service()
+        self._contacts: dict[str, tuple[float, dict]] = {}
+    
+    def _get_contact(self, user_id: str) -> dict:
+        """Telegram chat ID and Discord webhook for a user, cached for CONTACT_TTL."""
+        cached = self._contacts.get(user_id)
+        if cached and time.monotonic() - cached[0] < self.CONTACT_TTL:
+            return cached[1]
+        
+        response = self.db.table("users").select("telegram_chat_id, discord_webhook_url").eq("id", user_id).execute()
+        contact = response.data[0] if response.data else {}
+        self._contacts[user_id] = (time.monotonic(), contact)
+        return contact
+    
+    def invalidate_contact(self, user_id: str):
+        """Drop a cached contact after the user links or unlinks a channel."""
+        self._contacts.pop(user_id, None)
     
     async def send(self, payload: NotificationPayload) -> dict:
         """Send notification to all specified channels."""
@@ -67,13 +87,10 @@ class NotificationService:
         """Send notification via Telegram Bot API."""
         try:
             # Get user's telegram chat ID
-            user_response = self.db.table("users").select("telegram_chat_id").eq("id", payload.user_id).execute()
-            
-            if not user_response.data or not user_response.data[0].get("telegram_chat_id"):
+            chat_id = self._get_contact(payload.user_id).get("telegram_chat_id")
+            if not chat_id:
                 return False
             
-            chat_id = user_response.data[0]["telegram_chat_id"]
-            
             # Format message
             type_icon = "🔔"
             if payload.type == "price_alert":
@@ -92,13 +109,10 @@ class NotificationService:
         """Send notification via Discord Webhook."""
         try:
             # Get user's discord webhook
-            user_response = self.db.table("users").select("discord_webhook_url").eq("id", payload.user_id).execute()
-            
-            if not user_response.data or not user_response.data[0].get("discord_webhook_url"):
+            webhook_url = self._get_contact(payload.user_id).get("discord_webhook_url")
+            if not webhook_url:
                 return False
             
-            webhook_url = user_response.data[0]["discord_webhook_url"]
-            
             # Discord embed format
             embed = {
                 "title": f"🔔 {payload.title}",
@@ -107,7 +121,7 @@ class NotificationService:
                 "footer": {"text": f"Foresynth | {payload.type}"}
             }
             
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.post(
                     webhook_url,
                     json={"embeds": [embed]},
@@ -5,32 +5,40 @@ Client for interacting with Polymarket APIs (Gamma, CLOB).
 """
 import httpx
 import asyncio
-import json
+from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import TypeAdapter
 
-from src.core import get_async_cache
+from src.core import get_payload_cache, get_settings
+from src.core.http import get_http_client
+from src.services.normalizer import (
+    MarketData,
+    TradeData,
+    normalize_market,
+    normalize_markets,
+    normalize_trades,
+)
 
-# API Base URLs
-GAMMA_API_BASE = "https://gamma-api.polymarket.com"
-CLOB_API_BASE = "https://clob.polymarket.com"
+# API Base URLs (overridable via settings, e.g. to point at the local simulator)
+_settings = get_settings()
+GAMMA_API_BASE = _settings.gamma_api_base
+CLOB_API_BASE = _settings.clob_api_base
+DATA_API_BASE = _settings.data_api_base
 
 
-class MarketData(BaseModel):
-    """Detailed market data from Polymarket."""
-    id: str
-    question: str
-    slug: str
-    volume: float
-    liquidity: float
-    yes_price: float
-    no_price: float
-    end_date: Optional[str] = None
-    image: Optional[str] = None
-    category: Optional[str] = None
-    description: Optional[str] = None
-    active: bool = True
-    clob_token_id: Optional[str] = None
+# Bulk validator for cached market lists. Validating the whole list in
+# pydantic-core is cheaper than per-item MarketData(**m) and, measured in
+# scripts/bench_cache_codec.py, also cheaper than model_construct().
+_MARKET_LIST = TypeAdapter(list[MarketData])
+
+
+def _parse_ts(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
 
 
 class PolymarketService:
@@ -39,7 +47,8 @@ class PolymarketService:
     """
     
     def __init__(self):
-        self.cache = get_async_cache()
+        # Structured payload cache (codec-encoded)
+        self.cache = get_payload_cache()
     
     async def search_markets(
         self,
@@ -51,10 +60,9 @@ class PolymarketService:
         cache_key = f"pm_search:{query}:{limit}"
         
         # Check cache
-        cached_json = await self.cache.get(cache_key)
-        if cached_json:
-            cached = json.loads(cached_json)
-            return [MarketData(**m) for m in cached]
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return _MARKET_LIST.validate_python(cached)
         
         params = {
             "_q": query,
@@ -63,37 +71,18 @@ class PolymarketService:
         if active_only:
             params["active"] = True
         
-        async with httpx.AsyncClient() as client:
+        async with get_http_client() as client:
             response = await client.get(
                 f"{GAMMA_API_BASE}/markets",
                 params=params,
                 timeout=15.0
             )
             response.raise_for_status()
-            data = response.json()
         
-        markets = []
-        for m in data:
-            prices = m.get("outcomePrices", [0.5, 0.5])
-            clob_ids = json.loads(m.get("clobTokenIds", "[]"))
-            markets.append(MarketData(
-                id=m.get("id", ""),
-                question=m.get("question", ""),
-                slug=m.get("slug", ""),
-                volume=float(m.get("volume", 0)),
-                liquidity=float(m.get("liquidity", 0)),
-                yes_price=float(prices[0]) if prices else 0.5,
-                no_price=float(prices[1]) if len(prices) > 1 else 0.5,
-                end_date=m.get("endDate"),
-                image=m.get("image"),
-                category=m.get("category"),
-                description=m.get("description"),
-                active=m.get("active", True),
-                clob_token_id=clob_ids[0] if clob_ids else None
-            ))
+        markets = normalize_markets(response.content)
         
         # Cache for 5 minutes
-        await self.cache.setex(cache_key, 300, json.dumps([m.model_dump() for m in markets]))
+        await self.cache.setex(cache_key, 300, [m.model_dump() for m in markets])
         
         return markets
     
@@ -101,13 +90,12 @@ class PolymarketService:
         """Get detailed market data by ID."""
         cache_key = f"pm_market:{market_id}"
         
-        cached_json = await self.cache.get(cache_key)
-        if cached_json:
-            cached = json.loads(cached_json)
-            return MarketData(**cached)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return MarketData.model_validate(cached)
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.get(
                     f"{GAMMA_API_BASE}/markets/{market_id}",
                     timeout=15.0
@@ -117,33 +105,19 @@ class PolymarketService:
         except httpx.HTTPError:
             return None
         
-        prices = m.get("outcomePrices", [0.5, 0.5])
-        clob_ids = json.loads(m.get("clobTokenIds", "[]"))
-        market = MarketData(
-            id=m.get("id", ""),
-            question=m.get("question", ""),
-            slug=m.get("slug", ""),
-            volume=float(m.get("volume", 0)),
-            liquidity=float(m.get("liquidity", 0)),
-            yes_price=float(prices[0]) if prices else 0.5,
-            no_price=float(prices[1]) if len(prices) > 1 else 0.5,
-            end_date=m.get("endDate"),
-            image=m.get("image"),
-            category=m.get("category"),
-            description=m.get("description"),
-            active=m.get("active", True),
-            clob_token_id=clob_ids[0] if clob_ids else None
-        )
+        market = normalize_market(m)
+        if market is None:
+            return None
         
         # Cache for 1 minute
-        await self.cache.setex(cache_key, 60, json.dumps(market.model_dump()))
+        await self.cache.setex(cache_key, 60, market.model_dump())
         
         return market
     
     async def get_current_price(self, market_id: str) -> Optional[dict]:
         """Get current price for a market from CLOB."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.get(
                     f"{CLOB_API_BASE}/prices",
                     params={"token_id": market_id},
@@ -154,6 +128,66 @@ class PolymarketService:
         except httpx.HTTPError:
             return None
     
+    # Cache TTL (seconds) per price-history interval; longer windows change slower
+    PRICE_HISTORY_TTL = {
+        "1h": 30,
+        "6h": 60,
+        "1d": 120,
+        "1w": 600,
+        "1m": 1800,
+        "max": 3600,
+    }
+
+    async def get_price_history(
+        self,
+        token_id: str,
+        interval: str = "1d"
+    ) -> Optional[dict]:
+        """
+        Fetch CLOB price history for a token as column arrays.
+
+        Returns {"t": [unix seconds], "p": [price]} sorted by time,
+        or None if the upstream call fails.
+        """
+        cache_key = f"pm_price_history:{token_id}:{interval}"
+
+        if self.cache:
+            try:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                print(f"PolymarketService: Cache read error: {e}")
+
+        try:
+            async with get_http_client() as client:
+                response = await client.get(
+                    f"{CLOB_API_BASE}/prices-history",
+                    params={"market": token_id, "interval": interval},
+                    timeout=10.0
+                )
+                response.raise_for_status()
+                data = response.json()
+        except httpx.HTTPError as e:
+            print(f"PolymarketService: Price history fetch error for {token_id}: {e}")
+            return None
+
+        points = sorted(
+            (int(pt["t"]), float(pt["p"]))
+            for pt in data.get("history", [])
+            if "t" in pt and "p" in pt
+        )
+        history = {
+            "t": [t for t, _ in points],
+            "p": [p for _, p in points],
+        }
+
+        if self.cache:
+            ttl = self.PRICE_HISTORY_TTL.get(interval, 120)
+            await self.cache.setex(cache_key, ttl, history)
+
+        return history
+
     async def get_trending(self, limit: int = 10) -> list[MarketData]:
         """Get trending markets by volume."""
         cache_key = f"pm_trending:{limit}"
@@ -161,12 +195,12 @@ class PolymarketService:
         if self.cache:
             try:
                 cached = await self.cache.get(cache_key)
-                if cached:
-                    return [MarketData(**m) for m in json.loads(cached)]
+                if cached is not None:
+                    return _MARKET_LIST.validate_python(cached)
             except Exception as e:
                 print(f"PolymarketService: Cache read error: {e}")
         
-        async with httpx.AsyncClient() as client:
+        async with get_http_client() as client:
             response = await client.get(
                 f"{GAMMA_API_BASE}/markets",
                 params={
@@ -178,33 +212,17 @@ class PolymarketService:
                 timeout=15.0
             )
             response.raise_for_status()
-            data = response.json()
         
-        markets = []
-        for m in data:
-            prices = m.get("outcomePrices", [0.5, 0.5])
-            markets.append(MarketData(
-                id=m.get("id", ""),
-                question=m.get("question", ""),
-                slug=m.get("slug", ""),
-                volume=float(m.get("volume", 0)),
-                liquidity=float(m.get("liquidity", 0)),
-                yes_price=float(prices[0]) if prices else 0.5,
-                no_price=float(prices[1]) if len(prices) > 1 else 0.5,
-                end_date=m.get("endDate"),
-                image=m.get("image"),
-                category=m.get("category"),
-                active=True
-            ))
+        markets = normalize_markets(response.content)
         
         # Cache for 2 minutes
         if self.cache:
-            await self.cache.setex(cache_key, 120, json.dumps([m.model_dump() for m in markets]))
+            await self.cache.setex(cache_key, 120, [m.model_dump() for m in markets])
         
         return markets
 
-    async def get_leaderboard(self, timeframe: str = "monthly") -> list[dict]:
-        """Fetch global leaderboard from Polymarket Data API."""
+    async def get_leaderboard(self, timeframe: str = "monthly", limit: int = 20) -> list[dict]:
+        """Fetch global leaderboard from Polymarket Data API (one page, at most 50 traders)."""
         # Mapping timeframe to Polymarket data-api window: day, week, month, all
         period_map = {
             "daily": "day",
@@ -214,41 +232,104 @@ class PolymarketService:
         }
         time_period = period_map.get(timeframe, "month")
         
-        cache_key = f"pm_leaderboard:{time_period}"
+        limit = min(limit, 50)
+        cache_key = f"pm_leaderboard:{time_period}:{limit}"
         
         # Check cache
         if self.cache:
             try:
                 cached = await self.cache.get(cache_key)
-                if cached:
-                    return json.loads(cached)
+                if cached is not None:
+                    return cached
             except Exception as e:
                 print(f"PolymarketService: Cache read error: {e}")
 
-        url = "https://data-api.polymarket.com/v1/leaderboard"
+        url = f"{DATA_API_BASE}/v1/leaderboard"
         params = {
             "timePeriod": time_period,
             "orderBy": "PNL",
-            "limit": 20,
+            "limit": limit,
             "offset": 0,
             "category": "overall"
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.get(url, params=params, timeout=10.0)
                 response.raise_for_status()
                 data = response.json()
                 
                 # Cache for 1 hour
                 if self.cache and data:
-                    await self.cache.setex(cache_key, 3600, json.dumps(data))
+                    await self.cache.setex(cache_key, 3600, data)
                 
                 return data
         except Exception as e:
             print(f"PolymarketService: Leaderboard fetch error: {e}")
             return []
 
+    async def _get_markets_batched(self, param: str, values: list[str]) -> list[MarketData]:
+        """Fetch many markets by one Gamma filter (?param=a&param=b), 50 per request (uncached)."""
+        markets: list[MarketData] = []
+        async with get_http_client() as client:
+            for i in range(0, len(values), 50):
+                response = await client.get(
+                    f"{GAMMA_API_BASE}/markets",
+                    params={param: values[i:i + 50], "limit": 50},
+                    timeout=15.0
+                )
+                response.raise_for_status()
+                markets.extend(normalize_markets(response.content))
+        return markets
+
+    async def get_markets_by_condition_ids(self, condition_ids: list[str]) -> list[MarketData]:
+        """Fetch many markets by condition ID, 50 per Gamma request (uncached)."""
+        return await self._get_markets_batched("condition_ids", condition_ids)
+
+    async def resolve_markets(self, market_ids: list[str]) -> dict[str, MarketData]:
+        """
+        Resolve a mix of condition IDs (0x...), Gamma IDs and slugs, as stored
+        in watchlists, with batched Gamma calls per kind. Unknown IDs are omitted.
+        """
+        market_ids = list(dict.fromkeys(m for m in market_ids if m))
+        kinds = {
+            ("condition_ids", "condition_id"): [m for m in market_ids if m.startswith("0x")],
+            ("id", "id"): [m for m in market_ids if m.isdigit()],
+            ("slug", "slug"): [m for m in market_ids if not m.startswith("0x") and not m.isdigit()],
+        }
+        resolved: dict[str, MarketData] = {}
+        for (param, field), values in kinds.items():
+            if not values:
+                continue
+            wanted = set(values)
+            for market in await self._get_markets_batched(param, values):
+                key = getattr(market, field)
+                if key in wanted:
+                    resolved[key] = market
+        return resolved
+
+    async def get_market_snapshots(self, condition_ids: list[str]) -> dict[str, dict]:
+        """
+        Creation time, liquidity and title per market ({"created_ts", "liquidity",
+        "title"}), cached 10 minutes per market; misses are fetched in batches.
+        """
+        condition_ids = list(dict.fromkeys(c for c in condition_ids if c))
+        cached = await self.cache.mget([f"pm_snapshot:{cid}" for cid in condition_ids])
+        result = {cid: m for cid, m in zip(condition_ids, cached) if m is not None}
+
+        missing = [cid for cid in condition_ids if cid not in result]
+        if missing:
+            try:
+                markets = await self.get_markets_by_condition_ids(missing)
+            except httpx.HTTPError as e:
+                print(f"PolymarketService: Market snapshot fetch error: {e}")
+                markets = []
+            for m in markets:
+                snapshot = {"created_ts": _parse_ts(m.created_at), "liquidity": m.liquidity, "title": m.question}
+                result[m.condition_id] = snapshot
+                await self.cache.setex(f"pm_snapshot:{m.condition_id}", 600, snapshot)
+        return result
+
     async def get_closed_positions(
         self, 
         wallet_address: str, 
@@ -260,12 +341,12 @@ class PolymarketService:
         if self.cache:
             try:
                 cached = await self.cache.get(cache_key)
-                if cached:
-                    return json.loads(cached)
+                if cached is not None:
+                    return cached
             except Exception as e:
                 print(f"PolymarketService: Cache read error: {e}")
 
-        url = "https://data-api.polymarket.com/v1/closed-positions"
+        url = f"{DATA_API_BASE}/v1/closed-positions"
         params = {
             "user": wallet_address,
             "limit": limit,
@@ -274,14 +355,14 @@ class PolymarketService:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.get(url, params=params, timeout=10.0)
                 response.raise_for_status()
                 data = response.json()
                 
                 # Cache for 10 minutes (completed trades don't change, but new ones happen)
                 if self.cache and data:
-                    await self.cache.setex(cache_key, 600, json.dumps(data))
+                    await self.cache.setex(cache_key, 600, data)
                 
                 return data
         except Exception as e:
@@ -293,14 +374,12 @@ class PolymarketService:
         if not token_ids:
             return {}
             
-        url = f"{CLOB_API_BASE}/prices-history"
         results = {}
         
-        # Polymarket CLOB /prices-history or /prices
         # For tracking efficiency, we use the mid price from /prices for multiple tokens if possible
         # Or iterate if the API doesn't support bulk token_id in one param
         
-        async with httpx.AsyncClient() as client:
+        async with get_http_client() as client:
             # We fetch individually for now as CLOB API usually prefers one token_id per request 
             # for price history/details, but we'll optimize by running them in parallel
             tasks = []
@@ -320,23 +399,87 @@ class PolymarketService:
         
         return results
 
-    async def get_trades(self, wallet_address: str, limit: int = 5) -> list[dict]:
-        """Fetch latest trades for a specific wallet address from Data API."""
-        url = "https://data-api.polymarket.com/v1/trades"
+    async def get_marks(self, token_ids: list[str]) -> dict[str, float]:
+        """Current prices per token, cached 15 seconds per token; misses go to get_batch_prices."""
+        token_ids = list(dict.fromkeys(t for t in token_ids if t))
+        cached = await self.cache.mget([f"pm_mark:{tid}" for tid in token_ids])
+        result = {tid: p for tid, p in zip(token_ids, cached) if p is not None}
+
+        missing = [tid for tid in token_ids if tid not in result]
+        if missing:
+            fetched = await self.get_batch_prices(missing)
+            for tid, price in fetched.items():
+                result[tid] = price
+                await self.cache.setex(f"pm_mark:{tid}", 15, price)
+        return result
+
+    async def get_trades(
+        self, wallet_address: str, limit: int = 5, offset: int = 0, raise_errors: bool = False
+    ) -> list[TradeData]:
+        """
+        Fetch latest trades (newest first) for a specific wallet address from Data API.
+        Errors give an empty list unless `raise_errors` is set (to tell them from no trades).
+        """
+        url = f"{DATA_API_BASE}/v1/trades"
         params = {
             "user": wallet_address,
             "limit": limit,
+            "offset": offset,
         }
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with get_http_client() as client:
                 response = await client.get(url, params=params, timeout=10.0)
                 response.raise_for_status()
-                return response.json()
+                return normalize_trades(response.content)
         except Exception as e:
             print(f"PolymarketService: Trade fetch error for {wallet_address}: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    async def get_recent_trades(self, limit: int = 500, offset: int = 0) -> list[TradeData]:
+        """Fetch the global trade feed (newest first) from Data API."""
+        url = f"{DATA_API_BASE}/v1/trades"
+        params = {
+            "limit": limit,
+            "offset": offset,
+        }
+        
+        try:
+            async with get_http_client() as client:
+                response = await client.get(url, params=params, timeout=10.0)
+                response.raise_for_status()
+                return normalize_trades(response.content)
+        except Exception as e:
+            print(f"PolymarketService: Global trade feed error: {e}")
             return []
 
+    async def get_first_activity(self, wallet_address: str) -> Optional[int]:
+        """Timestamp of a wallet's oldest Data API activity (None if unknown)."""
+        url = f"{DATA_API_BASE}/activity"
+        params = {
+            "user": wallet_address,
+            "limit": 1,
+            "sortBy": "TIMESTAMP",
+            "sortDirection": "ASC",
+        }
+        
+        try:
+            async with get_http_client() as client:
+                response = await client.get(url, params=params, timeout=10.0)
+                response.raise_for_status()
+                data = response.json()
+        except Exception as e:
+            print(f"PolymarketService: Activity fetch error for {wallet_address}: {e}")
+            return None
+        
+        if not data or not isinstance(data, list):
+            return None
+        try:
+            return int(data[0].get("timestamp"))
+        except (TypeError, ValueError):
+            return None
 
 
 # Singleton
@@ -0,0 +1,278 @@
+"""
+Foresynth API - Position Engine
+
+Live open books for any wallet. Lots are rebuilt from the wallet's trade
+history with FIFO matching (a sell closes the oldest open lots of that
+token first, realizing PnL against their entry prices) and marked against
+current prices. Each wallet's book is one Redis hash
+
+    positions:{address}  hash  asset -> position JSON, "_cursor" -> sync cursor
+
+and advances incrementally: trades newer than the cursor (handed over by the
+tracker's polls, or fetched when a stale book is read) are applied on top of
+the stored lots, and only the touched positions are written back. The full
+history is replayed once, the first time a wallet's book is requested.
+"""
+import asyncio
+import json
+import time
+from typing import Optional
+
+from src.core import get_async_redis
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+
+CURSOR_FIELD = "_cursor"
+EPSILON = 1e-9  # shares below this are dust left by float arithmetic
+
+
+def _trade_key(trade: TradeData) -> str:
+    return f"{trade.transaction_hash}:{trade.asset}"
+
+
+def apply_trade(position: dict, trade: TradeData):
+    """Apply one trade to a position in place (FIFO lot matching)."""
+    lots = position["lots"]
+    if trade.side == "BUY":
+        lots.append([trade.size, trade.price])
+        return
+
+    remaining = trade.size
+    closed = 0
+    for lot in lots:
+        if remaining <= EPSILON:
+            break
+        qty = min(lot[0], remaining)
+        position["realized"] += qty * (trade.price - lot[1])
+        lot[0] -= qty
+        remaining -= qty
+        if lot[0] <= EPSILON:
+            closed += 1
+    del lots[:closed]
+    # Sells of shares bought before the known history began
+    if remaining > EPSILON:
+        position["unmatched"] += remaining
+
+
+def _new_position(trade: TradeData) -> dict:
+    return {
+        "market_id": trade.condition_id,
+        "outcome": trade.outcome,
+        "title": trade.title,
+        "slug": trade.slug,
+        "lots": [],
+        "realized": 0.0,
+        "unmatched": 0.0,
+    }
+
+
+def mark_position(asset: str, position: dict, mark: Optional[float]) -> dict:
+    """Position view with cost basis and PnL at `mark` (unrealized is None without a mark)."""
+    shares = sum(q for q, _ in position["lots"])
+    cost = sum(q * p for q, p in position["lots"])
+    value = shares * mark if mark is not None else None
+    return {
+        "asset": asset,
+        "market_id": position["market_id"],
+        "outcome": position["outcome"],
+        "title": position["title"],
+        "slug": position["slug"],
+        "shares": round(shares, 4),
+        "lots": len(position["lots"]),
+        "avg_price": round(cost / shares, 4) if shares > EPSILON else None,
+        "cost": round(cost, 2),
+        "mark": mark,
+        "value": round(value, 2) if value is not None else None,
+        "unrealized_pnl": round(value - cost, 2) if value is not None else None,
+        "realized_pnl": round(position["realized"], 2),
+    }
+
+
+class PositionEngine:
+    """Incrementally maintained FIFO books per wallet, shared across workers via Redis."""
+
+    PREFIX = "positions"
+    PAGE_SIZE = 500  # trades per Data API page when replaying history
+    REFRESH_SIZE = 50  # trades per page when catching up a stored book
+    MAX_PAGES = 20  # per sync; older history is left out (history_complete=False)
+    STALE_AFTER = 60  # seconds before a read refreshes a book from the API
+    LOCK_TTL = 30
+    CONCURRENCY = 8  # parallel wallet syncs per read
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+
+    def _key(self, wallet: str) -> str:
+        return f"{self.PREFIX}:{wallet.lower()}"
+
+    # ── Storage ──────────────────────────────────────────────────
+
+    async def _load(self, wallets: list[str]) -> dict[str, Optional[dict]]:
+        """Stored books in one round trip (None for wallets never synced)."""
+        pipe = get_async_redis().pipeline(transaction=False)
+        for wallet in wallets:
+            pipe.hgetall(self._key(wallet))
+        rows = await pipe.execute()
+
+        books = {}
+        for wallet, raw in zip(wallets, rows):
+            if not raw or CURSOR_FIELD not in raw:
+                books[wallet] = None
+                continue
+            books[wallet] = {
+                "cursor": json.loads(raw.pop(CURSOR_FIELD)),
+                "positions": {asset: json.loads(p) for asset, p in raw.items()},
+            }
+        return books
+
+    async def _lock(self, wallet: str) -> bool:
+        return bool(await get_async_redis().set(f"{self._key(wallet)}:lock", "1", nx=True, ex=self.LOCK_TTL))
+
+    async def _unlock(self, wallet: str):
+        await get_async_redis().delete(f"{self._key(wallet)}:lock")
+
+    # ── Sync ─────────────────────────────────────────────────────
+
+    async def _fetch_since(self, wallet: str, since: int, page_size: int) -> tuple[list[TradeData], bool]:
+        """
+        Trades at or after `since` (newest first) and whether they reach back that far.
+        A failed page raises rather than passing for the end of history, so the
+        sync is abandoned before anything is written.
+        """
+        trades: list[TradeData] = []
+        for page in range(self.MAX_PAGES):
+            batch = await self.polymarket.get_trades(wallet, limit=page_size, offset=page * page_size, raise_errors=True)
+            trades.extend(t for t in batch if t.timestamp >= since)
+            if len(batch) < page_size or (batch and batch[-1].timestamp < since):
+                return trades, True
+        return trades, False
+
+    async def _advance(self, wallet: str, book: Optional[dict], trades: list[TradeData], complete: bool = True) -> dict:
+        """Apply trades newer than the book's cursor and persist what changed."""
+        book = book or {"cursor": {"ts": 0, "ids": [], "complete": complete}, "positions": {}}
+        cursor = book["cursor"]
+        seen = set(cursor["ids"])
+        # Offset paging can return a trade twice when new ones arrive mid-sync
+        unique = {_trade_key(t): t for t in trades if t.asset}
+        fresh = sorted(
+            (t for k, t in unique.items() if t.timestamp > cursor["ts"] or (t.timestamp == cursor["ts"] and k not in seen)),
+            key=lambda t: t.timestamp,
+        )
+
+        touched = set()
+        for t in fresh:
+            position = book["positions"].setdefault(t.asset, _new_position(t))
+            apply_trade(position, t)
+            touched.add(t.asset)
+
+        if fresh:
+            newest = fresh[-1].timestamp
+            ids = [_trade_key(t) for t in fresh if t.timestamp == newest]
+            cursor["ids"] = ids + cursor["ids"] if newest == cursor["ts"] else ids
+            cursor["ts"] = newest
+        cursor["complete"] = cursor.get("complete", True) and complete
+        cursor["synced_at"] = int(time.time())
+
+        mapping = {asset: json.dumps(book["positions"][asset], separators=(",", ":")) for asset in touched}
+        mapping[CURSOR_FIELD] = json.dumps(cursor, separators=(",", ":"))
+        await get_async_redis().hset(self._key(wallet), mapping=mapping)
+        return book
+
+    async def observe(self, wallet: str, trades: list[TradeData]):
+        """
+        Fold a freshly polled page of a wallet's trades (newest first) into its
+        book. Wallets without a book are skipped; they are built on first read.
+        """
+        if not trades or not await self._lock(wallet):
+            return
+        try:
+            book = (await self._load([wallet]))[wallet]
+            if book is None:
+                return
+            # The page does not reach back to the cursor: fetch the gap
+            if min(t.timestamp for t in trades) > book["cursor"]["ts"]:
+                try:
+                    trades, complete = await self._fetch_since(wallet, book["cursor"]["ts"], self.REFRESH_SIZE)
+                except Exception as e:
+                    # Leave book and cursor as they are; the next read syncs the gap
+                    print(f"PositionEngine: Gap fetch failed for {wallet}: {e}")
+                    return
+                return await self._advance(wallet, book, trades, complete)
+            await self._advance(wallet, book, trades)
+        finally:
+            await self._unlock(wallet)
+
+    async def sync(self, wallet: str, book: Optional[dict]) -> Optional[dict]:
+        """Replay a new wallet's history, or catch a stored book up to now."""
+        if not await self._lock(wallet):
+            return book  # another worker is syncing it; serve what is stored
+        try:
+            if book is None:
+                trades, complete = await self._fetch_since(wallet, 0, self.PAGE_SIZE)
+                return await self._advance(wallet, None, trades, complete)
+            trades, complete = await self._fetch_since(wallet, book["cursor"]["ts"], self.REFRESH_SIZE)
+            return await self._advance(wallet, book, trades, complete)
+        finally:
+            await self._unlock(wallet)
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    async def get_books(self, wallets: list[str]) -> list[dict]:
+        """Marked open books for many wallets: one Redis read, stale books synced, one batched mark lookup."""
+        wallets = list(dict.fromkeys(w.lower() for w in wallets if w))
+        if not wallets:
+            return []
+        books = await self._load(wallets)
+
+        now = time.time()
+        stale = [w for w in wallets if books[w] is None or now - books[w]["cursor"].get("synced_at", 0) > self.STALE_AFTER]
+        if stale:
+            semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+            async def _sync(wallet: str):
+                async with semaphore:
+                    try:
+                        books[wallet] = await self.sync(wallet, books[wallet])
+                    except Exception as e:
+                        print(f"PositionEngine: Sync error for {wallet}: {e}")
+
+            await asyncio.gather(*(_sync(w) for w in stale))
+
+        open_assets = {
+            asset
+            for book in books.values() if book
+            for asset, p in book["positions"].items() if p["lots"]
+        }
+        marks = await self.polymarket.get_marks(list(open_assets))
+
+        result = []
+        for wallet in wallets:
+            book = books[wallet] or {"cursor": {}, "positions": {}}
+            views = [mark_position(a, p, marks.get(a)) for a, p in book["positions"].items()]
+            open_views = sorted((v for v in views if v["shares"] > 0), key=lambda v: v["value"] or 0, reverse=True)
+            result.append({
+                "wallet": wallet,
+                "positions": open_views,
+                "open_value": round(sum(v["value"] or 0 for v in open_views), 2),
+                "cost": round(sum(v["cost"] for v in open_views), 2),
+                "unrealized_pnl": round(sum(v["unrealized_pnl"] or 0 for v in open_views), 2),
+                "realized_pnl": round(sum(v["realized_pnl"] for v in views), 2),
+                "history_complete": book["cursor"].get("complete", False),
+                "synced_at": book["cursor"].get("synced_at"),
+            })
+        return result
+
+    async def get_book(self, wallet: str) -> dict:
+        return (await self.get_books([wallet]))[0]
+
+
+# Singleton
+_position_engine: PositionEngine | None = None
+
+
+def get_position_engine() -> PositionEngine:
+    """Get position engine singleton."""
+    global _position_engine
+    if _position_engine is None:
+        _position_engine = PositionEngine()
+    return _position_engine
@@ -0,0 +1,230 @@
+"""
+Foresynth API - Anomaly Radar
+
+Streaming detection pipeline that populates insider_signals. Each cycle
+pulls the global trade feed since the last cursor (not just tracked
+wallets), updates per-wallet features in Redis, scores every sizeable buy
+and batch-inserts the ones above the threshold.
+
+Features per trade (all cached, so a cycle costs a few pipelined Redis
+round trips plus lookups only for wallets and markets not seen before):
+- wallet age: days since first activity, from the wallet feature index
+- entry speed: hours between market creation and the trade
+- size vs liquidity: trade notional / market liquidity
+- concentration: share of the wallet's observed notional in this market
+"""
+import asyncio
+
+from src.core import get_async_redis, get_supabase
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+from src.services.trade_feed import TradeFeed, trade_id
+from src.services.wallet_index import get_wallet_index
+from src.services.warehouse import get_trade_warehouse
+
+# Points per feature at full strength (sum = 100)
+WEIGHTS = {
+    "wallet_age": 35,
+    "entry_speed": 15,
+    "size_vs_liquidity": 30,
+    "concentration": 20,
+}
+
+# Feature saturation points
+FRESH_WALLET_DAYS = 90  # older wallets get no age points
+FAST_ENTRY_HOURS = 72  # entries later than this after creation get no speed points
+LIQUIDITY_SHARE = 0.05  # a trade worth 5% of market liquidity gets full size points
+
+
+def radar_score(features: dict) -> tuple[int, dict]:
+    """Radar Score (0-100) and its per-feature breakdown; unknown features score 0."""
+    parts = {}
+
+    age = features.get("wallet_age_days")
+    parts["wallet_age"] = 0.0 if age is None else max(0.0, 1 - age / FRESH_WALLET_DAYS)
+
+    hours = features.get("hours_since_creation")
+    parts["entry_speed"] = 0.0 if hours is None else max(0.0, 1 - hours / FAST_ENTRY_HOURS)
+
+    ratio = features.get("liquidity_ratio")
+    parts["size_vs_liquidity"] = 0.0 if ratio is None else min(1.0, ratio / LIQUIDITY_SHARE)
+
+    parts["concentration"] = min(1.0, features.get("concentration") or 0.0)
+
+    breakdown = {k: round(v * WEIGHTS[k], 1) for k, v in parts.items()}
+    return min(100, round(sum(breakdown.values()))), breakdown
+
+
+class RadarPipeline:
+    """
+    Incremental radar over the global trade feed.
+
+    - A (timestamp, ids) cursor in Redis makes every trade count once; per-trade
+      markers keep a retried cycle from counting its trades again.
+    - A Redis lock elects one worker per cycle, like SmartMoneyService.
+    - Signals from one cycle go to insider_signals in a single insert that
+      skips trades already signalled.
+    """
+
+    POLL_INTERVAL = 15  # seconds
+    THRESHOLD = 60
+    MIN_TRADE_USD = 250.0
+    WALLET_TTL = 7 * 86400  # concentration window
+    COUNTED_TTL = 3600  # how long a trade stays marked as counted (covers retries)
+
+    CURSOR_KEY = "radar:cursor"
+    LOCK_KEY = "radar:lock"
+
+    def __init__(self):
+        self.db = get_supabase()
+        self.polymarket = get_polymarket_service()
+        self.wallets = get_wallet_index()
+        self.feed = TradeFeed(self.CURSOR_KEY)
+        self.warehouse = get_trade_warehouse()
+        self.is_running = False
+
+    async def start(self):
+        """Start the background radar loop."""
+        if self.is_running:
+            return
+        self.is_running = True
+        asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+
+    async def _loop(self):
+        while self.is_running:
+            try:
+                if await self._acquire_lock():
+                    await self.run_cycle()
+            except Exception as e:
+                print(f"RadarPipeline: Cycle error: {e}")
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def _acquire_lock(self) -> bool:
+        try:
+            lock = await get_async_redis().set(self.LOCK_KEY, "1", nx=True, ex=self.POLL_INTERVAL - 1)
+            return bool(lock)
+        except Exception as e:
+            print(f"RadarPipeline: Lock error: {e}")
+            return True
+
+    async def run_cycle(self) -> int:
+        """Process trades since the cursor; returns the number of signals written."""
+        trades, cursor = await self.feed.poll()
+        if not trades:
+            return 0
+
+        await self.warehouse.append(trades)
+        signals = await self.process(trades)
+        if signals:
+            # A retried or overlapping cycle scores the same trades again; the
+            # unique trade_id keeps their signals from being written twice
+            await asyncio.to_thread(
+                self.db.table("insider_signals").upsert(signals, on_conflict="trade_id", ignore_duplicates=True).execute
+            )
+            print(f"RadarPipeline: {len(signals)} signals from {len(trades)} trades")
+
+        # Cursor moves only after the insert, so a failed cycle is retried (without
+        # recounting: features are only updated for trades not counted before)
+        await self.feed.commit(cursor)
+        return len(signals)
+
+    async def _claim(self, trades: list[TradeData]) -> list[bool]:
+        """Mark trades as counted; True for those not counted by an earlier (failed) cycle."""
+        pipe = get_async_redis().pipeline(transaction=False)
+        for t in trades:
+            pipe.set(f"radar:counted:{trade_id(t)}", "1", nx=True, ex=self.COUNTED_TTL)
+        return [bool(claimed) for claimed in await pipe.execute()]
+
+    async def process(self, trades: list[TradeData]) -> list[dict]:
+        """Update wallet features for every trade and return insider_signals rows to insert."""
+        fresh = await self._claim(trades)
+
+        # 1. Lifetime wallet features: every trade updates the index once
+        await self.wallets.observe([t for t, new in zip(trades, fresh) if new])
+        wallet_features = await self.wallets.get([t.wallet for t in trades if t.wallet])
+
+        # 2. Concentration: per-wallet notional by market over a rolling window,
+        #    in one pipeline. HINCRBYFLOAT returns totals including this trade;
+        #    trades counted before are read back instead.
+        redis = get_async_redis()
+        pipe = redis.pipeline(transaction=False)
+        for t, new in zip(trades, fresh):
+            key = f"radar:wallet:{t.wallet}"
+            usd = t.size * t.price
+            if new:
+                pipe.hincrbyfloat(key, "total", usd)
+                pipe.hincrbyfloat(key, t.condition_id, usd)
+            else:
+                pipe.hget(key, "total")
+                pipe.hget(key, t.condition_id)
+            pipe.expire(key, self.WALLET_TTL)
+        totals = await pipe.execute()
+
+        candidates = []
+        for i, t in enumerate(trades):
+            usd = t.size * t.price
+            if t.side == "BUY" and usd >= self.MIN_TRADE_USD and t.wallet and t.condition_id:
+                wallet_total, market_total = float(totals[3 * i] or 0), float(totals[3 * i + 1] or 0)
+                candidates.append((t, usd, market_total / wallet_total if wallet_total else 0.0))
+        if not candidates:
+            return []
+
+        # 3. First sight of a candidate wallet: fill its first activity (largest trades first)
+        by_size = [t.wallet for t, usd, _ in sorted(candidates, key=lambda c: -c[1])]
+        wallet_features = await self.wallets.fill_first_seen(by_size, wallet_features)
+        markets = await self.polymarket.get_market_snapshots([t.condition_id for t, _, _ in candidates])
+
+        # 4. Score: one index lookup per trade, already in hand
+        signals = []
+        for t, usd, concentration in candidates:
+            market = markets.get(t.condition_id) or {}
+            wallet = wallet_features.get(t.wallet) or {}
+            first = wallet.get("first_seen")
+            features = {
+                "wallet_age_days": None if first is None else round(max(0, t.timestamp - first) / 86400, 2),
+                "hours_since_creation": (
+                    None if market.get("created_ts") is None
+                    else round(max(0, t.timestamp - market["created_ts"]) / 3600, 2)
+                ),
+                "liquidity_ratio": round(usd / market["liquidity"], 5) if market.get("liquidity") else None,
+                "concentration": round(concentration, 4),
+            }
+            score, breakdown = radar_score(features)
+            if score < self.THRESHOLD:
+                continue
+
+            signals.append({
+                "trade_id": trade_id(t),
+                "wallet_address": t.wallet,
+                "market_id": t.condition_id,
+                "market_title": t.title or market.get("title"),
+                "side": "YES" if t.outcome_index == 0 else "NO",
+                "trade_size": round(usd, 2),
+                "price_entry": t.price,
+                "radar_score": score,
+                "wallet_age_days": features["wallet_age_days"],
+                "metadata": {
+                    **{k: v for k, v in features.items() if v is not None},
+                    "score_breakdown": breakdown,
+                    "wallet_trades": wallet.get("trades"),
+                    "wallet_markets": wallet.get("markets"),
+                    "transaction_hash": t.transaction_hash,
+                    "traded_at": t.timestamp,
+                },
+            })
+        return signals
+
+
+# Singleton
+_radar_pipeline: RadarPipeline | None = None
+
+
+def get_radar_pipeline() -> RadarPipeline:
+    """Get radar pipeline singleton."""
+    global _radar_pipeline
+    if _radar_pipeline is None:
+        _radar_pipeline = RadarPipeline()
+    return _radar_pipeline
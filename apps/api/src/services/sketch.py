@@ -0,0 +1,86 @@
+"""
+Foresynth API - Quantile Sketch
+
+Streaming quantile sketch in the style of DDSketch: positive values fall
+into logarithmic buckets, so every quantile estimate is within a fixed
+relative error `alpha` of the true value. Memory is bounded by `max_bins`
+(the lowest buckets collapse first, which only affects low quantiles), and
+two sketches with the same `alpha` merge exactly by adding bucket counts.
+That makes them cheap to snapshot and to shard by market across processes.
+"""
+import json
+import math
+from typing import Optional
+
+
+class QuantileSketch:
+    """Mergeable, bounded-memory quantile sketch for positive values."""
+
+    __slots__ = ("alpha", "max_bins", "gamma", "_log_gamma", "bins", "zero_count", "count")
+
+    def __init__(self, alpha: float = 0.01, max_bins: int = 512):
+        self.alpha = alpha
+        self.max_bins = max_bins
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0  # values <= 0
+        self.count = 0
+
+    def add(self, value: float, weight: int = 1):
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+
+    def _collapse(self):
+        """Fold the lowest buckets into one so at most max_bins remain."""
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        target = keys[len(excess)]
+        self.bins[target] += sum(self.bins.pop(k) for k in excess)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None for an empty sketch."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different alpha")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        while len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "a": self.alpha,
+            "m": self.max_bins,
+            "z": self.zero_count,
+            "b": [[k, n] for k, n in sorted(self.bins.items())],
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "QuantileSketch":
+        data = json.loads(raw)
+        sketch = cls(data["a"], data["m"])
+        sketch.bins = {int(k): int(n) for k, n in data["b"]}
+        sketch.zero_count = data["z"]
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
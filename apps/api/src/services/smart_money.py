@@ -0,0 +1,202 @@
+"""
+Foresynth API - Smart Money Service
+
+Pre-computes the smart-money table (leaderboard traders ranked by win
+rate over their closed positions) in the background and stores it under
+one canonical cache key. Requests only read, filter and slice that table,
+so query parameters no longer multiply upstream work.
+
+Each background refresh also tops up the lead-lag analysis for the
+table's wallets; its per-wallet results (leader score, role, cluster) are
+merged into the rows on read.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from src.core import get_async_redis, get_payload_cache
+from src.services.category_leaderboards import get_category_leaderboards
+from src.services.lead_lag import get_lead_lag_analyzer
+from src.services.polymarket import get_polymarket_service
+from src.services.wallet_analytics import rank_wallets
+
+# Fields the list can be ordered by (all descending)
+SORT_FIELDS = ("adjustedWinRate", "winRate", "profitFactor", "expectancy", "sharpe", "totalProfit", "leaderScore")
+
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class SmartMoneyService:
+    """
+    Background refresher for the smart-money table.
+
+    - One canonical key holds the full table for every (limit, min_trades).
+    - A Redis lock elects one refresher when several workers run.
+    - Cold starts compute once: concurrent callers await the same task.
+    """
+
+    CACHE_KEY = "smart_money:table"
+    LOCK_KEY = "smart_money:refresh_lock"
+    REFRESH_INTERVAL = 600  # seconds
+    # The table outlives several missed refreshes before requests recompute
+    CACHE_TTL = REFRESH_INTERVAL * 3
+    CANDIDATES = 50  # leaderboard traders scored per refresh (one Data API page)
+    HISTORY_LIMIT = 100  # closed positions per trader
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+        self.cache = get_payload_cache()
+        self.category_boards = get_category_leaderboards()
+        self.lead_lag = get_lead_lag_analyzer()
+        self.is_running = False
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background refresh loop."""
+        if self.is_running:
+            return
+        self.is_running = True
+        asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+
+    async def _loop(self):
+        while self.is_running:
+            try:
+                if await self._acquire_lock():
+                    table = await self.refresh()
+                    await self.lead_lag.refresh([t["address"] for t in table["traders"]])
+            except Exception as e:
+                print(f"SmartMoneyService: Refresh error: {e}")
+            await asyncio.sleep(self.REFRESH_INTERVAL)
+
+    async def _acquire_lock(self) -> bool:
+        try:
+            lock = await get_async_redis().set(self.LOCK_KEY, "1", nx=True, ex=self.REFRESH_INTERVAL - 30)
+            return bool(lock)
+        except Exception as e:
+            # Without Redis coordination, refreshing from every worker is still correct
+            print(f"SmartMoneyService: Lock error: {e}")
+            return True
+
+    async def get_table(self) -> dict:
+        """Return {"traders": [...], "computed_at": ts}, computing it once on a cold cache."""
+        try:
+            cached = await self.cache.get(self.CACHE_KEY)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"SmartMoneyService: Cache read error: {e}")
+
+        # Single-flight: every caller during a cold start awaits the same computation
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self.refresh())
+        return await asyncio.shield(self._inflight)
+
+    async def refresh(self) -> dict:
+        """Recompute the full table and store it under the canonical key."""
+        table = {"traders": await self._compute(), "computed_at": int(time.time())}
+        try:
+            await self.cache.setex(self.CACHE_KEY, self.CACHE_TTL, table)
+        except Exception as e:
+            print(f"SmartMoneyService: Cache write error: {e}")
+        return table
+
+    async def _compute(self) -> list[dict]:
+        # 1. Global leaderboard (monthly provides recent reliable signal)
+        leaderboard = await self.polymarket.get_leaderboard(timeframe="monthly", limit=self.CANDIDATES)
+        candidates = [
+            t for t in (leaderboard or [])[:self.CANDIDATES]
+            if t.get("address") or t.get("proxyWallet")
+        ]
+
+        # 2. Closed positions for every candidate in parallel
+        histories = await asyncio.gather(*(
+            self.polymarket.get_closed_positions(t.get("address") or t.get("proxyWallet"), limit=self.HISTORY_LIMIT)
+            for t in candidates
+        ))
+
+        addresses = [t.get("address") or t.get("proxyWallet") for t in candidates]
+        names = [t.get("name") or t.get("userName") or t.get("username") for t in candidates]
+
+        # Same positions feed the per-category boards (no extra leaderboard calls)
+        try:
+            await self.category_boards.ingest([
+                {"address": address, "name": name, "positions": history}
+                for address, name, history in zip(addresses, names, histories)
+                if isinstance(history, list)
+            ])
+        except Exception as e:
+            print(f"SmartMoneyService: Category leaderboard ingest error: {e}")
+
+        # 3. Batch metrics for every candidate; min_trades is applied per request
+        metrics = {
+            m["address"]: m for m in rank_wallets({
+                address: history for address, history in zip(addresses, histories)
+                if history and isinstance(history, list)
+            })
+        }
+
+        traders = []
+        for i, (trader, address, name) in enumerate(zip(candidates, addresses, names)):
+            m = metrics.get(address)
+            if m is None:
+                continue
+
+            traders.append({
+                "rank": trader.get("rank", i + 1),
+                "address": address,
+                "name": name or "Unknown Trader",
+                "profileImage": trader.get("profileImage") or trader.get("image"),
+                "totalProfit": float(trader.get("pnl", 0)),  # Use leaderboard PnL
+                "volume": float(trader.get("volume") or trader.get("vol") or 0),
+                "totalBets": int(m["positions"]),  # In our sample
+                "wins": int(m["wins"]),
+                "losses": int(m["positions"] - m["wins"]),
+                "winRate": round(m["win_rate"] * 100, 2),
+                "adjustedWinRate": round(m["shrunk_win_rate"] * 100, 2),
+                "profitFactor": _round(m["profit_factor"]),
+                "expectancy": _round(m["expectancy"]),
+                "sharpe": _round(m["sharpe"], 3),
+                "maxDrawdown": _round(m["max_drawdown"]),
+                "avgHoldHours": _round(m["avg_hold_hours"], 1),
+                "tracked": False,  # Placeholder, client can check against their list
+            })
+
+        # 4. Sort by shrunk win rate so small samples don't top the list
+        traders.sort(key=lambda x: x["adjustedWinRate"], reverse=True)
+        return traders
+
+    async def get_list(self, limit: int = 20, min_trades: int = 5, sort: str = "adjustedWinRate") -> list[dict]:
+        """Filter, order and slice the pre-computed table."""
+        table = await self.get_table()
+        lead_lag = (await self.lead_lag.get_results() or {}).get("wallets", {})
+        traders = [
+            {**t, "leaderScore": None, "role": None, "clusterId": None, **lead_lag.get(t["address"].lower(), {})}
+            for t in table["traders"]
+        ]
+        if sort != "adjustedWinRate":
+            traders = sorted(traders, key=lambda t: t.get(sort) if t.get(sort) is not None else float("-inf"), reverse=True)
+
+        result = []
+        for trader in traders:
+            if trader["totalBets"] >= min_trades:
+                result.append(trader)
+                if len(result) >= limit:
+                    break
+        return result
+
+
+# Singleton
+_smart_money_service: SmartMoneyService | None = None
+
+
+def get_smart_money_service() -> SmartMoneyService:
+    """Get smart money service singleton."""
+    global _smart_money_service
+    if _smart_money_service is None:
+        _smart_money_service = SmartMoneyService()
+    return _smart_money_service
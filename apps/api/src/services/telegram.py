@@ -1,10 +1,10 @@
 
-import httpx
 import logging
 from functools import lru_cache
 from typing import Optional
 
 from src.core.config import get_settings
+from src.core.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +17,8 @@ class TelegramService:
         settings = get_settings()
         self.token = settings.telegram_bot_token
         self.webhook_secret = settings.telegram_webhook_secret
-        self.base_url = f"https://api.telegram.org/bot{self.token}"
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.base_url = f"{settings.telegram_api_base}/bot{self.token}"
+        self.client = get_http_client(timeout=10.0)
 
     async def send_message(self, chat_id: str, text: str, parse_mode: str = "HTML") -> bool:
         """Send a message to a specific chat ID."""
@@ -7,7 +7,12 @@ from typing import List, Dict, Set, Any
 
 from src.core import get_supabase, get_async_cache
 from src.services.polymarket import get_polymarket_service
+from src.services.normalizer import TradeData
+from src.services.candles import get_candle_aggregator
+from src.services.flow import format_flow, get_flow_aggregator
 from src.services.notifications import get_notification_service, NotificationPayload
+from src.services.positions import get_position_engine
+from src.services.warehouse import get_trade_warehouse
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,10 @@ class TacticalTracker:
         self.cache = get_async_cache()
         self.polymarket = get_polymarket_service()
         self.notifications = get_notification_service()
+        self.candles = get_candle_aggregator()
+        self.flow = get_flow_aggregator()
+        self.positions = get_position_engine()
+        self.warehouse = get_trade_warehouse()
         self.is_running = False
         self.poll_interval = 30  # seconds
         self._last_heartbeat = 0
@@ -55,6 +64,7 @@ class TacticalTracker:
 
                 await self._monitor_wallets()
                 await self._monitor_prices()
+                await self.candles.flush()
                 
                 # Dynamic sleep to maintain interval regardless of execution time
                 elapsed = (datetime.now() - start_time).total_seconds()
@@ -94,6 +104,7 @@ class TacticalTracker:
                 })
             
             # 2. Check each wallet for latest trades
+            matched: Dict[tuple, List[tuple]] = {}
             if wallet_map:
                 print(f"📡 TACTICAL ENGINE: Scanning {len(wallet_map)} targets for trade activity...")
             
@@ -109,7 +120,7 @@ class TacticalTracker:
                 # Handling First Run (Seeding)
                 if last_seen_id is None:
                     # Seed cache with the most recent trade and skip processing
-                    latest_trade_id = trades[0].get("transactionHash") or trades[0].get("id")
+                    latest_trade_id = trades[0].trade_id
                     if latest_trade_id:
                         await self.cache.set(cache_key, latest_trade_id)
                         print(f"📝 TACTICAL ENGINE: Seeded initial state for wallet {wallet[:8]}. Latest ID: {latest_trade_id[:8]}")
@@ -118,7 +129,7 @@ class TacticalTracker:
                 # Identify new trades
                 new_trades = []
                 for trade in trades:
-                    trade_id = trade.get("transactionHash") or trade.get("id")
+                    trade_id = trade.trade_id
                     if not trade_id:
                         continue
                         
@@ -134,46 +145,67 @@ class TacticalTracker:
                     
                 # Update cache with the NEWEST trade ID (from the latest fetched trade)
                 # IMPORTANT: We use trades[0] because new_trades[0] is the same trade
-                newest_trade_id = trades[0].get("transactionHash") or trades[0].get("id")
+                newest_trade_id = trades[0].trade_id
                 if newest_trade_id:
                     await self.cache.set(cache_key, newest_trade_id)
                 
                 print(f"🎯 TACTICAL ENGINE: {len(new_trades)} NEW TRADES from {wallet[:8]}")
                 
-                # Process new trades (oldest to newest for chronological alerts)
+                # Fold into OHLCV candles and rolling flow before alerting
+                # (new_trades is newest-first; candles need chronological order).
+                # The cursor has already moved, so an analytics failure must not
+                # cost this scan its alerts.
+                try:
+                    await self.candles.ingest(new_trades[::-1])
+                    await self.flow.ingest(new_trades)
+                    # Full page, so the engine can tell whether it reaches its cursor
+                    await self.positions.observe(wallet, trades)
+                    await self.warehouse.append(new_trades)
+                except Exception as e:
+                    print(f"❌ TACTICAL ENGINE: Analytics ingest failed for {wallet[:8]}: {e}")
+                
+                # Match new trades (oldest to newest for chronological alerts)
                 for trade in reversed(new_trades): 
                     for obs in observers:
-                        await self._process_wallet_trade(wallet, trade, obs)
+                        if self._passes_filters(trade, obs["config"] or {}):
+                            matched.setdefault((obs["user_id"], trade.condition_id), []).append((wallet, trade, obs))
+            
+            # 3. One alert per (user, market): a single trade as before, several as a flow summary
+            for items in matched.values():
+                if len(items) == 1:
+                    await self._process_wallet_trade(*items[0])
+                else:
+                    await self._send_flow_alert(items)
                 
         except Exception as e:
             print(f"❌ TACTICAL ENGINE: Wallet monitor failed: {e}")
 
-    async def _process_wallet_trade(self, wallet: str, trade: dict, observer: dict):
-        """Apply filters and notify a specific user about a trade."""
+    @staticmethod
+    def _passes_filters(trade: TradeData, config: dict) -> bool:
+        """Apply a target's alert filters to a trade."""
+        if trade.usd_size < config.get("min_trade_size", 0):
+            return False
+        only_buy = config.get("only_buy_orders", False)
+        if only_buy and "BUY" not in trade.side and "YES" not in trade.side:
+            return False
+        return True
+
+    async def _process_wallet_trade(self, wallet: str, trade: TradeData, observer: dict):
+        """Notify a specific user about a trade that passed their filters."""
         try:
             config = observer["config"] or {}
             
-            # Trade details
-            shares = float(trade.get("size", 0))
-            price = float(trade.get("price", 0))
-            usd_size = shares * price
-            
-            side = trade.get("side", "").upper() # BUY, SELL
-            
-            # Apply Filters
-            min_size = config.get("min_trade_size", 0)
-            if usd_size < min_size:
-                return
+            # Trade details (already parsed by the normalizer)
+            shares = trade.size
+            price = trade.price
+            usd_size = trade.usd_size
             
-            only_buy = config.get("only_buy_orders", False)
-            if only_buy and "BUY" not in side and "YES" not in side:
-                return
+            side = trade.side # BUY, SELL
             
             print(f"✨ TACTICAL ENGINE: Signal matches filters! Size: ${usd_size:,.2f} | Side: {side}")
             
             # Prepare notification
-            # Prepare notification
-            asset = trade.get("market", "Unknown Market")
+            asset = trade.title or trade.condition_id or "Unknown Market"
             message = (
                 f"👤 <b>Target</b>: <code>{wallet[:6]}...{wallet[-4:]}</code>\n"
                 f"🎯 <b>Action</b>: {side} ${usd_size:,.2f} ({shares:,.0f} shares @ {price:.2f})\n"
@@ -187,13 +219,57 @@ class TacticalTracker:
                 message=message,
                 type="wallet_alert",
                 channels=config.get("channels", ["in-app", "telegram"]),
-                metadata={"wallet": wallet, "trade": trade}
+                metadata={"wallet": wallet, "trade": trade.model_dump(by_alias=True)}
             )
             await self.notifications.send(payload)
             
         except Exception as e:
             print(f"❌ TACTICAL ENGINE: Trade processing error: {e}")
 
+    async def _send_flow_alert(self, items: List[tuple]):
+        """One notification for several matched trades in the same market."""
+        try:
+            _, first, observer = items[0]
+            wallets = list(dict.fromkeys(wallet for wallet, _, _ in items))
+            squads = list(dict.fromkeys(obs["squad_name"] for _, _, obs in items))
+            channels = list(dict.fromkeys(
+                c for _, _, obs in items for c in (obs["config"] or {}).get("channels", ["in-app", "telegram"])
+            ))
+            # YES-equivalent direction, as in flow ingest: a NO buy is bearish
+            net = sum(
+                t.usd_size if (t.side == "BUY") == (t.outcome_index == 0) else -t.usd_size
+                for _, t, _ in items
+            )
+            
+            message = (
+                f"👥 <b>Targets</b>: {len(wallets)} wallets, {len(items)} trades "
+                f"(net {'+' if net >= 0 else '-'}${abs(net):,.2f})\n"
+                f"📊 <b>Market</b>: {first.title or first.condition_id or 'Unknown Market'}\n"
+                f"📂 <b>Squad</b>: {', '.join(squads)}"
+            )
+            flow = await self.flow.get_flow(first.condition_id, "1h")
+            if flow:
+                message += f"\n🌊 <b>Smart money flow</b>: {format_flow(flow)}"
+            
+            print(f"✨ TACTICAL ENGINE: Flow alert: {len(items)} trades in {first.condition_id[:10]}")
+            payload = NotificationPayload(
+                user_id=observer["user_id"],
+                title="🐋 SMART MONEY FLOW",
+                message=message,
+                type="wallet_alert",
+                channels=channels,
+                metadata={
+                    "wallets": wallets,
+                    "market_id": first.condition_id,
+                    "flow": flow,
+                    "trades": [t.model_dump(by_alias=True) for _, t, _ in items],
+                }
+            )
+            await self.notifications.send(payload)
+            
+        except Exception as e:
+            print(f"❌ TACTICAL ENGINE: Flow alert error: {e}")
+
     async def _monitor_prices(self):
         """Scan all watched markets for price movements or alert triggers."""
         try:
@@ -0,0 +1,59 @@
+"""
+Foresynth API - Global Trade Feed
+
+Cursor over the Data API's global recent-trades feed. Each consumer (radar,
+whale detector shards) owns a cursor key, so consumers advance
+independently and every trade reaches each of them once.
+"""
+from src.core import get_payload_cache
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+
+
+def trade_id(trade: TradeData) -> str:
+    return f"{trade.transaction_hash}:{trade.asset}:{trade.wallet}"
+
+
+class TradeFeed:
+    """Pages the feed back to a stored (timestamp, ids) cursor."""
+
+    PAGE_SIZE = 500
+    MAX_PAGES = 4  # per poll; a larger backlog is skipped rather than replayed
+
+    def __init__(self, cursor_key: str):
+        self.cursor_key = cursor_key
+        self.cache = get_payload_cache()
+        self.polymarket = get_polymarket_service()
+
+    async def poll(self) -> tuple[list[TradeData], dict]:
+        """New trades (oldest first) and the cursor after them; commit() it once handled."""
+        cursor = await self.cache.get(self.cursor_key) or {"ts": 0, "ids": []}
+        seen = set(cursor["ids"])
+        fresh: list[TradeData] = []
+        for page in range(self.MAX_PAGES):
+            batch = await self.polymarket.get_recent_trades(limit=self.PAGE_SIZE, offset=page * self.PAGE_SIZE)
+            reached = False
+            for trade in batch:
+                if trade.timestamp < cursor["ts"]:
+                    reached = True
+                    break
+                if trade.timestamp == cursor["ts"] and trade_id(trade) in seen:
+                    continue
+                fresh.append(trade)
+            # First run only takes the newest page
+            if reached or len(batch) < self.PAGE_SIZE or not cursor["ts"]:
+                break
+        else:
+            print(f"TradeFeed: Backlog beyond {self.MAX_PAGES * self.PAGE_SIZE} trades, older ones skipped")
+
+        if not fresh:
+            return [], cursor
+        fresh.sort(key=lambda t: t.timestamp)
+        newest = fresh[-1].timestamp
+        ids = [trade_id(t) for t in fresh if t.timestamp == newest]
+        if newest == cursor["ts"]:
+            ids += cursor["ids"]
+        return fresh, {"ts": newest, "ids": ids}
+
+    async def commit(self, cursor: dict):
+        await self.cache.set(self.cursor_key, cursor)
@@ -0,0 +1,197 @@
+"""
+Foresynth API - Wallet Analytics
+
+Batch performance metrics for many wallets at once. Closed positions for
+all wallets are packed into flat NumPy arrays (grouped by wallet, ordered
+by close time) and every metric is a grouped reduction over them, so
+ranking a thousand wallets costs a handful of array passes instead of a
+Python loop per position.
+"""
+from typing import Optional
+
+import numpy as np
+
+# Profit factor when a wallet has profits but no losses (keeps JSON finite)
+PROFIT_FACTOR_CAP = 100.0
+
+# Pseudo-positions of prior for the shrunk win rate
+DEFAULT_PRIOR_STRENGTH = 20.0
+
+METRICS = (
+    "positions",
+    "wins",
+    "win_rate",
+    "shrunk_win_rate",
+    "total_pnl",
+    "profit_factor",
+    "expectancy",
+    "sharpe",
+    "max_drawdown",
+    "avg_hold_hours",
+)
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _column(values: list) -> np.ndarray:
+    """Float array from API values; numeric strings parse, None/garbage become NaN."""
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_float(v) for v in values], dtype=float)
+
+
+class PositionBatch:
+    """Closed positions for many wallets as flat, wallet-grouped arrays."""
+
+    __slots__ = ("wallets", "group", "starts", "pnl", "cost", "closed_at", "opened_at")
+
+    def __init__(self, wallets: list[str], group: np.ndarray, pnl: np.ndarray, cost: np.ndarray,
+                 closed_at: np.ndarray, opened_at: np.ndarray):
+        self.wallets = wallets
+        self.group = group
+        self.pnl = pnl
+        self.cost = cost
+        self.closed_at = closed_at
+        self.opened_at = opened_at
+        counts = np.bincount(group, minlength=len(wallets))
+        self.starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    @classmethod
+    def from_positions(cls, positions_by_wallet: dict[str, list[dict]]) -> "PositionBatch":
+        """
+        Pack Data API closed positions. Opening time is optional
+        ("openedAt" / "firstTradeTimestamp"); hold time is NaN without it.
+        """
+        wallets = [w for w, rows in positions_by_wallet.items() if rows]
+        sizes = [len(positions_by_wallet[w]) for w in wallets]
+        flat = [p for w in wallets for p in positions_by_wallet[w]]
+
+        pnl = _column([p.get("realizedPnl", 0) for p in flat])
+        cost = _column([p.get("totalBought", 0) for p in flat]) * _column([p.get("avgPrice", 0) for p in flat])
+        closed_at = _column([p.get("timestamp") for p in flat])
+        opened_at = _column([p.get("openedAt", p.get("firstTradeTimestamp")) for p in flat])
+
+        group = np.repeat(np.arange(len(wallets)), sizes)
+        np.nan_to_num(pnl, copy=False)
+
+        # Chronological order inside each wallet (equity curve for drawdown)
+        order = np.lexsort((np.nan_to_num(closed_at), group))
+        return cls(wallets, group[order], pnl[order], cost[order], closed_at[order], opened_at[order])
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+
+def _group_max_drawdown(pnl: np.ndarray, group: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough drop of each wallet's cumulative realized PnL (equity starts at 0)."""
+    if pnl.size == 0:
+        return np.zeros(len(starts))
+
+    # Per-group cumulative sum: global cumsum minus the total before each group
+    total = np.cumsum(pnl)
+    before = np.where(starts > 0, total[np.maximum(starts - 1, 0)], 0.0)
+    equity = total - before[group]
+
+    # Per-group running max in one pass: lift each group above every earlier
+    # one so maximum.accumulate can never carry a peak across groups
+    span = float(equity.max() - equity.min()) + 1.0
+    lifted = equity + group * span
+    peak = np.maximum.accumulate(lifted) - group * span
+    peak = np.maximum(peak, 0.0)
+
+    return np.maximum.reduceat(peak - equity, starts)
+
+
+def compute_metrics(batch: PositionBatch, prior_strength: float = DEFAULT_PRIOR_STRENGTH,
+                    prior_win_rate: Optional[float] = None) -> dict[str, np.ndarray]:
+    """
+    All metrics for all wallets, one array per metric (aligned with batch.wallets).
+
+    - profit_factor: gross profit / gross loss
+    - expectancy: mean realized PnL per position (USD)
+    - sharpe: mean / std of per-position return on cost (not annualized)
+    - max_drawdown: USD, on the realized-PnL equity curve
+    - shrunk_win_rate: Beta-prior posterior mean, pulling small samples
+      toward the pooled win rate with `prior_strength` pseudo-positions
+    """
+    k = len(batch)
+    g, pnl = batch.group, batch.pnl
+
+    n = np.bincount(g, minlength=k).astype(float)
+    wins = np.bincount(g, weights=(pnl > 0).astype(float), minlength=k)
+    gross_profit = np.bincount(g, weights=np.clip(pnl, 0, None), minlength=k)
+    gross_loss = np.bincount(g, weights=np.clip(-pnl, 0, None), minlength=k)
+    total_pnl = gross_profit - gross_loss
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = wins / n
+        profit_factor = np.where(
+            gross_loss > 0, gross_profit / gross_loss,
+            np.where(gross_profit > 0, PROFIT_FACTOR_CAP, np.nan),
+        )
+        profit_factor = np.minimum(profit_factor, PROFIT_FACTOR_CAP)
+        expectancy = total_pnl / n
+
+        # Return on cost per position; positions without a cost basis are ignored
+        ret = np.where(batch.cost > 0, pnl / batch.cost, np.nan)
+        has_ret = ~np.isnan(ret)
+        r = np.where(has_ret, ret, 0.0)
+        m = np.bincount(g, weights=has_ret.astype(float), minlength=k)
+        mean = np.bincount(g, weights=r, minlength=k) / m
+        var = (np.bincount(g, weights=r * r, minlength=k) - m * mean * mean) / (m - 1)
+        std = np.sqrt(np.maximum(var, 0))
+        sharpe = np.where((m > 1) & (std > 0), mean / std, np.nan)
+
+        held = batch.closed_at - batch.opened_at
+        has_hold = ~np.isnan(held)
+        hold_sum = np.bincount(g, weights=np.where(has_hold, held, 0.0), minlength=k)
+        hold_n = np.bincount(g, weights=has_hold.astype(float), minlength=k)
+        avg_hold_hours = hold_sum / hold_n / 3600
+
+    prior = prior_win_rate if prior_win_rate is not None else (wins.sum() / n.sum() if n.sum() else 0.5)
+    shrunk_win_rate = (wins + prior_strength * prior) / (n + prior_strength)
+
+    return {
+        "positions": n,
+        "wins": wins,
+        "win_rate": win_rate,
+        "shrunk_win_rate": shrunk_win_rate,
+        "total_pnl": total_pnl,
+        "profit_factor": profit_factor,
+        "expectancy": expectancy,
+        "sharpe": sharpe,
+        "max_drawdown": _group_max_drawdown(pnl, g, batch.starts),
+        "avg_hold_hours": avg_hold_hours,
+    }
+
+
+def rank_wallets(positions_by_wallet: dict[str, list[dict]], sort_by: str = "shrunk_win_rate",
+                 min_positions: int = 1, prior_strength: float = DEFAULT_PRIOR_STRENGTH) -> list[dict]:
+    """Metrics per wallet as plain dicts (NaN -> None), best first by `sort_by`."""
+    if sort_by not in METRICS:
+        raise ValueError(f"Unknown metric: {sort_by}")
+
+    batch = PositionBatch.from_positions(positions_by_wallet)
+    if not len(batch):
+        return []
+    metrics = compute_metrics(batch, prior_strength)
+
+    keep = np.flatnonzero(metrics["positions"] >= min_positions)
+    key = np.nan_to_num(metrics[sort_by][keep], nan=-np.inf)
+    order = keep[np.argsort(-key, kind="stable")]
+
+    columns = {name: metrics[name][order].tolist() for name in METRICS}
+    rows = []
+    for j, idx in enumerate(order.tolist()):
+        row = {"address": batch.wallets[idx]}
+        for name in METRICS:
+            value = columns[name][j]
+            row[name] = None if value != value else value  # NaN -> None
+        rows.append(row)
+    return rows
@@ -0,0 +1,123 @@
+"""
+Foresynth API - Wallet Feature Index
+
+Persistent per-wallet features keyed by address, so wallet-age and
+fresh-wallet heuristics never page through a wallet's history:
+
+    wallet:{address}          hash  first_seen, indexed_at, trades, volume, markets
+    wallet:{address}:markets  HLL   distinct condition IDs (feeds `markets`)
+
+The hash holds a fixed handful of small fields, so Redis keeps it in its
+compact listpack encoding. Entries fill lazily: the first time a wallet is
+seen its first activity is fetched once (a single ASC /activity row), and
+counters then grow incrementally from every observed trade. `trades`,
+`volume` and `markets` count activity since `indexed_at`.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from src.core import get_async_redis
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+
+FIELDS = ("first_seen", "indexed_at", "trades", "volume", "markets")
+
+
+def _features(raw: dict) -> dict:
+    """Typed features from a raw hash (missing fields -> None / 0)."""
+    first_seen = raw.get("first_seen")
+    indexed_at = raw.get("indexed_at")
+    return {
+        "first_seen": int(first_seen) if first_seen else None,
+        "indexed_at": int(indexed_at) if indexed_at else None,
+        "trades": int(raw.get("trades") or 0),
+        "volume": float(raw.get("volume") or 0),
+        "markets": int(raw.get("markets") or 0),
+    }
+
+
+class WalletIndex:
+    """Redis-backed wallet feature index (one hash per wallet)."""
+
+    PREFIX = "wallet"
+    LOOKUPS = 25  # first-activity fetches per fill_first_seen call
+
+    def __init__(self):
+        self.polymarket = get_polymarket_service()
+
+    def _key(self, wallet: str) -> str:
+        return f"{self.PREFIX}:{wallet.lower()}"
+
+    async def get(self, wallets: list[str]) -> dict[str, dict]:
+        """Features for each wallet in one round trip (unknown wallets get empty features)."""
+        wallets = list(dict.fromkeys(wallets))
+        if not wallets:
+            return {}
+        pipe = get_async_redis().pipeline(transaction=False)
+        for wallet in wallets:
+            pipe.hmget(self._key(wallet), FIELDS)
+        rows = await pipe.execute()
+        return {w: _features(dict(zip(FIELDS, row))) for w, row in zip(wallets, rows)}
+
+    async def observe(self, trades: list[TradeData]) -> dict[str, dict]:
+        """Fold new trades into the index; returns the updated features per wallet."""
+        trades = [t for t in trades if t.wallet]
+        if not trades:
+            return {}
+
+        redis = get_async_redis()
+        now = int(time.time())
+        pipe = redis.pipeline(transaction=False)
+        for t in trades:
+            key = self._key(t.wallet)
+            pipe.hsetnx(key, "indexed_at", now)
+            pipe.hincrby(key, "trades", 1)
+            pipe.hincrbyfloat(key, "volume", t.size * t.price)
+            pipe.pfadd(f"{key}:markets", t.condition_id)
+        results = await pipe.execute()
+
+        # PFADD returns 1 when the distinct-market estimate grew
+        new_markets: dict[str, int] = {}
+        for i, t in enumerate(trades):
+            if results[4 * i + 3]:
+                new_markets[t.wallet] = new_markets.get(t.wallet, 0) + 1
+        if new_markets:
+            pipe = redis.pipeline(transaction=False)
+            for wallet, count in new_markets.items():
+                pipe.hincrby(self._key(wallet), "markets", count)
+            await pipe.execute()
+
+        return await self.get([t.wallet for t in trades])
+
+    async def fill_first_seen(self, wallets: list[str], features: Optional[dict[str, dict]] = None) -> dict[str, dict]:
+        """
+        Fetch first activity for wallets that lack it, at most LOOKUPS per call
+        in the given (priority) order. Updates and returns `features`.
+        """
+        wallets = list(dict.fromkeys(wallets))
+        features = features if features is not None else await self.get(wallets)
+        missing = [w for w in wallets if (features.get(w) or {}).get("first_seen") is None][:self.LOOKUPS]
+        if not missing:
+            return features
+
+        fetched = await asyncio.gather(*(self.polymarket.get_first_activity(w) for w in missing))
+        pipe = get_async_redis().pipeline(transaction=False)
+        for wallet, ts in zip(missing, fetched):
+            if ts:
+                pipe.hset(self._key(wallet), "first_seen", ts)
+                features.setdefault(wallet, _features({}))["first_seen"] = ts
+        await pipe.execute()
+        return features
+
+
+# Singleton
+_wallet_index: WalletIndex | None = None
+
+
+def get_wallet_index() -> WalletIndex:
+    """Get wallet index singleton."""
+    global _wallet_index
+    if _wallet_index is None:
+        _wallet_index = WalletIndex()
+    return _wallet_index
@@ -0,0 +1,353 @@
+"""
+Foresynth API - Trade Warehouse
+
+Append-only local store of every trade the API sees (tracker polls, the
+radar's global feed, wallet backfills), so analytics read history from
+disk instead of re-downloading it from the Data API. Layout:
+
+    {warehouse_dir}/trades/date=YYYY-MM-DD/part-*.parquet   micro-batches
+    {warehouse_dir}/trades/date=YYYY-MM-DD/compact-*.parquet  merged, deduped
+    {warehouse_dir}/history/date=YYYY-MM-DD/*.parquet       wallet backfills
+    {warehouse_dir}/_wallets/{address}.json                 backfill markers
+
+Trades are buffered in memory and flushed as one Parquet file per day
+every few seconds (written to a dot-file and renamed, so readers never see
+a partial file). Queries go through `pyarrow.dataset`: the day partition
+prunes files, column selection prunes columns and wallet/market/time
+filters are pushed down to Parquet row-group statistics. An hourly job
+merges each day's micro-batches into one file sorted by (wallet, time),
+dropping duplicates, and deletes `trades/` days past the retention window.
+Backfilled wallet histories live under `history/`, which retention never
+touches, so a wallet marked as backfilled keeps its full history.
+
+pyarrow is optional: without it (or with `warehouse_dir` empty) appends
+are dropped and readers fall back to the Data API.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from src.core import get_settings
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = pq = None
+
+if pa is not None:
+    SCHEMA = pa.schema([
+        ("wallet", pa.string()),
+        ("side", pa.string()),
+        ("asset", pa.string()),
+        ("condition_id", pa.string()),
+        ("size", pa.float64()),
+        ("price", pa.float64()),
+        ("timestamp", pa.int64()),
+        ("outcome", pa.string()),
+        ("outcome_index", pa.int8()),
+        ("title", pa.string()),
+        ("slug", pa.string()),
+        ("transaction_hash", pa.string()),
+    ])
+    PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+# A trade's identity across sources (the same fill can arrive from several)
+KEY_COLUMNS = ("wallet", "transaction_hash", "asset")
+
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _dedupe(table: "pa.Table") -> "pa.Table":
+    """Sort by (wallet, timestamp, key) and drop rows identical to their predecessor on the key."""
+    table = table.sort_by([("wallet", "ascending"), ("timestamp", "ascending"),
+                           ("transaction_hash", "ascending"), ("asset", "ascending")])
+    if table.num_rows < 2:
+        return table
+    same = None
+    for name in KEY_COLUMNS + ("timestamp",):
+        col = table.column(name)
+        eq = pc.fill_null(pc.equal(col.slice(1), col.slice(0, len(col) - 1)), False)
+        same = eq if same is None else pc.and_(same, eq)
+    keep = pa.concat_arrays([pa.array([True]), pc.invert(same).combine_chunks()])
+    return table.filter(keep)
+
+
+class TradeWarehouse:
+    """Day-partitioned Parquet trade store with a micro-batching writer."""
+
+    FLUSH_INTERVAL = 10  # seconds between background flushes
+    FLUSH_ROWS = 5000  # buffered trades that trigger an immediate flush
+    COMPACT_INTERVAL = 3600
+    MAX_PARTS = 24  # today's partition is compacted once it has this many files
+    BACKFILL_PAGE_SIZE = 500
+    REFRESH_PAGE_SIZE = 50
+    MAX_PAGES = 20  # the Data API's offset limit
+
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = pa is not None and bool(settings.warehouse_dir)
+        if settings.warehouse_dir and pa is None:
+            print("TradeWarehouse: pyarrow not installed, warehouse disabled")
+        self.root = Path(settings.warehouse_dir or ".")
+        self.trades_dir = self.root / "trades"
+        self.history_dir = self.root / "history"
+        self.markers_dir = self.root / "_wallets"
+        self.retention_days = settings.warehouse_retention_days
+        self.polymarket = get_polymarket_service()
+        self._buffer: list[TradeData] = []
+        self._flush_lock = asyncio.Lock()
+        self.is_running = False
+
+    async def start(self):
+        """Start the flush and compaction loops."""
+        if self.is_running or not self.enabled:
+            return
+        self.is_running = True
+        asyncio.create_task(self._flush_loop())
+        asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self):
+        self.is_running = False
+        await self.flush()
+
+    async def _flush_loop(self):
+        while self.is_running:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"TradeWarehouse: Flush error: {e}")
+
+    async def _maintenance_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.to_thread(self.compact)
+                await asyncio.to_thread(self.apply_retention)
+            except Exception as e:
+                print(f"TradeWarehouse: Maintenance error: {e}")
+            await asyncio.sleep(self.COMPACT_INTERVAL)
+
+    # ── Writes ───────────────────────────────────────────────────
+
+    async def append(self, trades: list[TradeData]):
+        """Buffer trades for the next flush (a no-op when the warehouse is disabled)."""
+        if not self.enabled:
+            return
+        self._buffer.extend(t for t in trades if t.wallet and t.asset and t.timestamp)
+        if len(self._buffer) >= self.FLUSH_ROWS:
+            await self.flush()
+
+    async def flush(self):
+        """Write buffered trades as one Parquet file per day."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, trades: list[TradeData], root: Optional[Path] = None):
+        root = root or self.trades_dir
+        by_day: dict[str, list[TradeData]] = {}
+        for t in trades:
+            by_day.setdefault(_day(t.timestamp), []).append(t)
+        for day, rows in by_day.items():
+            table = pa.Table.from_pylist(
+                [{**{name: getattr(t, name) for name in SCHEMA.names}, "wallet": t.wallet.lower()} for t in rows],
+                schema=SCHEMA,
+            )
+            self._write_file(root / f"date={day}", table, f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+
+    def _write_file(self, directory: Path, table: "pa.Table", name: str):
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{name}.tmp"
+        pq.write_table(table, tmp, compression="zstd")
+        os.replace(tmp, directory / name)
+
+    # ── Maintenance ──────────────────────────────────────────────
+
+    def _locked(self) -> Optional[int]:
+        """Non-blocking host-wide lock so one process maintains the directory."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / "_maintenance.lock", os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except OSError:
+            os.close(fd)
+            return None
+
+    def compact(self) -> int:
+        """Merge each day's files into one deduped file; returns partitions compacted."""
+        roots = [root for root in (self.trades_dir, self.history_dir) if root.exists()]
+        if not roots:
+            return 0
+        fd = self._locked()
+        if fd is None:
+            return 0
+        try:
+            today = _day(int(time.time()))
+            compacted = 0
+            for directory in sorted(d for root in roots for d in root.glob("date=*")):
+                files = sorted(p for p in directory.glob("*.parquet"))
+                day = directory.name.split("=", 1)[1]
+                if len(files) < 2 or (day == today and len(files) < self.MAX_PARTS):
+                    continue
+                table = _dedupe(ds.dataset(files, format="parquet", schema=SCHEMA).to_table())
+                self._write_file(directory, table, f"compact-{int(time.time() * 1000)}.parquet")
+                # Only the files that were merged: batches flushed meanwhile stay
+                for f in files:
+                    f.unlink(missing_ok=True)
+                compacted += 1
+            return compacted
+        finally:
+            os.close(fd)
+
+    def apply_retention(self) -> int:
+        """
+        Delete `trades/` day partitions older than the retention window (backfilled
+        `history/` is kept); returns partitions removed.
+        """
+        if not self.trades_dir.exists():
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        removed = 0
+        for directory in self.trades_dir.glob("date=*"):
+            if directory.name.split("=", 1)[1] < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    def scan(
+        self,
+        columns: Optional[list[str]] = None,
+        wallet: Optional[str] = None,
+        condition_id: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        dedupe: bool = True,
+    ) -> Optional["pa.Table"]:
+        """
+        Trades matching the filters, oldest first (None when disabled). Only `columns` (plus the
+        dedupe key) are read; day partitions outside [since, until] are skipped.
+        """
+        if not self.enabled:
+            return None
+        roots = [root for root in (self.trades_dir, self.history_dir) if root.exists()]
+        if not roots:
+            return SCHEMA.empty_table().select(columns or SCHEMA.names)
+
+        predicate = None
+
+        def _and(expr):
+            nonlocal predicate
+            predicate = expr if predicate is None else predicate & expr
+
+        if wallet:
+            _and(ds.field("wallet") == wallet.lower())
+        if condition_id:
+            _and(ds.field("condition_id") == condition_id)
+        if since is not None:
+            _and((ds.field("date") >= _day(since)) & (ds.field("timestamp") >= since))
+        if until is not None:
+            _and((ds.field("date") <= _day(until)) & (ds.field("timestamp") <= until))
+
+        read = list(dict.fromkeys((columns or SCHEMA.names) + ["timestamp"] + (list(KEY_COLUMNS) if dedupe else [])))
+        datasets = [
+            ds.dataset(root, format="parquet", partitioning=PARTITIONING, schema=SCHEMA.append(pa.field("date", pa.string())))
+            for root in roots
+        ]
+        dataset = datasets[0] if len(datasets) == 1 else ds.dataset(datasets)
+        table = dataset.to_table(columns=read, filter=predicate)
+        table = _dedupe(table) if dedupe else table.sort_by("timestamp")
+        return table.select(columns or SCHEMA.names)
+
+    # ── Wallet histories ─────────────────────────────────────────
+
+    def _marker_path(self, wallet: str) -> Path:
+        return self.markers_dir / f"{wallet}.json"
+
+    def _read_marker(self, wallet: str) -> Optional[dict]:
+        try:
+            return json.loads(self._marker_path(wallet).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_marker(self, wallet: str, marker: dict):
+        self.markers_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.markers_dir / f".{wallet}.json.tmp"
+        tmp.write_text(json.dumps(marker))
+        os.replace(tmp, self._marker_path(wallet))
+
+    async def _fetch_since(self, wallet: str, since: int, page_size: int) -> tuple[list[TradeData], bool]:
+        trades: list[TradeData] = []
+        for page in range(self.MAX_PAGES):
+            batch = await self.polymarket.get_trades(wallet, limit=page_size, offset=page * page_size, raise_errors=True)
+            trades.extend(t for t in batch if t.timestamp >= since)
+            if len(batch) < page_size or (batch and batch[-1].timestamp < since):
+                return trades, True
+        return trades, False
+
+    async def wallet_history(self, wallet: str, columns: Optional[list[str]] = None) -> Optional["pa.Table"]:
+        """
+        A wallet's full known history from the warehouse, backfilled from the
+        Data API on first use (or after a top-up left a gap) and topped up with
+        newer trades afterwards. None when the warehouse is disabled, or when
+        the first backfill fails (callers then fall back to the Data API).
+        """
+        if not self.enabled:
+            return None
+        wallet = wallet.lower()
+        marker = self._read_marker(wallet)
+        # Backfill again after a gap, or if the marker predates the history/ layout
+        if marker is not None and not (marker["complete"] and marker.get("history")):
+            marker = None
+        try:
+            if marker is None:
+                # As complete as the Data API's offset limit allows
+                trades, _ = await self._fetch_since(wallet, 0, self.BACKFILL_PAGE_SIZE)
+                complete = True
+            else:
+                trades, complete = await self._fetch_since(wallet, marker["to"], self.REFRESH_PAGE_SIZE)
+        except Exception as e:
+            # No marker is written, so the next call retries the same range
+            print(f"TradeWarehouse: History fetch error for {wallet}: {e}")
+            if marker is None:
+                return None
+            return await asyncio.to_thread(self.scan, columns, wallet)
+
+        if trades:
+            # Straight to history/, which retention keeps
+            await asyncio.to_thread(
+                self._write, [t for t in trades if t.wallet and t.asset and t.timestamp], self.history_dir
+            )
+        newest = max((t.timestamp for t in trades), default=marker["to"] if marker else 0)
+        self._write_marker(wallet, {"to": newest, "complete": complete, "history": True, "synced_at": int(time.time())})
+        return await asyncio.to_thread(self.scan, columns, wallet)
+
+
+# Singleton
+_trade_warehouse: TradeWarehouse | None = None
+
+
+def get_trade_warehouse() -> TradeWarehouse:
+    """Get trade warehouse singleton."""
+    global _trade_warehouse
+    if _trade_warehouse is None:
+        _trade_warehouse = TradeWarehouse()
+    return _trade_warehouse
@@ -0,0 +1,253 @@
+"""
+Foresynth API - Whale Detector
+
+Flags unusually large trades in any market, not only tracked wallets.
+Consumes the global trade feed and keeps one QuantileSketch per market
+of trade notional relative to market liquidity. A trade above the
+market's 99th percentile (once the market has enough history) becomes a
+whale event.
+
+Markets are sharded by crc32(conditionId) across processes
+(WHALE_SHARD_COUNT / WHALE_SHARD_INDEX); each shard has its own feed
+cursor and lock. Sketches are snapshotted to one Redis hash after each
+cycle, so a restarted (or re-elected) shard resumes warm; each snapshot
+also stores the shard's merged sketch for all-market percentiles, and
+drops markets without trades for IDLE_TTL.
+"""
+import asyncio
+import json
+import time
+import zlib
+from typing import Optional
+
+from src.core import get_async_redis, get_settings
+from src.services.normalizer import TradeData
+from src.services.polymarket import get_polymarket_service
+from src.services.sketch import QuantileSketch
+from src.services.trade_feed import TradeFeed, trade_id
+
+
+class WhaleDetector:
+    """Streaming per-market size percentiles over the global trade feed."""
+
+    POLL_INTERVAL = 15  # seconds
+    QUANTILE = 0.99
+    MIN_OBSERVATIONS = 100  # trades a market needs before it can flag
+    MIN_TRADE_USD = 1000.0
+    MAX_EVENTS = 1000
+    COUNTED_TTL = 3600  # how long a trade stays marked as counted (covers retries)
+    IDLE_TTL = 7 * 86400  # markets without trades for this long are dropped
+
+    EVENTS_KEY = "whales:events"  # zset: event JSON scored by trade timestamp
+    SNAPSHOT_KEY = "whales:sketches"  # hash: conditionId -> sketch JSON (all shards)
+    ACTIVE_KEY = "whales:active"  # hash: conditionId -> last snapshot with trades (all shards)
+    MERGED_KEY = "whales:merged"  # hash: shard -> merged sketch JSON of its markets
+
+    def __init__(self, shard_index: Optional[int] = None, shard_count: Optional[int] = None):
+        settings = get_settings()
+        self.shard_count = max(1, shard_count or settings.whale_shard_count)
+        self.shard_index = settings.whale_shard_index if shard_index is None else shard_index
+        shard = self.shard = f"{self.shard_count}:{self.shard_index}"
+
+        self.polymarket = get_polymarket_service()
+        self.feed = TradeFeed(f"whales:cursor:{shard}")
+        self.lock_key = f"whales:lock:{shard}"
+        self.version_key = f"whales:version:{shard}"
+        self.sketches: dict[str, QuantileSketch] = {}
+        self._active: dict[str, float] = {}
+        self._dirty: set[str] = set()
+        self._version: Optional[str] = None
+        self._stale = False  # in-memory sketches hold additions that were never snapshotted
+        self.is_running = False
+
+    def owns(self, condition_id: str) -> bool:
+        return zlib.crc32(condition_id.encode()) % self.shard_count == self.shard_index
+
+    async def start(self):
+        """Start the background detection loop."""
+        if self.is_running:
+            return
+        self.is_running = True
+        asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self.is_running = False
+
+    async def _loop(self):
+        while self.is_running:
+            try:
+                if await self._acquire_lock():
+                    await self.run_cycle()
+            except Exception as e:
+                print(f"WhaleDetector: Cycle error: {e}")
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def _acquire_lock(self) -> bool:
+        try:
+            lock = await get_async_redis().set(self.lock_key, "1", nx=True, ex=self.POLL_INTERVAL - 1)
+            return bool(lock)
+        except Exception as e:
+            print(f"WhaleDetector: Lock error: {e}")
+            return True
+
+    # ── Snapshots ────────────────────────────────────────────────
+
+    async def restore(self):
+        """Load this shard's sketches from the snapshot hash."""
+        redis = get_async_redis()
+        stored = await redis.hgetall(self.SNAPSHOT_KEY)
+        active = await redis.hgetall(self.ACTIVE_KEY)
+        self.sketches = {cid: QuantileSketch.from_json(raw) for cid, raw in stored.items() if self.owns(cid)}
+        # Markets snapshotted before activity was tracked count as active now
+        now = time.time()
+        self._active = {cid: float(active.get(cid) or now) for cid in self.sketches}
+        self._dirty.clear()
+        self._stale = False
+        self._version = await redis.get(self.version_key)
+
+    async def snapshot(self):
+        """Write sketches changed since the last snapshot, drop idle markets and refresh the merged sketch."""
+        now = time.time()
+        idle = [cid for cid, seen in self._active.items() if now - seen > self.IDLE_TTL and cid not in self._dirty]
+        if not self._dirty and not idle:
+            return
+        for cid in idle:
+            del self.sketches[cid], self._active[cid]
+        for cid in self._dirty:
+            self._active[cid] = now
+
+        merged = QuantileSketch()
+        for sketch in self.sketches.values():
+            merged.merge(sketch)
+
+        pipe = get_async_redis().pipeline(transaction=False)
+        if self._dirty:
+            pipe.hset(self.SNAPSHOT_KEY, mapping={cid: self.sketches[cid].to_json() for cid in self._dirty})
+            pipe.hset(self.ACTIVE_KEY, mapping={cid: now for cid in self._dirty})
+        if idle:
+            pipe.hdel(self.SNAPSHOT_KEY, *idle)
+            pipe.hdel(self.ACTIVE_KEY, *idle)
+        pipe.hset(self.MERGED_KEY, self.shard, merged.to_json())
+        pipe.incr(self.version_key)
+        self._version = str((await pipe.execute())[-1])
+        self._dirty.clear()
+
+    async def _claim(self, trades: list[TradeData]) -> list[bool]:
+        """Mark trades as counted; True for those not counted by an earlier cycle."""
+        pipe = get_async_redis().pipeline(transaction=False)
+        for t in trades:
+            pipe.set(f"whales:counted:{trade_id(t)}", "1", nx=True, ex=self.COUNTED_TTL)
+        return [bool(claimed) for claimed in await pipe.execute()]
+
+    async def _release(self, trades: list[TradeData]):
+        if trades:
+            await get_async_redis().delete(*(f"whales:counted:{trade_id(t)}" for t in trades))
+
+    # ── Detection ────────────────────────────────────────────────
+
+    async def run_cycle(self) -> list[dict]:
+        """Process new feed trades for this shard; returns the whale events found."""
+        # Another worker held the lock last (its sketches are newer than ours),
+        # or our last cycle failed before its snapshot
+        if self._stale or await get_async_redis().get(self.version_key) != self._version:
+            await self.restore()
+
+        trades, cursor = await self.feed.poll()
+        owned = [t for t in trades if t.condition_id and self.owns(t.condition_id)]
+        # Trades a retried cycle already snapshotted are neither re-added nor re-emitted
+        fresh = [t for t, new in zip(owned, await self._claim(owned)) if new]
+        try:
+            events = await self.process(fresh)
+            if events:
+                redis = get_async_redis()
+                await redis.zadd(self.EVENTS_KEY, {json.dumps(e, separators=(",", ":")): e["timestamp"] for e in events})
+                await redis.zremrangebyrank(self.EVENTS_KEY, 0, -self.MAX_EVENTS - 1)
+                print(f"WhaleDetector: {len(events)} whale trades from {len(trades)} trades")
+            await self.snapshot()
+        except Exception:
+            # Drop the unsaved additions (restored next cycle) and let the retry count these trades
+            self._stale = True
+            await self._release(fresh)
+            raise
+
+        await self.feed.commit(cursor)
+        return events
+
+    async def process(self, trades: list[TradeData]) -> list[dict]:
+        """Score trades against their market's sketch (before adding them to it)."""
+        if not trades:
+            return []
+        markets = await self.polymarket.get_market_snapshots([t.condition_id for t in trades])
+
+        events = []
+        for t in trades:
+            liquidity = (markets.get(t.condition_id) or {}).get("liquidity")
+            if not liquidity:
+                continue
+            usd = t.size * t.price
+            ratio = usd / liquidity
+
+            sketch = self.sketches.setdefault(t.condition_id, QuantileSketch())
+            threshold = sketch.quantile(self.QUANTILE) if sketch.count >= self.MIN_OBSERVATIONS else None
+            if threshold is not None and ratio > threshold and usd >= self.MIN_TRADE_USD:
+                events.append({
+                    "id": trade_id(t),
+                    "wallet_address": t.wallet,
+                    "market_id": t.condition_id,
+                    "market_title": t.title or markets[t.condition_id].get("title"),
+                    "side": t.side,
+                    "outcome": t.outcome,
+                    "trade_size": round(usd, 2),
+                    "price": t.price,
+                    "liquidity_ratio": round(ratio, 6),
+                    "p99_liquidity_ratio": round(threshold, 6),
+                    "market_trades_seen": sketch.count,
+                    "timestamp": t.timestamp,
+                })
+            sketch.add(ratio)
+            self._dirty.add(t.condition_id)
+        return events
+
+    # ── Reads ────────────────────────────────────────────────────
+
+    async def get_events(self, limit: int = 50, market_id: Optional[str] = None) -> list[dict]:
+        """Most recent whale events, optionally for one market."""
+        redis = get_async_redis()
+        raw = await redis.zrevrange(self.EVENTS_KEY, 0, -1 if market_id else limit - 1)
+        events = [json.loads(r) for r in raw]
+        if market_id:
+            events = [e for e in events if e["market_id"] == market_id][:limit]
+        return events
+
+    async def get_percentiles(self, market_id: Optional[str] = None) -> Optional[dict]:
+        """Size-to-liquidity percentiles for one market, or merged across every market."""
+        redis = get_async_redis()
+        if market_id:
+            raw = await redis.hget(self.SNAPSHOT_KEY, market_id)
+            if raw is None:
+                return None
+            sketch = QuantileSketch.from_json(raw)
+        else:
+            # One merged sketch per shard of the current layout, kept by snapshot()
+            sketch = QuantileSketch()
+            for shard, raw in (await redis.hgetall(self.MERGED_KEY)).items():
+                if shard.split(":")[0] == str(self.shard_count):
+                    sketch.merge(QuantileSketch.from_json(raw))
+
+        return {
+            "market_id": market_id,
+            "trades": sketch.count,
+            **{f"p{int(q * 100)}": sketch.quantile(q) for q in (0.5, 0.9, 0.95, 0.99)},
+        }
+
+
+# Singleton
+_whale_detector: WhaleDetector | None = None
+
+
+def get_whale_detector() -> WhaleDetector:
+    """Get whale detector singleton (this process's shard)."""
+    global _whale_detector
+    if _whale_detector is None:
+        _whale_detector = WhaleDetector()
+    return _whale_detector
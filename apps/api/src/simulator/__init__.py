@@ -0,0 +1,10 @@
+"""
+Foresynth API - Upstream Simulator
+
+Local, seeded stand-in for Polymarket (Gamma, CLOB, Data API), news
+sources and Telegram, for load tests and benchmarks without live APIs.
+"""
+from src.simulator.app import SimulatorConfig, SimulatorTransport, create_simulator_app
+from src.simulator.data import UpstreamData
+
+__all__ = ["SimulatorConfig", "SimulatorTransport", "UpstreamData", "create_simulator_app"]
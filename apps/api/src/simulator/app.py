@@ -0,0 +1,369 @@
+"""
+Foresynth API - Upstream Simulator
+
+A local stand-in for every upstream the API and agent call (Gamma, CLOB,
+Data API, CryptoPanic, GDELT, RSS, Telegram, Tavily, CryptoCompare),
+serving seeded data with configurable latency, errors and rate limits.
+
+Run standalone:
+    uvicorn src.simulator.app:app --port 9000
+
+then point the services at it, e.g. GAMMA_API_BASE=http://localhost:9000/gamma
+(see .env.example). In-process, skip the network entirely:
+    set_transport_override(SimulatorTransport(create_simulator_app()))
+"""
+import asyncio
+import random
+import time
+from email.utils import formatdate
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings
+
+from src.simulator.data import UpstreamData
+
+
+# Real upstream host -> (path prefix to strip, simulator mount)
+UPSTREAM_HOSTS = {
+    "gamma-api.polymarket.com": ("", "/gamma"),
+    "clob.polymarket.com": ("", "/clob"),
+    "data-api.polymarket.com": ("", "/data"),
+    "cryptopanic.com": ("/api/v1", "/cryptopanic"),
+    "api.gdeltproject.org": ("/api/v2", "/gdelt"),
+    "api.telegram.org": ("", "/telegram"),
+    "api.tavily.com": ("", "/tavily"),
+    "min-api.cryptocompare.com": ("", "/cryptocompare"),
+}
+
+
+class SimulatorConfig(BaseSettings):
+    """Simulator knobs, read from SIM_* environment variables."""
+
+    seed: int = 42
+    markets: int = 200
+    wallets: int = 300
+
+    # Latency per request: base + uniform jitter (milliseconds)
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    # Fraction of requests answered with a 5xx
+    error_rate: float = 0.0
+
+    # Token bucket per upstream prefix; 0 disables rate limiting
+    rate_limit_rps: float = 0.0
+    rate_limit_burst: int = 20
+    retry_after_s: int = 1
+
+    class Config:
+        env_prefix = "SIM_"
+        case_sensitive = False
+
+
+class FaultUpdate(BaseModel):
+    """Runtime fault settings, changed via POST /_sim/config."""
+    latency_ms: Optional[float] = None
+    jitter_ms: Optional[float] = None
+    error_rate: Optional[float] = None
+    rate_limit_rps: Optional[float] = None
+    rate_limit_burst: Optional[int] = None
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, rate: float, burst: int) -> bool:
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class SimulatorTransport(httpx.AsyncBaseTransport):
+    """
+    In-process transport that serves production upstream URLs from the
+    simulator app, so no base URL settings need to change. Requests to
+    unknown hosts are treated as RSS feeds.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.inner = httpx.ASGITransport(app=app)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host in UPSTREAM_HOSTS:
+            strip, mount = UPSTREAM_HOSTS[host]
+            path = request.url.path
+            if strip and path.startswith(strip):
+                path = path[len(strip):]
+            path = mount + path
+        elif host in ("localhost", "127.0.0.1", "simulator"):
+            path = request.url.path
+        else:
+            feed = host.removeprefix("www.").removeprefix("feeds.").split(".")[0]
+            path = f"/rss/{feed}.xml"
+
+        request.url = request.url.copy_with(scheme="http", host="simulator", port=None, path=path)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def create_simulator_app(config: SimulatorConfig | None = None) -> FastAPI:
+    """Build the simulator app. Each upstream is mounted under its own prefix."""
+    config = config or SimulatorConfig()
+    data = UpstreamData(seed=config.seed, n_markets=config.markets, n_wallets=config.wallets)
+    fault_rng = random.Random(config.seed)
+    buckets: dict[str, _TokenBucket] = {}
+    stats: dict[str, int] = {}
+
+    app = FastAPI(title="Foresynth Upstream Simulator", docs_url="/_sim/docs", openapi_url="/_sim/openapi.json")
+    app.state.config = config
+    app.state.data = data
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_sim"):
+            return await call_next(request)
+
+        upstream = path.split("/", 2)[1] if path.count("/") >= 1 else ""
+        stats[upstream] = stats.get(upstream, 0) + 1
+
+        if config.latency_ms or config.jitter_ms:
+            await asyncio.sleep((config.latency_ms + fault_rng.uniform(0, config.jitter_ms)) / 1000)
+
+        if config.rate_limit_rps > 0:
+            bucket = buckets.setdefault(upstream, _TokenBucket(config.rate_limit_burst))
+            if not bucket.take(config.rate_limit_rps, config.rate_limit_burst):
+                stats["429"] = stats.get("429", 0) + 1
+                return JSONResponse(
+                    {"error": "Too Many Requests"}, status_code=429,
+                    headers={"Retry-After": str(config.retry_after_s)},
+                )
+
+        if config.error_rate and fault_rng.random() < config.error_rate:
+            stats["5xx"] = stats.get("5xx", 0) + 1
+            return JSONResponse({"error": "upstream unavailable"}, status_code=fault_rng.choice([500, 502, 503]))
+
+        return await call_next(request)
+
+    # ── Control ──────────────────────────────────────────────────
+
+    @app.get("/_sim/config")
+    async def get_config():
+        return config.model_dump()
+
+    @app.post("/_sim/config")
+    async def update_config(update: FaultUpdate):
+        for key, value in update.model_dump(exclude_none=True).items():
+            setattr(config, key, value)
+        buckets.clear()
+        return config.model_dump()
+
+    @app.get("/_sim/stats")
+    async def get_stats():
+        return stats
+
+    # ── Gamma ────────────────────────────────────────────────────
+
+    def _sorted(items: list[dict], order: Optional[str], ascending: bool) -> list[dict]:
+        if order in ("volume", "liquidity"):
+            return sorted(items, key=lambda m: float(m[order]), reverse=not ascending)
+        return items
+
+    def _multi(values: Optional[list[str]]) -> set[str]:
+        """Gamma accepts repeated params (?slug=a&slug=b) as well as comma lists."""
+        return {v for value in values or [] for v in value.split(",") if v}
+
+    @app.get("/gamma/markets")
+    async def gamma_markets(
+        _q: Optional[str] = None,
+        slug: Optional[list[str]] = Query(None),
+        id: Optional[list[str]] = Query(None),
+        condition_ids: Optional[list[str]] = Query(None),
+        limit: Optional[int] = None,
+        _limit: Optional[int] = None,
+        offset: int = 0,
+        order: Optional[str] = None,
+        _sort: Optional[str] = None,
+        ascending: bool = False,
+        _order: Optional[str] = None,
+    ):
+        markets = data.markets
+        if slug:
+            wanted = _multi(slug)
+            markets = [m for m in markets if m["slug"] in wanted]
+        if id:
+            wanted = _multi(id)
+            markets = [m for m in markets if m["id"] in wanted]
+        if condition_ids:
+            wanted = _multi(condition_ids)
+            markets = [m for m in markets if m["conditionId"] in wanted]
+        if _q:
+            q = _q.lower()
+            markets = [m for m in markets if q in m["question"].lower()]
+        markets = _sorted(markets, order or _sort, ascending or _order == "asc")
+        n = limit or _limit or 100
+        return [data.public_market(m) for m in markets[offset:offset + n]]
+
+    @app.get("/gamma/markets/{market_id}")
+    async def gamma_market(market_id: str):
+        m = data.by_id.get(market_id)
+        if m is None:
+            return JSONResponse({"error": "market not found"}, status_code=404)
+        return data.public_market(m)
+
+    @app.get("/gamma/events")
+    async def gamma_events(
+        limit: int = 100,
+        offset: int = 0,
+        order: Optional[str] = None,
+        ascending: bool = False,
+    ):
+        events = _sorted(data.events, order, ascending)
+        return events[offset:offset + limit]
+
+    # ── CLOB ─────────────────────────────────────────────────────
+
+    @app.get("/clob/price")
+    async def clob_price(token_id: str, side: str = "BUY"):
+        return {"price": str(data.price_at(token_id, time.time()))}
+
+    @app.get("/clob/prices")
+    async def clob_prices(token_id: str):
+        return {token_id: {"BUY": str(data.price_at(token_id, time.time()))}}
+
+    @app.get("/clob/prices-history")
+    async def clob_prices_history(market: str, interval: str = "1d", fidelity: Optional[int] = None):
+        return {"history": data.price_history(market, interval, fidelity)}
+
+    # ── Data API ─────────────────────────────────────────────────
+
+    @app.get("/data/v1/trades")
+    @app.get("/data/trades")
+    async def data_trades(
+        user: Optional[str] = None,
+        market: Optional[str] = None,
+        limit: int = Query(100, le=10000),
+        offset: int = 0,
+    ):
+        if user:
+            return data.wallet_trades(user, limit, offset)
+        return data.recent_trades(limit, market)
+
+    @app.get("/data/activity")
+    async def data_activity(user: str, limit: int = Query(100, le=500), offset: int = 0, sortDirection: str = "DESC"):
+        return data.wallet_activity(user, limit, offset, ascending=sortDirection.upper() == "ASC")
+
+    @app.get("/data/v1/leaderboard")
+    async def data_leaderboard(
+        limit: int = 20,
+        offset: int = 0,
+        category: str = "overall",
+        timePeriod: str = "month",
+        orderBy: str = "PNL",
+    ):
+        return data.leaderboard(limit, offset, category)
+
+    @app.get("/data/v1/closed-positions")
+    @app.get("/data/closed-positions")
+    async def data_closed_positions(user: str, limit: int = 100, offset: int = 0):
+        return data.closed_positions(user, limit, offset)
+
+    # ── News ─────────────────────────────────────────────────────
+
+    @app.get("/cryptopanic/posts/")
+    @app.get("/cryptopanic/posts")
+    async def cryptopanic_posts():
+        return {"results": [{
+            "id": item["id"],
+            "title": item["title"],
+            "url": item["url"],
+            "published_at": data.iso(item["published"]),
+            "domain": item["domain"],
+            "source": {"title": "CryptoPanic Sim", "domain": item["domain"]},
+        } for item in data.headlines("CryptoPanic")]}
+
+    @app.get("/gdelt/doc/doc")
+    async def gdelt_doc(maxrecords: int = 20):
+        return {"articles": [{
+            "url": item["url"],
+            "title": item["title"],
+            "seendate": data.gdelt_date(item["published"]),
+            "domain": item["domain"],
+            "language": "English",
+            "sourcecountry": "United States",
+        } for item in data.headlines("GDELT", maxrecords)]}
+
+    @app.get("/rss/{feed}.xml")
+    async def rss_feed(feed: str, request: Request):
+        updated = data.feed_updated_at()
+        etag = f'"{feed}-{int(updated)}"'
+        last_modified = formatdate(updated, usegmt=True)
+        headers = {"ETag": etag, "Last-Modified": last_modified}
+        if request.headers.get("if-none-match") == etag or request.headers.get("if-modified-since") == last_modified:
+            return Response(status_code=304, headers=headers)
+        source = feed.replace("-", " ").title()
+        return Response(data.rss(source), media_type="application/rss+xml", headers=headers)
+
+    @app.post("/tavily/search")
+    async def tavily_search(request: Request):
+        body = await request.json()
+        query = body.get("query", "")
+        return {
+            "query": query,
+            "answer": f"Simulated answer for: {query}",
+            "results": [{
+                "title": item["title"],
+                "url": item["url"],
+                "content": f"{item['title']}. Simulated article body about {query}.",
+                "score": 0.9 - i * 0.05,
+            } for i, item in enumerate(data.headlines("Tavily", body.get("max_results", 5)))],
+        }
+
+    @app.get("/cryptocompare/data/v2/news/")
+    async def cryptocompare_news():
+        return {"Type": 100, "Data": [{
+            "id": str(item["id"]),
+            "title": item["title"],
+            "url": item["url"],
+            "body": f"{item['title']}. Simulated article body.",
+            "published_on": item["published"],
+            "source": item["domain"],
+        } for item in data.headlines("CryptoCompare")]}
+
+    # ── Telegram ─────────────────────────────────────────────────
+
+    @app.post("/telegram/bot{token}/{method}")
+    async def telegram_method(token: str, method: str, request: Request):
+        try:
+            payload = await request.json()
+        except ValueError:
+            payload = {}
+        if method == "sendMessage":
+            return {"ok": True, "result": {
+                "message_id": fault_rng.randint(1, 10**9),
+                "date": int(time.time()),
+                "chat": {"id": payload.get("chat_id")},
+                "text": payload.get("text", ""),
+            }}
+        return {"ok": True, "result": True}
+
+    return app
+
+
+app = create_simulator_app()
@@ -0,0 +1,348 @@
+"""
+Foresynth API - Simulator Data
+
+Deterministic, realistic-looking upstream data for the local simulator:
+Gamma markets/events, CLOB prices, Data API trades, leaderboard and
+closed positions, plus news sources. Everything derives from one seed,
+so two runs with the same seed return the same payloads. Trades keep
+arriving over (wall-clock) time so the tracker sees new activity.
+"""
+import hashlib
+import math
+import random
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+CATEGORIES = ["Politics", "Sports", "Crypto", "Pop Culture", "Economics", "Science"]
+
+SUBJECTS = {
+    "Politics": ["the incumbent", "the opposition leader", "the Senate bill", "the coalition", "the referendum"],
+    "Sports": ["the Lakers", "Real Madrid", "the Chiefs", "the Yankees", "Djokovic"],
+    "Crypto": ["Bitcoin", "Ethereum", "Solana", "the spot ETF", "the stablecoin bill"],
+    "Pop Culture": ["the box-office leader", "the streaming finale", "the Grammy favourite", "the viral single"],
+    "Economics": ["the Fed", "CPI", "the jobs report", "the ECB", "10Y yields"],
+    "Science": ["the Mars lander", "the fusion test", "the vaccine trial", "the launch window"],
+}
+
+VERBS = ["win", "pass", "exceed expectations", "hit a new high", "be confirmed", "cut rates", "finish first"]
+
+HEADLINE_TEMPLATES = [
+    "{subject} surges as traders price in {verb}",
+    "Analysts split on whether {subject} will {verb}",
+    "Breaking: {subject} moves markets ahead of deadline",
+    "Prediction markets bet big on {subject}",
+    "What {subject} means for the week ahead",
+]
+
+
+def _hex(rng: random.Random, nbytes: int) -> str:
+    return "0x" + "".join(f"{rng.getrandbits(8):02x}" for _ in range(nbytes))
+
+
+def _token(rng: random.Random) -> str:
+    return str(rng.getrandbits(252))
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class UpstreamData:
+    """Seeded generator for every upstream payload the simulator serves."""
+
+    def __init__(self, seed: int = 42, n_markets: int = 200, n_wallets: int = 300, epoch: float | None = None):
+        self.seed = seed
+        self.epoch = epoch or time.time()
+        rng = random.Random(seed)
+
+        self.markets: list[dict] = []
+        for i in range(n_markets):
+            category = rng.choice(CATEGORIES)
+            subject = rng.choice(SUBJECTS[category])
+            verb = rng.choice(VERBS)
+            question = f"Will {subject} {verb} by Q{rng.randint(1, 4)} {2026 + rng.randint(0, 1)}? (#{i})"
+            created = self.epoch - rng.uniform(1, 120) * 86400
+            self.markets.append({
+                "id": str(500000 + i),
+                "question": question,
+                "slug": question.lower().replace("?", "").replace("(", "").replace(")", "").replace("#", "").replace(" ", "-"),
+                "conditionId": _hex(rng, 32),
+                "clobTokenIds": [_token(rng), _token(rng)],
+                "category": category,
+                "volume": round(rng.lognormvariate(11, 1.6), 2),
+                "liquidity": round(rng.lognormvariate(9.5, 1.2), 2),
+                "createdAt": _iso(created),
+                "startDate": _iso(created),
+                "endDate": _iso(self.epoch + rng.uniform(5, 300) * 86400),
+                "image": f"https://polymarket-upload.s3.us-east-2.amazonaws.com/sim-{i}.png",
+                "description": f"This market resolves YES if {subject} does {verb} before the deadline.",
+                "active": True,
+                "closed": False,
+                "_drift": rng.uniform(-0.02, 0.02),
+                "_vol": rng.uniform(0.01, 0.06),
+                "_p0": rng.uniform(0.08, 0.92),
+            })
+        self.by_id = {m["id"]: m for m in self.markets}
+        self.by_condition = {m["conditionId"]: m for m in self.markets}
+        self.by_token = {}
+        for m in self.markets:
+            self.by_token[m["clobTokenIds"][0]] = (m, 0)
+            self.by_token[m["clobTokenIds"][1]] = (m, 1)
+
+        # Events group 1-3 markets each
+        self.events: list[dict] = []
+        i = 0
+        while i < len(self.markets):
+            group = self.markets[i:i + rng.randint(1, 3)]
+            lead = group[0]
+            self.events.append({
+                "id": str(90000 + len(self.events)),
+                "title": lead["question"].split(" (#")[0],
+                "slug": lead["slug"],
+                "category": lead["category"],
+                "volume": round(sum(m["volume"] for m in group), 2),
+                "liquidity": round(sum(m["liquidity"] for m in group), 2),
+                "endDate": lead["endDate"],
+                "image": lead["image"],
+                "active": True,
+                "closed": False,
+                "markets": [self.public_market(m) for m in group],
+            })
+            i += len(group)
+
+        # Wallets with a skill parameter that drives win rate and PnL
+        self.wallets: list[dict] = []
+        for i in range(n_wallets):
+            self.wallets.append({
+                "address": _hex(rng, 20),
+                "name": f"trader_{i:04d}" if rng.random() < 0.7 else "",
+                "skill": rng.betavariate(2, 2),
+                "size": rng.lognormvariate(5.5, 1.3),
+                "interval": rng.uniform(60, 3600),  # mean seconds between trades
+                "first_seen": self.epoch - rng.uniform(0.5, 700) * 86400,
+                "focus": rng.sample(range(len(self.markets)), k=min(len(self.markets), rng.randint(3, 25))),
+            })
+        self.wallet_by_address = {w["address"]: w for w in self.wallets}
+
+    # ── Markets ──────────────────────────────────────────────────
+
+    def public_market(self, m: dict) -> dict:
+        """Gamma wire format: arrays are JSON-encoded strings, numbers often strings."""
+        price = self.price_at(m["clobTokenIds"][0], time.time())
+        out = {k: v for k, v in m.items() if not k.startswith("_")}
+        out["clobTokenIds"] = '["%s", "%s"]' % tuple(m["clobTokenIds"])
+        out["outcomePrices"] = '["%.3f", "%.3f"]' % (price, 1 - price)
+        out["outcomes"] = '["Yes", "No"]'
+        out["volume"] = str(m["volume"])
+        return out
+
+    # ── Prices (deterministic random walk per market) ───────────
+
+    @lru_cache(maxsize=4096)
+    def _walk(self, condition_id: str, step: int) -> float:
+        m = self.by_condition[condition_id]
+        h = int(hashlib.sha1(f"{self.seed}:{condition_id}:{step}".encode()).hexdigest()[:12], 16)
+        shock = (h / 0xFFFFFFFFFFFF - 0.5) * 2
+        x = math.log(m["_p0"] / (1 - m["_p0"]))
+        # Smooth, bounded walk in logit space from a few hash-driven harmonics
+        x += m["_drift"] * step / 100 + m["_vol"] * 6 * math.sin(step / 37 + h % 7) + m["_vol"] * shock
+        return 1 / (1 + math.exp(-x))
+
+    def price_at(self, token_id: str, ts: float) -> float:
+        m, outcome = self.by_token.get(token_id, (None, 0))
+        if m is None:
+            return 0.5
+        step = int((ts - self.epoch) // 60)
+        p = self._walk(m["conditionId"], step)
+        p = min(0.999, max(0.001, p))
+        return round(1 - p if outcome else p, 4)
+
+    def price_history(self, token_id: str, interval: str, fidelity: int | None = None) -> list[dict]:
+        spans = {"1h": 3600, "6h": 6 * 3600, "1d": 86400, "1w": 7 * 86400, "1m": 30 * 86400, "max": 120 * 86400}
+        span = spans.get(interval, 86400)
+        step = (fidelity or max(1, span // 60 // 1500)) * 60
+        now = time.time()
+        return [{"t": int(t), "p": self.price_at(token_id, t)} for t in range(int(now - span), int(now), step)]
+
+    # ── Trades ───────────────────────────────────────────────────
+
+    def _trade(self, wallet: dict, k: int) -> dict:
+        rng = random.Random(f"{self.seed}:{wallet['address']}:{k}")
+        m = self.markets[rng.choice(wallet["focus"])]
+        outcome = 0 if rng.random() < 0.6 else 1
+        token = m["clobTokenIds"][outcome]
+        ts = wallet["first_seen"] + k * wallet["interval"]
+        price = self.price_at(token, ts)
+        usd = wallet["size"] * rng.lognormvariate(0, 0.8)
+        side = "BUY" if rng.random() < 0.7 else "SELL"
+        return {
+            "proxyWallet": wallet["address"],
+            "side": side,
+            "asset": token,
+            "conditionId": m["conditionId"],
+            "size": round(usd / max(price, 0.01), 2),
+            "price": price,
+            "timestamp": int(ts),
+            "title": m["question"],
+            "slug": m["slug"],
+            "icon": m["image"],
+            "eventSlug": m["slug"],
+            "outcome": "Yes" if outcome == 0 else "No",
+            "outcomeIndex": outcome,
+            "name": wallet["name"],
+            "pseudonym": wallet["name"] or "Anon",
+            "transactionHash": _hex(random.Random(f"tx:{self.seed}:{wallet['address']}:{k}"), 32),
+        }
+
+    def _last_index(self, wallet: dict, now: float) -> int:
+        return int((now - wallet["first_seen"]) // wallet["interval"])
+
+    def wallet_trades(self, address: str, limit: int = 100, offset: int = 0) -> list[dict]:
+        wallet = self.wallet_by_address.get(address.lower()) or self.wallet_by_address.get(address)
+        if wallet is None:
+            return []
+        last = self._last_index(wallet, time.time())
+        ks = range(last - offset, max(-1, last - offset - limit), -1)
+        return [self._trade(wallet, k) for k in ks]
+
+    def wallet_activity(self, address: str, limit: int = 100, offset: int = 0, ascending: bool = False) -> list[dict]:
+        """Data API /activity: the wallet's trades, oldest first when ascending."""
+        if not ascending:
+            return [dict(t, type="TRADE") for t in self.wallet_trades(address, limit, offset)]
+        wallet = self.wallet_by_address.get(address.lower()) or self.wallet_by_address.get(address)
+        if wallet is None:
+            return []
+        last = self._last_index(wallet, time.time())
+        return [dict(self._trade(wallet, k), type="TRADE") for k in range(offset, min(last + 1, offset + limit))]
+
+    def recent_trades(self, limit: int = 100, market: str | None = None) -> list[dict]:
+        """Global feed: the newest trades across all wallets (optionally one market)."""
+        now = time.time()
+        trades = []
+        for w in self.wallets:
+            last = self._last_index(w, now)
+            for k in range(last, max(-1, last - 3), -1):
+                t = self._trade(w, k)
+                if market is None or t["conditionId"] == market:
+                    trades.append(t)
+        trades.sort(key=lambda t: t["timestamp"], reverse=True)
+        return trades[:limit]
+
+    # ── Leaderboard & positions ─────────────────────────────────
+
+    def _wallet_pnl(self, wallet: dict) -> float:
+        return round((wallet["skill"] - 0.45) * wallet["size"] * 400, 2)
+
+    def leaderboard(self, limit: int = 20, offset: int = 0, category: str = "overall") -> list[dict]:
+        ranked = sorted(self.wallets, key=self._wallet_pnl, reverse=True)
+        if category and category.lower() != "overall":
+            idx = [i for i, c in enumerate(CATEGORIES) if c.lower() == category.lower()]
+            if idx:
+                ranked = [w for w in ranked if any(self.markets[f]["category"] == CATEGORIES[idx[0]] for f in w["focus"])]
+        rows = []
+        for rank, w in enumerate(ranked[offset:offset + limit], start=offset + 1):
+            rows.append({
+                "rank": str(rank),
+                "proxyWallet": w["address"],
+                "userName": w["name"],
+                "xUsername": "",
+                "verifiedBadge": False,
+                "vol": round(w["size"] * 900, 2),
+                "pnl": self._wallet_pnl(w),
+                "profileImage": "",
+            })
+        return rows
+
+    def closed_positions(self, address: str, limit: int = 100, offset: int = 0) -> list[dict]:
+        wallet = self.wallet_by_address.get(address.lower()) or self.wallet_by_address.get(address)
+        if wallet is None:
+            return []
+        rows = []
+        now = time.time()
+        for k in range(offset, offset + limit):
+            rng = random.Random(f"pos:{self.seed}:{wallet['address']}:{k}")
+            m = self.markets[rng.choice(wallet["focus"])]
+            won = rng.random() < 0.3 + 0.5 * wallet["skill"]
+            avg = rng.uniform(0.15, 0.85)
+            bought = round(wallet["size"] * rng.lognormvariate(0, 0.7), 2)
+            outcome = rng.randint(0, 1)
+            closed_at = now - k * wallet["interval"] * 4 - rng.uniform(0, 3600)
+            if closed_at < wallet["first_seen"]:
+                break
+            rows.append({
+                "proxyWallet": wallet["address"],
+                "asset": m["clobTokenIds"][outcome],
+                "conditionId": m["conditionId"],
+                "avgPrice": round(avg, 4),
+                "totalBought": bought,
+                "realizedPnl": round(bought * ((1 - avg) if won else -avg), 2),
+                "curPrice": 1 if won else 0,
+                "timestamp": int(closed_at),
+                "title": m["question"],
+                "slug": m["slug"],
+                "icon": m["image"],
+                "eventSlug": m["slug"],
+                "outcome": "Yes" if outcome == 0 else "No",
+                "outcomeIndex": outcome,
+                "oppositeOutcome": "No" if outcome == 0 else "Yes",
+                "oppositeAsset": m["clobTokenIds"][1 - outcome],
+                "endDate": m["endDate"],
+            })
+        return rows
+
+    # ── News sources ─────────────────────────────────────────────
+
+    def headlines(self, source: str, n: int = 20) -> list[dict]:
+        """News items that change every 10 minutes, several near-duplicates across sources."""
+        bucket = int(time.time() // 600)
+        items = []
+        for k in range(n):
+            rng = random.Random(f"news:{self.seed}:{bucket - k // 5}:{k % 5}")
+            category = rng.choice(CATEGORIES)
+            title = rng.choice(HEADLINE_TEMPLATES).format(
+                subject=rng.choice(SUBJECTS[category]), verb=rng.choice(VERBS)
+            )
+            # Same story across sources, lightly reworded per source
+            if zlib.crc32(source.encode()) % 2:
+                title = title.replace("Breaking: ", "")
+            published = (bucket - k // 5) * 600 - k * 17
+            items.append({
+                "id": int(hashlib.sha1(f"{source}:{title}:{published}".encode()).hexdigest()[:8], 16),
+                "title": title,
+                "url": f"https://{source.lower().replace(' ', '')}.example/{bucket - k // 5}/{k}",
+                "published": published,
+                "domain": f"{source.lower().replace(' ', '')}.example",
+            })
+        return items
+
+    def rss(self, source: str) -> str:
+        items = "".join(
+            "<item><title>{title}</title><link>{url}</link><guid>{url}</guid>"
+            "<pubDate>{date}</pubDate><description>{title}</description></item>".format(
+                title=i["title"], url=i["url"],
+                date=datetime.fromtimestamp(i["published"], tz=timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000"),
+            )
+            for i in self.headlines(source)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>{source}</title><link>https://{source.lower().replace(' ', '')}.example</link>"
+            f"<description>Simulated {source} feed</description>{items}</channel></rss>"
+        )
+
+    def feed_updated_at(self) -> float:
+        return int(time.time() // 600) * 600
+
+    def first_seen(self, address: str) -> float | None:
+        wallet = self.wallet_by_address.get(address.lower()) or self.wallet_by_address.get(address)
+        return wallet["first_seen"] if wallet else None
+
+    @staticmethod
+    def iso(ts: float) -> str:
+        return _iso(ts)
+
+    @staticmethod
+    def gdelt_date(ts: float) -> str:
+        return (datetime(1970, 1, 1) + timedelta(seconds=ts)).strftime("%Y%m%dT%H%M%SZ")
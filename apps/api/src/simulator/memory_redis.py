@@ -0,0 +1,294 @@
+"""
+Foresynth API - In-Memory Redis
+
+Minimal asyncio stand-in for redis.asyncio.Redis, selected with
+UPSTASH_REDIS_URL=memory://. Clients created with and without
+decode_responses share one keyspace, like connections to one server.
+Only the commands the services use are implemented.
+"""
+import time
+from typing import Any, Optional
+
+# One keyspace per process: key -> (value, expires_at or None). Values are
+# bytes for strings, dict[bytes, bytes] for hashes, dict[bytes, float] for sorted
+# sets and set[bytes] for HyperLogLogs
+_STORE: dict[str, tuple[Any, Optional[float]]] = {}
+
+
+def _to_bytes(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode()
+    return str(value).encode()
+
+
+class _Pipeline:
+    """Queues commands and runs them in order on execute(), like redis-py's pipeline."""
+
+    def __init__(self, redis: "MemoryRedis"):
+        self._redis = redis
+        self._queued: list = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._queued.append((command, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> list:
+        results = [await command(*args, **kwargs) for command, args, kwargs in self._queued]
+        self._queued.clear()
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._queued.clear()
+
+
+class MemoryRedis:
+    """Async, single-process Redis replacement for local runs and benchmarks."""
+
+    def __init__(self, decode_responses: bool = False, store: dict | None = None):
+        self.decode_responses = decode_responses
+        self.store = _STORE if store is None else store
+
+    def _out(self, value: Optional[bytes]):
+        if value is None or not self.decode_responses:
+            return value
+        return value.decode()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[key]
+            return None
+        return value
+
+    async def get(self, key: str):
+        return self._out(self._live(key))
+
+    async def mget(self, *keys: str):
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = keys[0]
+        return [self._out(self._live(k)) for k in keys]
+
+    async def set(self, key: str, value: Any, ex: int | None = None, nx: bool = False):
+        if nx and self._live(key) is not None:
+            return None
+        self.store[key] = (_to_bytes(value), time.monotonic() + ex if ex else None)
+        return True
+
+    async def setex(self, key: str, ttl: int, value: Any):
+        return await self.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._live(key) is not None:
+                del self.store[key]
+                removed += 1
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for k in keys if self._live(k) is not None)
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        value = self._live(key)
+        if value is None:
+            return False
+        self.store[key] = (value, time.monotonic() + ttl)
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if self._live(key) is None:
+            return -2
+        expires_at = self.store[key][1]
+        return -1 if expires_at is None else int(expires_at - time.monotonic())
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        entry = self.store.get(key)
+        value = int(self._live(key) or 0) + amount
+        self.store[key] = (str(value).encode(), entry[1] if entry else None)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    # ── Hashes ───────────────────────────────────────────────────
+
+    def _container(self, key: str) -> dict:
+        value = self._live(key)
+        if value is None:
+            value = {}
+            self.store[key] = (value, None)
+        return value
+
+    async def hset(self, key: str, field: Any = None, value: Any = None, mapping: dict | None = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        h = self._container(key)
+        added = 0
+        for f, v in items.items():
+            f = _to_bytes(f)
+            added += f not in h
+            h[f] = _to_bytes(v)
+        return added
+
+    async def hget(self, key: str, field: Any):
+        return self._out((self._live(key) or {}).get(_to_bytes(field)))
+
+    async def hmget(self, key: str, *fields: Any):
+        if len(fields) == 1 and isinstance(fields[0], (list, tuple)):
+            fields = fields[0]
+        h = self._live(key) or {}
+        return [self._out(h.get(_to_bytes(f))) for f in fields]
+
+    async def hgetall(self, key: str) -> dict:
+        return {self._out(f): self._out(v) for f, v in (self._live(key) or {}).items()}
+
+    async def hdel(self, key: str, *fields: Any) -> int:
+        h = self._live(key) or {}
+        return sum(h.pop(_to_bytes(f), None) is not None for f in fields)
+
+    async def hsetnx(self, key: str, field: Any, value: Any) -> int:
+        h = self._container(key)
+        field = _to_bytes(field)
+        if field in h:
+            return 0
+        h[field] = _to_bytes(value)
+        return 1
+
+    async def hincrby(self, key: str, field: Any, amount: int = 1) -> int:
+        h = self._container(key)
+        field = _to_bytes(field)
+        value = int(h.get(field, b"0")) + amount
+        h[field] = str(value).encode()
+        return value
+
+    async def hincrbyfloat(self, key: str, field: Any, amount: float = 1.0) -> float:
+        h = self._container(key)
+        field = _to_bytes(field)
+        value = float(h.get(field, b"0")) + float(amount)
+        h[field] = repr(value).encode()
+        return value
+
+    async def hlen(self, key: str) -> int:
+        return len(self._live(key) or {})
+
+    # ── HyperLogLog (exact sets here) ────────────────────────────
+
+    async def pfadd(self, key: str, *values: Any) -> int:
+        members = self._live(key)
+        if members is None:
+            members = set()
+            self.store[key] = (members, None)
+        before = len(members)
+        members.update(_to_bytes(v) for v in values)
+        return int(len(members) > before)
+
+    async def pfcount(self, *keys: str) -> int:
+        union = set()
+        for key in keys:
+            union |= self._live(key) or set()
+        return len(union)
+
+    # ── Sorted sets ──────────────────────────────────────────────
+
+    async def zincrby(self, key: str, amount: float, member: Any) -> float:
+        z = self._container(key)
+        member = _to_bytes(member)
+        z[member] = z.get(member, 0.0) + float(amount)
+        return z[member]
+
+    async def zadd(self, key: str, mapping: dict) -> int:
+        z = self._container(key)
+        added = 0
+        for member, score in mapping.items():
+            member = _to_bytes(member)
+            added += member not in z
+            z[member] = float(score)
+        return added
+
+    async def zscore(self, key: str, member: Any) -> Optional[float]:
+        return (self._live(key) or {}).get(_to_bytes(member))
+
+    async def zmscore(self, key: str, members: list) -> list[Optional[float]]:
+        z = self._live(key) or {}
+        return [z.get(_to_bytes(m)) for m in members]
+
+    async def zcard(self, key: str) -> int:
+        return len(self._live(key) or {})
+
+    async def zrevrange(self, key: str, start: int, end: int, withscores: bool = False) -> list:
+        z = self._live(key) or {}
+        ranked = sorted(z.items(), key=lambda item: (-item[1], item[0]))
+        stop = None if end == -1 else end + 1
+        ranked = ranked[start:stop]
+        if withscores:
+            return [(self._out(m), score) for m, score in ranked]
+        return [self._out(m) for m, _ in ranked]
+
+    async def zremrangebyrank(self, key: str, start: int, end: int) -> int:
+        z = self._live(key) or {}
+        ranked = sorted(z.items(), key=lambda item: (item[1], item[0]))
+        n = len(ranked)
+        start, end = (start + n if start < 0 else start), (end + n if end < 0 else end)
+        doomed = ranked[max(start, 0):end + 1]
+        for member, _ in doomed:
+            del z[member]
+        return len(doomed)
+
+    async def zremrangebyscore(self, key: str, min_score: float, max_score: float) -> int:
+        z = self._live(key) or {}
+        doomed = [m for m, score in z.items() if float(min_score) <= score <= float(max_score)]
+        for member in doomed:
+            del z[member]
+        return len(doomed)
+
+    async def zrevrangebyscore(
+        self, key: str, max_score: Any, min_score: Any,
+        start: Optional[int] = None, num: Optional[int] = None, withscores: bool = False,
+    ) -> list:
+        def bound(value: Any) -> tuple[float, bool]:
+            # "(x" is an exclusive bound, as in Redis
+            if isinstance(value, str) and value.startswith("("):
+                return float(value[1:]), True
+            return float(value), False
+
+        hi, hi_open = bound(max_score)
+        lo, lo_open = bound(min_score)
+        z = self._live(key) or {}
+        ranked = sorted(
+            ((m, s) for m, s in z.items()
+             if (lo < s if lo_open else lo <= s) and (s < hi if hi_open else s <= hi)),
+            key=lambda item: (-item[1], item[0]),
+        )
+        if start is not None and num is not None:
+            ranked = ranked[start:start + num]
+        if withscores:
+            return [(self._out(m), s) for m, s in ranked]
+        return [self._out(m) for m, _ in ranked]
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self)
+
+    async def flushall(self):
+        self.store.clear()
+
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self):
+        pass
+
+    async def close(self):
+        pass
@@ -0,0 +1,386 @@
+"""
+Foresynth API - In-Memory Supabase
+
+A small PostgREST-style client over Python lists, selected with
+SUPABASE_URL=memory://. It implements the query-builder subset this
+codebase uses (select with one level of embedding, eq/neq/gt/gte/lt/lte,
+in_, is_, ilike, or_, order, limit, range, insert/update/upsert/delete,
+count="exact") and counts executed queries per table, so benchmarks and
+budget checks can run without a database.
+"""
+import random
+import re
+import uuid
+from collections import Counter
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Optional
+
+# Tables whose primary key is not "id"
+_PRIMARY_KEYS = {"agent_configs": "user_id", "market_correlations": "market_id"}
+
+_EMBED = re.compile(r"^(?:(\w+):)?(\w+)\((.*)\)$")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top(expr: str) -> list[str]:
+    """Split on commas that are not inside parentheses."""
+    parts, depth, buf = [], 0, ""
+    for ch in expr:
+        if ch == "," and depth == 0:
+            parts.append(buf)
+            buf = ""
+            continue
+        depth += (ch == "(") - (ch == ")")
+        buf += ch
+    if buf:
+        parts.append(buf)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _coerce(sample: Any, value: Any) -> Any:
+    """Cast a filter value to the row value's type (PostgREST sends text)."""
+    if isinstance(sample, bool) and isinstance(value, str):
+        return value.lower() == "true"
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool) and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _compare(op: str, actual: Any, value: Any) -> bool:
+    if op == "is":
+        target = {"null": None, "true": True, "false": False}.get(str(value).lower(), value)
+        return actual is target
+    if actual is None:
+        return op == "neq" and value is not None
+    value = _coerce(actual, value)
+    try:
+        if op == "eq":
+            return actual == value
+        if op == "neq":
+            return actual != value
+        if op == "gt":
+            return actual > value
+        if op == "gte":
+            return actual >= value
+        if op == "lt":
+            return actual < value
+        if op == "lte":
+            return actual <= value
+    except TypeError:
+        return False
+    if op in ("like", "ilike"):
+        pattern = "^" + re.escape(str(value)).replace("%", ".*").replace("\\*", ".*") + "$"
+        return re.match(pattern, str(actual), re.IGNORECASE if op == "ilike" else 0) is not None
+    if op == "in":
+        return actual in {_coerce(actual, v) for v in value}
+    if op == "cs":
+        return set(value) <= set(actual or [])
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _parse_or(expr: str):
+    """Parse a PostgREST or=(...) expression into a predicate."""
+    preds = []
+    for term in _split_top(expr):
+        if term.startswith("and(") and term.endswith(")"):
+            inner = [_parse_or(t) for t in _split_top(term[4:-1])]
+            preds.append(lambda row, inner=inner: all(p(row) for p in inner))
+            continue
+        if term.startswith("or(") and term.endswith(")"):
+            preds.append(_parse_or(term[3:-1]))
+            continue
+        column, op, value = term.split(".", 2)
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]  # quoted values (timestamps, reserved characters)
+        if op == "in":
+            value = [v.strip().strip('"') for v in value.strip("()").split(",")]
+        elif op == "not":
+            op2, value = value.split(".", 1)
+            preds.append(lambda row, c=column, o=op2, v=value: not _compare(o, row.get(c), v))
+            continue
+        preds.append(lambda row, c=column, o=op, v=value: _compare(o, row.get(c), v))
+    return lambda row: any(p(row) for p in preds)
+
+
+class _Query:
+    """Chainable query against one table; execute() returns a response with .data/.count."""
+
+    def __init__(self, client: "MemorySupabase", table: str):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.count_mode: Optional[str] = None
+        self.filters: list = []
+        self.orders: list[tuple[str, bool]] = []
+        self.limit_n: Optional[int] = None
+        self.offset = 0
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.single_row = False
+
+    # ── Operations ───────────────────────────────────────────────
+
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self.columns = columns
+        self.count_mode = count
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None, ignore_duplicates: bool = False, **kwargs):
+        self.op, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload, **kwargs):
+        self.op, self.payload = "update", payload
+        return self
+
+    def delete(self, **kwargs):
+        self.op = "delete"
+        return self
+
+    # ── Filters ──────────────────────────────────────────────────
+
+    def _filter(self, column: str, op: str, value: Any):
+        self.filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def like(self, column, value):
+        return self._filter(column, "like", value)
+
+    def ilike(self, column, value):
+        return self._filter(column, "ilike", value)
+
+    def is_(self, column, value):
+        return self._filter(column, "is", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", list(values))
+
+    def contains(self, column, values):
+        return self._filter(column, "cs", list(values))
+
+    def or_(self, expr: str, **kwargs):
+        self.filters.append(_parse_or(expr))
+        return self
+
+    # ── Modifiers ────────────────────────────────────────────────
+
+    def order(self, column: str, desc: bool = False, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n: int, **kwargs):
+        self.limit_n = n
+        return self
+
+    def range(self, start: int, end: int, **kwargs):
+        self.offset, self.limit_n = start, end - start + 1
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def maybe_single(self):
+        return self.single()
+
+    # ── Execution ────────────────────────────────────────────────
+
+    def _match(self, rows: list[dict]) -> list[dict]:
+        return [r for r in rows if all(f(r) for f in self.filters)]
+
+    def _project(self, row: dict) -> dict:
+        if self.columns.strip() == "*":
+            return deepcopy(row)
+        out = {}
+        for col in _split_top(self.columns):
+            embed = _EMBED.match(col)
+            if embed:
+                alias, table, sub = embed.groups()
+                alias = alias or table
+                fk = row.get(f"{alias}_id") or row.get(f"{table.rstrip('s')}_id")
+                target = next((r for r in self.client.tables.get(table, []) if r.get("id") == fk), None)
+                out[alias] = None if target is None else _Query(self.client, table).select(sub)._project(target)
+            elif col == "*":
+                out.update(deepcopy(row))
+            else:
+                out[col] = deepcopy(row.get(col))
+        return out
+
+    def execute(self):
+        self.client.queries[self.table] += 1
+        self.client.operations[(self.table, self.op)] += 1
+        rows = self.client.tables.setdefault(self.table, [])
+        pk = _PRIMARY_KEYS.get(self.table, "id")
+
+        if self.op in ("insert", "upsert"):
+            items = self.payload if isinstance(self.payload, list) else [self.payload]
+            out = []
+            for item in items:
+                row = {"id": str(uuid.uuid4()), "created_at": _now_iso(), **deepcopy(item)}
+                if self.table in _PRIMARY_KEYS:
+                    row.pop("id", None)
+                keys = (self.on_conflict or pk).split(",")
+                existing = None
+                if self.op == "upsert":
+                    existing = next((r for r in rows if all(r.get(k) == row.get(k) for k in keys)), None)
+                if existing is not None:
+                    if self.ignore_duplicates:
+                        continue
+                    existing.update(deepcopy(item))
+                    out.append(deepcopy(existing))
+                else:
+                    rows.append(row)
+                    out.append(deepcopy(row))
+            return SimpleNamespace(data=out, count=None)
+
+        matched = self._match(rows)
+
+        if self.op == "update":
+            for row in matched:
+                row.update(deepcopy(self.payload))
+            return SimpleNamespace(data=[deepcopy(r) for r in matched], count=None)
+
+        if self.op == "delete":
+            ids = {id(r) for r in matched}
+            self.client.tables[self.table] = [r for r in rows if id(r) not in ids]
+            return SimpleNamespace(data=[deepcopy(r) for r in matched], count=None)
+
+        for column, desc in reversed(self.orders):
+            present = [r for r in matched if r.get(column) is not None]
+            missing = [r for r in matched if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            # Postgres puts NULLs first for DESC, last for ASC
+            matched = missing + present if desc else present + missing
+
+        total = len(matched)
+        end = None if self.limit_n is None else self.offset + self.limit_n
+        data = [self._project(r) for r in matched[self.offset:end]]
+        if self.single_row:
+            data = data[0] if data else None
+        return SimpleNamespace(data=data, count=total if self.count_mode else None)
+
+
+class _MemoryAuth:
+    """auth.get_user(token): bearer tokens are the user id itself."""
+
+    def __init__(self, client: "MemorySupabase"):
+        self.client = client
+
+    def get_user(self, token: str):
+        known = {u["id"] for u in self.client.tables.get("users", [])}
+        if token not in known:
+            return SimpleNamespace(user=None)
+        return SimpleNamespace(user=SimpleNamespace(id=token))
+
+
+class MemorySupabase:
+    """In-process replacement for supabase.Client with per-table query counters."""
+
+    def __init__(self, tables: Optional[dict[str, list[dict]]] = None):
+        self.tables: dict[str, list[dict]] = tables or {}
+        self.queries: Counter = Counter()
+        self.operations: Counter = Counter()
+        self.auth = _MemoryAuth(self)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def from_(self, name: str) -> _Query:
+        return self.table(name)
+
+    def reset_counters(self):
+        self.queries.clear()
+        self.operations.clear()
+
+    def seed(self, data, users: int = 20, squads_per_user: int = 2, targets_per_squad: int = 5,
+             signals: int = 500, alert_channels: tuple = ("in-app",), seed: int = 42) -> "MemorySupabase":
+        """Fill tables with rows that reference the simulator's wallets and markets."""
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+
+        def ts(days_ago: float) -> str:
+            return (now - timedelta(days=days_ago)).isoformat()
+
+        wallets = [w["address"] for w in data.wallets]
+        markets = data.markets
+        for u in range(users):
+            user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+            self.tables.setdefault("users", []).append({
+                "id": user_id, "email": f"user{u}@example.com",
+                "telegram_chat_id": str(100000 + u) if u % 2 == 0 else None,
+                "discord_webhook_url": None, "created_at": ts(rng.uniform(1, 200)),
+            })
+            self.tables.setdefault("watchlists", []).append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": user_id, "name": "Main",
+                "market_ids": [m["id"] for m in rng.sample(markets, k=min(8, len(markets)))],
+                "created_at": ts(rng.uniform(1, 100)),
+            })
+            for s in range(squads_per_user):
+                squad_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                self.tables.setdefault("squads", []).append({
+                    "id": squad_id, "user_id": user_id, "name": f"Squad {s + 1}",
+                    "is_active": True, "created_at": ts(rng.uniform(1, 100)),
+                })
+                for wallet in rng.sample(wallets, k=min(targets_per_squad, len(wallets))):
+                    self.tables.setdefault("tracked_targets", []).append({
+                        "id": str(uuid.UUID(int=rng.getrandbits(128))), "squad_id": squad_id,
+                        "wallet_address": wallet, "nickname": None,
+                        "alert_config": {"min_trade_size": 1000, "only_buy_orders": True, "channels": list(alert_channels)},
+                        "created_at": ts(rng.uniform(1, 100)),
+                    })
+            m = rng.choice(markets)
+            self.tables.setdefault("price_alerts", []).append({
+                # The tracker prices alerts by CLOB token ID
+                "id": str(uuid.UUID(int=rng.getrandbits(128))), "user_id": user_id, "market_id": m["clobTokenIds"][0],
+                "condition": rng.choice(["above", "below"]), "threshold": rng.randint(10, 90),
+                "channels": list(alert_channels), "is_active": True, "last_triggered_at": None,
+                "created_at": ts(rng.uniform(1, 30)),
+            })
+
+        for _ in range(signals):
+            m = rng.choice(markets)
+            age = rng.uniform(0.5, 400)
+            self.tables.setdefault("insider_signals", []).append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "wallet_address": rng.choice(wallets), "market_id": m["conditionId"],
+                "market_title": m["question"], "side": rng.choice(["YES", "NO"]),
+                "trade_size": round(rng.lognormvariate(8, 1), 2), "price_entry": round(rng.uniform(0.05, 0.95), 3),
+                "radar_score": rng.randint(0, 100),
+                "wallet_age_days": round(age, 1),
+                "metadata": {"wallet_age_days": round(age, 1)},
+                "created_at": ts(rng.uniform(0, 30)),
+            })
+        return self